@@ -22,6 +22,9 @@ module.exports = {
     hardhat: {
       mining: {
         auto: true, // Disable automatic block mining
+        mempool: {
+          order: "fifo", // Blocks mined by evm_mine keep the transactions' submission order
+        },
       },
     },
   },
@@ -0,0 +1,150 @@
+import os
+import glob
+import json
+import hashlib
+import subprocess
+
+# Hardhat project root (holds hardhat.config.ts, contracts/ and artifacts/), independent of the working directory
+project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+contracts_dir = os.path.join(project_root, 'contracts')
+artifacts_dir = os.path.join(project_root, 'artifacts', 'contracts')
+hardhat_config = os.path.join(project_root, 'hardhat.config.ts')
+
+# Single-file store with the ABI and bytecode of every contract, keyed on the sources hash
+store_path = os.path.join(project_root, 'cache', 'marl-artifacts.json')
+
+# Store loaded by this process, if any
+_store = None
+
+
+def _solidity_settings(config_text):
+    """
+    Extracts the `solidity: {...}` block from the Hardhat config, so that changes to unrelated
+    settings (e.g. networks) do not invalidate the cache. Falls back to the whole file.
+    """
+    start = config_text.find('solidity:')
+    brace = config_text.find('{', start)
+    if start == -1 or brace == -1:
+        return config_text
+    depth = 0
+    for i in range(brace, len(config_text)):
+        if config_text[i] == '{':
+            depth += 1
+        elif config_text[i] == '}':
+            depth -= 1
+            if depth == 0:
+                return config_text[start:i + 1]
+    return config_text
+
+
+def sources_hash():
+    """
+    Hashes every `contracts/**/*.sol` file (path and content) together with the solc settings
+    from `hardhat.config.ts`.
+
+    Returns:
+        str: Hex digest identifying the current sources.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(contracts_dir, '**', '*.sol'), recursive=True)):
+        digest.update(os.path.relpath(path, contracts_dir).replace(os.sep, '/').encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    with open(hardhat_config) as f:
+        digest.update(_solidity_settings(f.read()).encode())
+    return digest.hexdigest()
+
+
+def _collect_artifacts():
+    """
+    Reads the ABI and bytecode of every contract from the Hardhat artifacts directory.
+
+    Returns:
+        dict: Maps 'source/path.sol:ContractName' to {'abi': ..., 'bytecode': ...}.
+    """
+    contracts = {}
+    for path in glob.glob(os.path.join(artifacts_dir, '**', '*.json'), recursive=True):
+        if path.endswith('.dbg.json'):
+            continue
+        source = os.path.relpath(os.path.dirname(path), artifacts_dir).replace(os.sep, '/')
+        with open(path) as f:
+            artifact = json.load(f)
+        contracts[f"{source}:{artifact['contractName']}"] = {
+            'abi': artifact['abi'],
+            'bytecode': artifact['bytecode'],
+        }
+    return contracts
+
+
+def ensure_compiled(force=False):
+    """
+    Makes sure compiled artifacts for the current sources are available. Compilation with
+    `npx hardhat compile` only runs when the sources hash differs from the stored one.
+
+    Args:
+        force: Compile and rebuild the store even if the hash matches.
+
+    Returns:
+        dict: The artifact store (`hash` and `contracts`).
+    """
+    global _store
+    current_hash = sources_hash()
+    if not force and _store is not None and _store['hash'] == current_hash:
+        return _store
+
+    if not force and os.path.exists(store_path):
+        with open(store_path) as f:
+            store = json.load(f)
+        if store.get('hash') == current_hash:
+            _store = store
+            return _store
+
+    subprocess.run(["npx", "hardhat", "compile"], check=True, cwd=project_root)
+    store = {'hash': current_hash, 'contracts': _collect_artifacts()}
+
+    os.makedirs(os.path.dirname(store_path), exist_ok=True)
+    tmp_path = f'{store_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(store, f, separators=(',', ':'))
+    os.replace(tmp_path, store_path)
+
+    _store = store
+    return _store
+
+
+def is_compiled():
+    """
+    Returns True if the artifact store matches the current sources, i.e. `ensure_compiled` would
+    not need to run the compiler.
+    """
+    current_hash = sources_hash()
+    if _store is not None and _store['hash'] == current_hash:
+        return True
+    if not os.path.exists(store_path):
+        return False
+    with open(store_path) as f:
+        return json.load(f).get('hash') == current_hash
+
+
+def load_artifact(source, contract_name):
+    """
+    Returns the ABI and bytecode of a compiled contract, compiling first only if the sources changed.
+
+    Args:
+        source: Path of the Solidity file relative to `contracts/`, e.g. 'auction.sol' or
+            'decentralizedSociety/farmer.sol'.
+        contract_name: Name of the contract inside that file, e.g. 'Auction'.
+
+    Returns:
+        tuple: The contract ABI (list) and its creation bytecode (hex string).
+    """
+    store = _store if _store is not None else ensure_compiled()
+    entry = store['contracts'][f'{source}:{contract_name}']
+    return entry['abi'], entry['bytecode']
+
+
+def load_abi(source, contract_name):
+    """
+    Returns the ABI of a compiled contract (see `load_artifact`).
+    """
+    return load_artifact(source, contract_name)[0]
@@ -0,0 +1,202 @@
+import asyncio
+import random
+import time
+from collections import Counter
+
+from web3 import AsyncWeb3, AsyncHTTPProvider
+
+OUTBID_REASON = "There already is a higher bid."
+ENDED_REASON = "Auction already ended."
+
+# Explicit gas for bids so sending never waits on (or fails in) gas estimation
+BID_GAS = 200000
+
+
+class BidMetrics:
+    """
+    Counters collected while concurrent bidders race on one auction.
+
+    Attributes:
+        submitted: Bids sent to the node.
+        accepted: Bids mined successfully.
+        outbid: Bids that reverted with "There already is a higher bid." (lost the race).
+        too_late: Bids that reverted with "Auction already ended.".
+        failed: Bids that failed for any other reason.
+        bids_per_block: Counter of mined bids (accepted or reverted) per block number.
+        elapsed: Wall time in seconds spent bidding.
+    """
+    def __init__(self):
+        self.submitted = 0
+        self.accepted = 0
+        self.outbid = 0
+        self.too_late = 0
+        self.failed = 0
+        self.bids_per_block = Counter()
+        self.elapsed = 0.0
+
+    def record_error(self, message):
+        """
+        Classifies a revert message into the outbid, too-late or failed counters.
+        """
+        if OUTBID_REASON in message:
+            self.outbid += 1
+        elif ENDED_REASON in message:
+            self.too_late += 1
+        else:
+            self.failed += 1
+
+    def summary(self):
+        """
+        Returns the metrics as a dictionary, including throughput and block sharing figures.
+        """
+        mined_blocks = len(self.bids_per_block)
+        return {
+            'submitted': self.submitted,
+            'accepted': self.accepted,
+            'outbid': self.outbid,
+            'too_late': self.too_late,
+            'failed': self.failed,
+            'elapsed': self.elapsed,
+            'bids_per_second': self.submitted / self.elapsed if self.elapsed else 0.0,
+            'blocks': mined_blocks,
+            'max_bids_per_block': max(self.bids_per_block.values()) if mined_blocks else 0,
+        }
+
+
+async def _await_receipt(w3, contract, tx_hash, value, metrics):
+    """
+    Waits for a bid's receipt and records its outcome. Reverted bids are classified by re-reading
+    the auction state at the block they were mined in.
+    """
+    try:
+        receipt = await w3.eth.wait_for_transaction_receipt(tx_hash)
+    except Exception as e:
+        metrics.record_error(str(e))
+        return
+
+    metrics.bids_per_block[receipt['blockNumber']] += 1
+    if receipt['status'] == 1:
+        metrics.accepted += 1
+        return
+
+    block = receipt['blockNumber']
+    highest_bid = await contract.functions.highestBid().call(block_identifier=block)
+    if value <= highest_bid:
+        metrics.outbid += 1
+    else:
+        end_time = await contract.functions.auctionEndTime().call(block_identifier=block)
+        timestamp = (await w3.eth.get_block(block))['timestamp']
+        if timestamp > end_time:
+            metrics.too_late += 1
+        else:
+            metrics.failed += 1
+
+
+async def bidder(w3, contract, account, bids, metrics, rng, min_increment, max_increment, think_time):
+    """
+    An independent bidder coroutine. It tracks its own nonce, so it can send its next bid without
+    waiting for the previous one to be mined; receipts are collected by background tasks.
+
+    Args:
+        w3: The AsyncWeb3 instance.
+        contract: The async auction contract instance.
+        account: The unlocked account this bidder sends from.
+        bids: Maximum number of bids to place.
+        metrics: Shared BidMetrics.
+        rng: This bidder's random.Random instance.
+        min_increment: Minimum increment over the current highest bid, in wei.
+        max_increment: Maximum increment over the current highest bid, in wei.
+        think_time: Seconds to wait between two bids.
+    """
+    nonce = await w3.eth.get_transaction_count(account, 'pending')
+    receipts = []
+
+    for _ in range(bids):
+        ended, highest_bid, highest_bidder = await asyncio.gather(
+            contract.functions.ended().call(),
+            contract.functions.highestBid().call(),
+            contract.functions.highestBidder().call(),
+        )
+        if ended:
+            break
+        if highest_bidder != account:
+            value = int(highest_bid + rng.uniform(min_increment, max_increment))
+            try:
+                tx_hash = await contract.functions.bid().transact({
+                    'from': account,
+                    'value': value,
+                    'nonce': nonce,
+                    'gas': BID_GAS,
+                })
+            except Exception as e:
+                # With automine on, Hardhat mines the reverted bid and reports the revert here,
+                # so the nonce may have been consumed: resynchronize it from the node
+                metrics.submitted += 1
+                metrics.record_error(str(e))
+                nonce = await w3.eth.get_transaction_count(account, 'pending')
+                if ENDED_REASON in str(e):
+                    break
+            else:
+                nonce += 1
+                metrics.submitted += 1
+                receipts.append(asyncio.create_task(_await_receipt(w3, contract, tx_hash, value, metrics)))
+        await asyncio.sleep(think_time)
+
+    await asyncio.gather(*receipts)
+
+
+async def run_bidders(node_url, contract_address, contract_abi, bids_per_bidder=10,
+                      min_increment=10 ** 17, max_increment=10 ** 18, think_time=0.0,
+                      block_interval=None, seed=None):
+    """
+    Races every account of the node as an independent bidder coroutine against one auction.
+
+    Args:
+        node_url: HTTP URL of the node.
+        contract_address: Address of the deployed Auction contract.
+        contract_abi: ABI of the Auction contract.
+        bids_per_bidder: Maximum number of bids each bidder places.
+        min_increment: Minimum bid increment in wei (0.1 ETH by default).
+        max_increment: Maximum bid increment in wei (1 ETH by default).
+        think_time: Seconds each bidder waits between bids.
+        block_interval: If set, automine is disabled and the node mines a block every `block_interval`
+            seconds, so concurrent bids land in the same blocks. Automine is restored afterwards.
+        seed: Seed for the bidders' random number generators.
+
+    Returns:
+        BidMetrics: The collected metrics.
+    """
+    w3 = AsyncWeb3(AsyncHTTPProvider(node_url))
+    contract = w3.eth.contract(address=contract_address, abi=contract_abi)
+    accounts = await w3.eth.accounts
+    metrics = BidMetrics()
+    seeder = random.Random(seed)
+
+    if block_interval is not None:
+        await w3.manager.coro_request('evm_setAutomine', [False])
+        await w3.manager.coro_request('evm_setIntervalMining', [int(block_interval * 1000)])
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*[
+            bidder(w3, contract, account, bids_per_bidder, metrics, random.Random(seeder.random()),
+                   min_increment, max_increment, think_time)
+            for account in accounts
+        ])
+    finally:
+        metrics.elapsed = time.perf_counter() - start
+        if block_interval is not None:
+            await w3.manager.coro_request('evm_setIntervalMining', [0])
+            await w3.manager.coro_request('evm_setAutomine', [True])
+
+    return metrics
+
+
+def run_concurrent_bidding(node_url, contract_address, contract_abi, **kwargs):
+    """
+    Synchronous wrapper around `run_bidders` for use from the sequential simulation.
+
+    Returns:
+        BidMetrics: The collected metrics.
+    """
+    return asyncio.run(run_bidders(node_url, contract_address, contract_abi, **kwargs))
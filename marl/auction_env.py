@@ -0,0 +1,184 @@
+import numpy as np
+import gym
+from gym import spaces
+
+from marl.society_engine import RevertError
+
+# Index of the learning bidder in the auctions' bidders; rivals follow
+AGENT = 0
+NO_BIDDER = -1
+
+
+class InMemoryAuction:
+    """
+    Pure-Python replica of `auction.sol`: bids must arrive before the end time and be strictly
+    higher than the highest bid, the outbid amount is credited to the previous bidder's pending
+    returns, and the auction can be ended once, after the end time. Bidders are integer indices
+    and time is an integer, so no chain or account is involved.
+
+    Attributes:
+        auction_end_time: Time after which bids revert.
+        highest_bidder: Index of the highest bidder, or NO_BIDDER.
+        highest_bid: The highest bid.
+        pending_returns: Outbid amounts that each bidder can withdraw.
+        ended: Whether `auction_end` was called.
+    """
+    def __init__(self, auction_end_time):
+        self.auction_end_time = auction_end_time
+        self.highest_bidder = NO_BIDDER
+        self.highest_bid = 0
+        self.pending_returns = {}
+        self.ended = False
+
+    def bid(self, bidder, value, now):
+        if now > self.auction_end_time:
+            raise RevertError("Auction already ended.")
+        if value <= self.highest_bid:
+            raise RevertError("There already is a higher bid.")
+        if self.highest_bid != 0:
+            self.pending_returns[self.highest_bidder] = self.pending_returns.get(self.highest_bidder, 0) + self.highest_bid
+        self.highest_bidder = bidder
+        self.highest_bid = value
+
+    def withdraw(self, bidder):
+        """
+        Returns the amount sent back to `bidder`.
+        """
+        return self.pending_returns.pop(bidder, 0)
+
+    def auction_end(self, now):
+        if now < self.auction_end_time:
+            raise RevertError("Auction not yet ended.")
+        if self.ended:
+            raise RevertError("auctionEnd has already been called.")
+        self.ended = True
+        return self.highest_bidder, self.highest_bid
+
+
+class AuctionEnv(gym.Env):
+    """
+    Gym Environment of one bidder in an auction following the `auction.sol` rules, simulated in
+    memory so bidding policies can be trained without a node.
+
+    Every step is one time unit of the auction. The agent either passes (action 0) or bids the
+    highest bid raised by `action * bid_increment`; then, if rivals are configured, one randomly
+    chosen rival may outbid it, as in `auction_simulation.run_simulation`. The agent's outbid
+    amounts are withdrawn right away. When the time runs out the auction is ended and the episode is
+    done.
+
+    Rewards: `-bid_cost` for every bid placed, `-failure_penalty` for a bid the agent cannot pay,
+    and `item_worth - highest_bid` at the end if the agent won.
+
+    Attributes:
+        bidding_time: Duration of the auction in steps.
+        initial_funds: Funds of the agent at the start of every auction.
+        bid_increment: Amount by which each action level raises the highest bid.
+        item_worth: Value of the item to the agent; drawn in [5, 50] for every auction when None.
+        n_rivals: Number of rival bidders (none by default).
+        rival_bid_probability: Probability that a rival tries to bid in a step.
+        rival_increment: Range of the amounts by which a rival raises the highest bid.
+        auction: The InMemoryAuction of the current episode.
+        personal_funds: Funds of the agent.
+        action_space: Discrete(n_bid_levels): pass, or raise the highest bid by 1 to n_bid_levels - 1 increments.
+        observation_space: Dict of `time_remaining`, `highest_bid` and `personal_funds`.
+    """
+    def __init__(self, bidding_time=10, initial_funds=100, bid_increment=5, n_bid_levels=4, item_worth=None,
+                 n_rivals=0, rival_bid_probability=0.5, rival_increment=(1, 5), bid_cost=1, failure_penalty=10,
+                 seed=None):
+        super(AuctionEnv, self).__init__()
+        self.bidding_time = bidding_time
+        self.initial_funds = initial_funds
+        self.bid_increment = bid_increment
+        self.item_worth_setting = item_worth
+        self.n_rivals = n_rivals
+        self.rival_bid_probability = rival_bid_probability
+        self.rival_increment = rival_increment
+        self.bid_cost = bid_cost
+        self.failure_penalty = failure_penalty
+        self.rng = np.random.default_rng(seed)
+
+        self.action_space = spaces.Discrete(n_bid_levels)
+        self.observation_space = spaces.Dict({
+            'time_remaining': spaces.Discrete(bidding_time + 1),
+            'highest_bid': spaces.Box(low=0, high=np.inf, shape=(1,), dtype=np.float32),
+            'personal_funds': spaces.Box(low=0, high=initial_funds, shape=(1,), dtype=np.float32),
+        })
+        self.reset()
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        return [seed]
+
+    def reset(self):
+        """
+        Starts a new auction.
+
+        Returns:
+            observation: Dict with the time remaining, the highest bid and the agent's funds.
+        """
+        self.now = 0
+        self.auction = InMemoryAuction(self.bidding_time)
+        self.personal_funds = self.initial_funds
+        self.item_worth = self.item_worth_setting
+        if self.item_worth is None:
+            self.item_worth = int(self.rng.integers(5, 51))
+        # Rivals stop bidding above their own valuation of the item
+        self.rival_valuations = self.item_worth * self.rng.uniform(0.5, 1.5, self.n_rivals)
+        return self.get_observation()
+
+    def step(self, action):
+        """
+        Places the agent's bid (if any), lets a rival respond and advances time by one unit.
+
+        Args:
+            action: 0 to pass, or the number of bid increments to raise the highest bid by.
+
+        Returns:
+            observation: Dict with the time remaining, the highest bid and the agent's funds.
+            reward: The bid cost or failure penalty, plus the surplus of a won auction at the end.
+            done: Whether the auction is over.
+            info: Dictionary with `winner` and `winning_bid` once the auction is over.
+        """
+        reward = 0
+        if action > 0:
+            value = self.auction.highest_bid + int(action) * self.bid_increment
+            try:
+                if value > self.personal_funds:
+                    raise RevertError("Insufficient funds.")
+                self.auction.bid(AGENT, value, self.now)
+                self.personal_funds -= value
+                reward -= self.bid_cost
+            except RevertError:
+                reward -= self.failure_penalty
+
+        if self.n_rivals and self.rng.random() < self.rival_bid_probability:
+            rival = int(self.rng.integers(1, self.n_rivals + 1))
+            value = self.auction.highest_bid + self.rng.uniform(*self.rival_increment)
+            # Like the simulation's bidders, a rival does not outbid itself
+            if rival != self.auction.highest_bidder and value <= self.rival_valuations[rival - 1]:
+                self.auction.bid(rival, value, self.now)
+        self.personal_funds += self.auction.withdraw(AGENT)
+
+        self.now += 1
+        done = self.now >= self.bidding_time
+        info = {}
+        if done:
+            winner, winning_bid = self.auction.auction_end(self.now)
+            if winner == AGENT:
+                reward += self.item_worth - winning_bid
+            info = {'winner': winner, 'winning_bid': winning_bid}
+        return self.get_observation(), reward, done, info
+
+    def get_observation(self):
+        """
+        Returns the current observation of the auction.
+        """
+        return {
+            'time_remaining': self.bidding_time - self.now,
+            'highest_bid': np.array([self.auction.highest_bid], dtype=np.float32),
+            'personal_funds': np.array([self.personal_funds], dtype=np.float32),
+        }
+
+    def render(self, mode='human'):
+        print(f"Time remaining: {self.bidding_time - self.now}, Highest bid: {self.auction.highest_bid} "
+              f"(bidder {self.auction.highest_bidder}), Funds: {self.personal_funds}")
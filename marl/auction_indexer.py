@@ -0,0 +1,265 @@
+import sqlite3
+
+from eth_abi import decode
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+
+from marl.artifacts import load_abi
+
+# Schema of the local index. Amounts are stored exactly as decimal strings (wei does not fit in
+# SQLite integers) and as ether floats for sorting and aggregation.
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS auctions (
+    address TEXT PRIMARY KEY,
+    round INTEGER NOT NULL,
+    last_block INTEGER NOT NULL,
+    last_block_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS bids (
+    auction TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    bidder TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    amount_eth REAL NOT NULL,
+    block_number INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS bids_round ON bids (round);
+CREATE INDEX IF NOT EXISTS bids_bidder ON bids (bidder);
+CREATE INDEX IF NOT EXISTS bids_block ON bids (block_number);
+CREATE TABLE IF NOT EXISTS endings (
+    auction TEXT PRIMARY KEY,
+    round INTEGER NOT NULL,
+    winner TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    amount_eth REAL NOT NULL,
+    block_number INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL
+);
+'''
+
+WEI_PER_ETHER = 10 ** 18
+
+
+class _EventDecoder:
+    """
+    Decoder of one event, precomputed from its ABI entry: the topic hash and the types of its
+    indexed and non-indexed inputs.
+    """
+    def __init__(self, event_abi):
+        self.name = event_abi['name']
+        self.topic = '0x' + event_abi_to_log_topic(event_abi).hex()
+        self.indexed = [(i['name'], i['type']) for i in event_abi['inputs'] if i.get('indexed')]
+        self.data_names = [i['name'] for i in event_abi['inputs'] if not i.get('indexed')]
+        self.data_types = [i['type'] for i in event_abi['inputs'] if not i.get('indexed')]
+
+    def decode(self, log):
+        """
+        Returns the event arguments of a raw log as a dict.
+        """
+        args = dict(zip(self.data_names, decode(self.data_types, bytes(log['data']))))
+        for (name, abi_type), topic in zip(self.indexed, log['topics'][1:]):
+            args[name] = decode([abi_type], bytes(topic))[0]
+        return args
+
+
+def _hex(value):
+    if isinstance(value, str):
+        return value if value.startswith('0x') else '0x' + value
+    return '0x' + bytes(value).hex()
+
+
+class AuctionIndexer:
+    """
+    Indexes the `HighestBidIncreased` and `AuctionEnded` events of every registered Auction
+    contract into a local SQLite database. Logs are fetched in bulk with `eth_getLogs` over block
+    ranges covering all auctions at once, and indexing resumes from the last indexed block, so bid
+    histories can be queried by round, bidder or block without polling contract state.
+
+    The hash of every auction's last indexed block is stored with it, so a persistent index notices
+    when it is reused on another chain (e.g. a restarted Hardhat node redeploying auctions at the
+    same deterministic addresses) and drops the events of the previous one.
+
+    Attributes:
+        w3: The Web3 instance.
+        connection: The SQLite connection holding the index.
+        chunk_size: Number of blocks scanned per `eth_getLogs` request.
+    """
+    def __init__(self, w3, db_path=':memory:', chunk_size=2000, abi=None):
+        """
+        Opens (or creates) the index.
+
+        Args:
+            w3: The Web3 instance.
+            db_path: Path of the SQLite database; in memory by default.
+            chunk_size: Number of blocks scanned per `eth_getLogs` request.
+            abi: The Auction ABI. Defaults to the compiled `auction.sol` artifact.
+        """
+        self.w3 = w3
+        self.chunk_size = chunk_size
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        columns = {row['name'] for row in self.connection.execute('PRAGMA table_info(auctions)')}
+        if 'last_block_hash' not in columns:
+            # Index written before block hashes were stored: its auctions are re-indexed when registered again
+            with self.connection:
+                self.connection.execute('ALTER TABLE auctions ADD COLUMN last_block_hash TEXT')
+
+        if abi is None:
+            abi = load_abi('auction.sol', 'Auction')
+        events = {entry['name']: _EventDecoder(entry) for entry in abi if entry.get('type') == 'event'}
+        self._bid_event = events['HighestBidIncreased']
+        self._end_event = events['AuctionEnded']
+
+    def register_auction(self, address, round_num, from_block=None):
+        """
+        Adds an auction to the set of indexed contracts. An auction already indexed on another
+        chain, whose last indexed block is not part of the current one, is indexed anew: its
+        events from the previous chain are deleted.
+
+        Args:
+            address: The Auction contract address.
+            round_num: The simulation round the auction belongs to.
+            from_block: First block that can hold its events, e.g. its deployment block. Defaults to
+                the current block number.
+        """
+        address = to_checksum_address(address)
+        head = self.w3.eth.block_number
+        row = self.connection.execute(
+            'SELECT last_block, last_block_hash FROM auctions WHERE address = ?', (address,)
+        ).fetchone()
+        if row is not None:
+            if row['last_block'] <= head and self._block_hash(row['last_block']) == row['last_block_hash']:
+                return
+            with self.connection:
+                for table, column in (('bids', 'auction'), ('endings', 'auction'), ('auctions', 'address')):
+                    self.connection.execute(f'DELETE FROM {table} WHERE {column} = ?', (address,))
+
+        if from_block is None:
+            from_block = head
+        with self.connection:
+            self.connection.execute(
+                'INSERT INTO auctions (address, round, last_block, last_block_hash) VALUES (?, ?, ?, ?)',
+                (address, round_num, from_block - 1, self._block_hash(from_block - 1))
+            )
+
+    def _block_hash(self, number):
+        # Block -1 stands for "before genesis", common to every chain
+        if number < 0:
+            return None
+        return _hex(self.w3.eth.get_block(number)['hash'])
+
+    def last_indexed_block(self):
+        """
+        Returns the block up to which every registered auction is indexed, or None if no auction is registered.
+        """
+        return self.connection.execute('SELECT MIN(last_block) FROM auctions').fetchone()[0]
+
+    def sync(self, to_block=None):
+        """
+        Catches up with the chain: scans the blocks after the last indexed one up to `to_block`,
+        in ranges of `chunk_size` blocks, and stores the decoded events.
+
+        Args:
+            to_block: Last block to index. Defaults to the latest block.
+
+        Returns:
+            int: Number of events stored.
+        """
+        from_block = self.last_indexed_block()
+        if from_block is None:
+            return 0
+        from_block += 1
+        if to_block is None:
+            to_block = self.w3.eth.block_number
+
+        rounds = {row['address']: row['round'] for row in self.connection.execute('SELECT address, round FROM auctions')}
+        topics = [[self._bid_event.topic, self._end_event.topic]]
+        stored = 0
+        for start in range(from_block, to_block + 1, self.chunk_size):
+            end = min(start + self.chunk_size - 1, to_block)
+            logs = self.w3.eth.get_logs({
+                'fromBlock': start,
+                'toBlock': end,
+                'address': list(rounds),
+                'topics': topics,
+            })
+            end_hash = self._block_hash(end)
+            with self.connection:
+                stored += self._store(logs, rounds)
+                self.connection.execute('UPDATE auctions SET last_block = ?, last_block_hash = ? WHERE last_block < ?',
+                                        (end, end_hash, end))
+        return stored
+
+    def _store(self, logs, rounds):
+        bids = []
+        endings = []
+        for log in logs:
+            address = to_checksum_address(log['address'])
+            topic = _hex(log['topics'][0])
+            if topic == self._bid_event.topic:
+                args = self._bid_event.decode(log)
+                bids.append((
+                    address, rounds[address], to_checksum_address(args['bidder']), str(args['amount']),
+                    args['amount'] / WEI_PER_ETHER, log['blockNumber'], _hex(log['transactionHash']), log['logIndex']
+                ))
+            elif topic == self._end_event.topic:
+                args = self._end_event.decode(log)
+                endings.append((
+                    address, rounds[address], to_checksum_address(args['winner']), str(args['amount']),
+                    args['amount'] / WEI_PER_ETHER, log['blockNumber'], _hex(log['transactionHash'])
+                ))
+        # Re-scanned ranges (e.g. after registering an older auction) are deduplicated by the keys
+        self.connection.executemany('INSERT OR IGNORE INTO bids VALUES (?, ?, ?, ?, ?, ?, ?, ?)', bids)
+        self.connection.executemany('INSERT OR IGNORE INTO endings VALUES (?, ?, ?, ?, ?, ?, ?)', endings)
+        return len(bids) + len(endings)
+
+    def bids(self, round_num=None, bidder=None, from_block=None, to_block=None):
+        """
+        Returns the indexed bids, in chain order, optionally filtered.
+
+        Args:
+            round_num: Only bids of this round.
+            bidder: Only bids from this address.
+            from_block: Only bids mined at or after this block.
+            to_block: Only bids mined at or before this block.
+
+        Returns:
+            list: One dict per bid (auction, round, bidder, amount in wei, amount_eth, block_number,
+            tx_hash, log_index).
+        """
+        conditions, params = [], []
+        if round_num is not None:
+            conditions.append('round = ?')
+            params.append(round_num)
+        if bidder is not None:
+            conditions.append('bidder = ?')
+            params.append(to_checksum_address(bidder))
+        if from_block is not None:
+            conditions.append('block_number >= ?')
+            params.append(from_block)
+        if to_block is not None:
+            conditions.append('block_number <= ?')
+            params.append(to_block)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self.connection.execute(f'SELECT * FROM bids {where} ORDER BY block_number, log_index', params)
+        return [dict(row, amount=int(row['amount'])) for row in rows]
+
+    def winners(self):
+        """
+        Returns the `AuctionEnded` outcome of every ended auction, by round.
+
+        Returns:
+            list: One dict per ended auction (auction, round, winner, amount in wei, amount_eth,
+            block_number, tx_hash).
+        """
+        rows = self.connection.execute('SELECT * FROM endings ORDER BY round')
+        return [dict(row, amount=int(row['amount'])) for row in rows]
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.connection.close()
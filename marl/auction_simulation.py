@@ -1,57 +1,77 @@
-import time
-import subprocess
 import random
-from web3 import Web3
-import json
+import argparse
 
-# Set up web3 connection to local Hardhat node
-web3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+from marl.artifacts import ensure_compiled, load_abi
+from marl.auction_env import AuctionEnv
+from marl.backends import BACKENDS, make_web3
+from marl.clock import VirtualClock
+from marl.hardhat_rpc import HardhatChain
+from marl.rpc_metrics import instrument
+from marl.view_cache import cache_views
 
-def compile_and_get_abi():
+# web3 is imported where it is first used, so importing this module does not connect to a node.
+
+node_url = 'http://127.0.0.1:8545'
+
+# Set by `connect`
+web3 = None
+rpc_metrics = None  # RpcMetrics of `web3` (see `marl.rpc_metrics`)
+view_cache = None  # ViewCache of `web3` (see `marl.view_cache`)
+
+def connect(url=node_url, backend='http'):
     """
-    Compiles the Auction contract using Hardhat and retrieves the ABI.
-    
-    Returns:
-        dict: The ABI of the compiled Auction contract.
+    Sets up the web3 connection to the Hardhat node used by the simulation. Every request to the
+    node is recorded in `rpc_metrics`, and view calls are cached in `view_cache`.
+
+    Args:
+        url: HTTP URL of the node.
+        backend: 'http' for the node at `url`, or 'eth-tester' for a fresh in-process chain (see
+            `marl.backends`), which has no URL.
     """
-    # Run Hardhat compilation task
-    subprocess.run(["npx", "hardhat", "compile"], check=True)
+    global web3, node_url, rpc_metrics, view_cache
 
-    # Load ABI from the newly generated artifact
-    with open('../artifacts/contracts/auction.sol/Auction.json', 'r') as abi_file:
-        contract_json = json.load(abi_file)
-        contract_abi = contract_json['abi']
+    node_url = url if backend == 'http' else None
+    web3 = make_web3(backend, url)
+    rpc_metrics = instrument(web3)
+    view_cache = cache_views(web3)
 
-    return contract_abi
+def compile_and_get_abi():
+    """
+    Returns the ABI of the Auction contract. The contracts are only recompiled with Hardhat when
+    their sources or solc settings changed since the last compilation (see `marl.artifacts`).
+
+    Returns:
+        list: The ABI of the compiled Auction contract.
+    """
+    ensure_compiled()
+    return load_abi('auction.sol', 'Auction')
 
 def deploy_contract():
     """
-    Deploys the auction contract using a Hardhat script.
+    Deploys the auction contract in-process from its compiled Hardhat artifact, with a 30 second
+    bidding time and a freshly generated beneficiary (as `scripts/auction.ts` does).
 
     Returns:
-        str: The deployed contract's address.
-
-    Raises:
-        Exception: If the contract address cannot be captured from the deployment output.
+        tuple: The deployed contract's address and the number of the block it was deployed in.
     """
-    # Run the Hardhat deployment script and capture the output
-    result = subprocess.run(
-        ["npx", "hardhat", "run", "../scripts/auction.ts", "--network", "localhost"],
-        capture_output=True, text=True
-    )
-    output = result.stdout
+    from marl.deployer import deploy_auction
+    contract, receipt = deploy_auction(web3, bidding_time=30, with_receipt=True)
+    return contract.address, receipt['blockNumber']
 
-    # Extract the contract address from the output
-    contract_address = None
-    for line in output.splitlines():
-        if "Auction deployed to:" in line:
-            contract_address = line.split(": ")[1].strip()
-            break
+def get_auction_state(auction_contract, block_identifier=None):
+    """
+    Reads all public state of the auction (beneficiary, auctionEndTime, highestBidder, highestBid, ended)
+    in a single batch request pinned to one block.
 
-    if not contract_address:
-        raise Exception("Failed to deploy contract and capture contract address.")
+    Args:
+        auction_contract: The auction contract instance.
+        block_identifier: Block number to read at, e.g. from the last bid's receipt. Defaults to the latest block.
 
-    return contract_address
+    Returns:
+        dict: Getter name to value, plus `blockNumber`.
+    """
+    from marl.batch_reads import read_public_state
+    return read_public_state(auction_contract, block_identifier)
 
 def auction_is_active(auction_contract):
     """
@@ -65,34 +85,33 @@ def auction_is_active(auction_contract):
     """
     return not auction_contract.functions.ended().call()
 
-def wait_for_auction_end(auction_contract):
+def wait_for_auction_end(auction_contract, clock):
     """
     Waits until the auction ends by comparing the current time with the auction end time.
 
     Args:
         auction_contract: The auction contract instance.
+        clock: The clock used to wait (a VirtualClock fast-forwards chain time instead of sleeping).
     """
     auction_end_time = auction_contract.functions.auctionEndTime().call()
-    current_time = web3.eth.get_block('latest')['timestamp']
-    
-    if current_time < auction_end_time:
-        wait_time = auction_end_time - current_time
-        print(f"Waiting for {wait_time} seconds until auction ends...")
-        time.sleep(wait_time + 1)  # Wait a bit more to ensure the auction has ended
+    print(f"Waiting until auction end time {auction_end_time}...")
+    clock.wait_until(auction_end_time)
 
-def get_auction_winner(auction_contract):
+def get_auction_winner(auction_contract, block_identifier=None):
     """
     Retrieves the highest bidder and the highest bid from the auction contract.
 
     Args:
         auction_contract: The auction contract instance.
+        block_identifier: Block number to read at, e.g. the one the auction was ended in. Defaults to
+            the latest block, which costs an extra round trip for its number.
 
     Returns:
         tuple: The address of the highest bidder and the value of the highest bid.
     """
-    highest_bidder = auction_contract.functions.highestBidder().call()
-    highest_bid = auction_contract.functions.highestBid().call()
-    return highest_bidder, highest_bid
+    from marl.batch_reads import read_public_state
+    state = read_public_state(auction_contract, block_identifier, getters=['highestBidder', 'highestBid'])
+    return state['highestBidder'], state['highestBid']
 
 def generate_dynamic_bid(current_highest_bid, min_increment, max_increment):
     """
@@ -110,80 +129,133 @@ def generate_dynamic_bid(current_highest_bid, min_increment, max_increment):
     new_bid = current_highest_bid + increment
     return new_bid
 
-def run_simulation():
+def run_simulation(clock=None, concurrent=False, rounds=5, bids_per_round=25, index_db=None, bidders=None):
     """
     Runs the auction simulation across multiple rounds.
     Deploys the auction contract, places bids, waits for auction to end, and announces the winner.
+    The RPC latency and gas metrics are printed at the end; concurrent bidding uses its own
+    connection, which is not recorded.
+
+    Args:
+        clock: The clock used for delays between bids and rounds and for waiting on the auction end.
+            Defaults to a VirtualClock, which fast-forwards the Hardhat node's time instead of sleeping;
+            pass a WallClock to run in real time.
+        concurrent: If True, every account bids as an independent asyncio coroutine (see
+            `marl.async_auction`) and the bids race into shared blocks, instead of one bid at a time.
+            Needs a node reachable over HTTP.
+        rounds: Number of auctions to run, one after the other.
+        bids_per_round: Number of bid attempts per auction when not bidding concurrently.
+        index_db: Path of a SQLite database the auctions' events are indexed into after every round
+            (see `marl.auction_indexer`). No indexing when None.
+        bidders: Number of bidders, drawn from generated local accounts whose bids are signed
+            in-process (see `marl.key_pool`). Defaults to the node's unlocked accounts. Concurrent
+            bidding always uses the node's accounts.
     """
+    if web3 is None:
+        connect()
+    if concurrent and node_url is None:
+        raise ValueError("Concurrent bidding connects to the node over HTTP; use the 'http' backend")
+    if clock is None:
+        clock = VirtualClock(HardhatChain(web3))
+
     # Compile the contract and retrieve its ABI
     contract_abi = compile_and_get_abi()
+    rpc_metrics.register_abi(contract_abi, 'Auction')
+    accounts = web3.eth.accounts
+
+    key_pool = None
+    if bidders is not None and not concurrent:
+        from marl.key_pool import KeyPool
+        from marl.async_auction import BID_GAS
+        key_pool = KeyPool(web3, bidders)
+        key_pool.fund()
+        accounts = key_pool.addresses
+
+    indexer = None
+    if index_db is not None:
+        from marl.auction_indexer import AuctionIndexer
+        indexer = AuctionIndexer(web3, index_db, abi=contract_abi)
 
     # Example item worths for each round, in wei
-    item_worths = [
-        web3.to_wei(random.randint(5, 50), 'ether'),
-        web3.to_wei(random.randint(5, 50), 'ether'),
-        web3.to_wei(random.randint(5, 50), 'ether'),
-        web3.to_wei(random.randint(5, 50), 'ether'),
-        web3.to_wei(random.randint(5, 50), 'ether')
-    ]
-
-    for round_num in range(5):
+    item_worths = [web3.to_wei(random.randint(5, 50), 'ether') for _ in range(rounds)]
+
+    for round_num in range(rounds):
         print(f"Starting round {round_num + 1}")
 
         # Deploy a new auction contract and get the contract address
-        contract_address = deploy_contract()
+        contract_address, deploy_block = deploy_contract()
         print(f"Auction contract deployed at {contract_address} for round {round_num + 1}")
+        if indexer is not None:
+            indexer.register_auction(contract_address, round_num + 1)
 
         # Initialize contract instance
         auction_contract = web3.eth.contract(address=contract_address, abi=contract_abi)
+        view_cache.mark_immutable(auction_contract, 'auctionEndTime', 'beneficiary')
 
         item_worth = item_worths[round_num]
         print(f"Item worth for round {round_num + 1}: {web3.from_wei(item_worth, 'ether')} ETH")
 
-        for bid_num in range(25):
-            if auction_is_active(auction_contract):
-                current_highest_bid = auction_contract.functions.highestBid().call()
-                current_highest_bidder = auction_contract.functions.highestBidder().call()
-
-                # Randomly select an account for bidding
-                chosen_account = random.choice(web3.eth.accounts)
-
-                # Check if the chosen account is already the highest bidder
-                if chosen_account == current_highest_bidder:
-                    print(f"Skipping bid {bid_num + 1}: {chosen_account} is already the highest bidder.")
-                    continue
-
-                new_bid = generate_dynamic_bid(
-                    current_highest_bid,
-                    web3.to_wei(0.1, 'ether'),
-                    web3.to_wei(1, 'ether')
-                )
-
-                # Log a warning if the bid exceeds the item's worth
-                if new_bid > item_worth:
-                    print(f"Warning: Bid {web3.from_wei(new_bid, 'ether')} ETH exceeds the item worth of {web3.from_wei(item_worth, 'ether')} ETH.")
-
-                print(f"Placing Bid {bid_num + 1} with value {web3.from_wei(new_bid, 'ether')} ETH from account {chosen_account}")
-
-                # Set the chosen account as the default account for the transaction
-                web3.eth.default_account = chosen_account
-                tx_hash = auction_contract.functions.bid().transact({
-                    'from': web3.eth.default_account,
-                    'value': int(new_bid)
-                })
-                web3.eth.wait_for_transaction_receipt(tx_hash)
-                print(f"Bid {bid_num + 1} placed by {chosen_account} with value {web3.from_wei(new_bid, 'ether')} ETH")
-
-                # Simulate a short delay before the next bid
-                time.sleep(1)
-            else:
-                print(f"Auction ended before bid {bid_num + 1}. Finalizing auction.")
-                break  # Exit the bidding loop since the auction has ended
+        if concurrent:
+            from marl.async_auction import run_concurrent_bidding
+            metrics = run_concurrent_bidding(node_url, contract_address, contract_abi, block_interval=1)
+            print(f"Concurrent bidding for round {round_num + 1}: {metrics.summary()}")
+            # The bids were sent from another connection, unseen by the cache
+            view_cache.invalidate()
+        else:
+            # Block of the last confirmed transaction; state is read pinned to it to save a block number lookup
+            last_block = deploy_block
+
+            for bid_num in range(bids_per_round):
+                state = get_auction_state(auction_contract, last_block)
+                if not state['ended']:
+                    current_highest_bid = state['highestBid']
+                    current_highest_bidder = state['highestBidder']
+
+                    # Randomly select an account for bidding
+                    chosen_account = random.choice(accounts)
+
+                    # Check if the chosen account is already the highest bidder
+                    if chosen_account == current_highest_bidder:
+                        print(f"Skipping bid {bid_num + 1}: {chosen_account} is already the highest bidder.")
+                        continue
+
+                    new_bid = generate_dynamic_bid(
+                        current_highest_bid,
+                        web3.to_wei(0.1, 'ether'),
+                        web3.to_wei(1, 'ether')
+                    )
+
+                    # Log a warning if the bid exceeds the item's worth
+                    if new_bid > item_worth:
+                        print(f"Warning: Bid {web3.from_wei(new_bid, 'ether')} ETH exceeds the item worth of {web3.from_wei(item_worth, 'ether')} ETH.")
+
+                    print(f"Placing Bid {bid_num + 1} with value {web3.from_wei(new_bid, 'ether')} ETH from account {chosen_account}")
+
+                    if key_pool is not None:
+                        tx_hash = key_pool.transact(auction_contract.functions.bid(), chosen_account,
+                                                    value=int(new_bid), gas=BID_GAS)
+                    else:
+                        # Set the chosen account as the default account for the transaction
+                        web3.eth.default_account = chosen_account
+                        tx_hash = auction_contract.functions.bid().transact({
+                            'from': web3.eth.default_account,
+                            'value': int(new_bid)
+                        })
+                    receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+                    last_block = receipt['blockNumber']
+                    print(f"Bid {bid_num + 1} placed by {chosen_account} with value {web3.from_wei(new_bid, 'ether')} ETH")
+
+                    # Simulate a short delay before the next bid
+                    clock.sleep(1)
+                else:
+                    print(f"Auction ended before bid {bid_num + 1}. Finalizing auction.")
+                    break  # Exit the bidding loop since the auction has ended
 
         # Wait until the auction naturally ends
-        wait_for_auction_end(auction_contract)
+        wait_for_auction_end(auction_contract, clock)
 
-        # Ensure the auction is ended
+        # Ensure the auction is ended; the winner is read at the block it was ended in when known
+        end_block = None
         if auction_is_active(auction_contract):
             print("Attempting to end the auction.")
             web3.eth.default_account = web3.eth.accounts[0]
@@ -191,18 +263,54 @@ def run_simulation():
                 'from': web3.eth.default_account,
                 'gas': 2000000
             })
-            web3.eth.wait_for_transaction_receipt(tx_hash)
+            end_block = web3.eth.wait_for_transaction_receipt(tx_hash)['blockNumber']
             print(f"Auction ended for round {round_num + 1}.")
 
         # After the auction ends, display the winner
         if not auction_is_active(auction_contract):
-            winner, winning_bid = get_auction_winner(auction_contract)
+            winner, winning_bid = get_auction_winner(auction_contract, end_block)
             print(f"The winner of round {round_num + 1} is {winner} with a bid of {web3.from_wei(winning_bid, 'ether')} ETH.")
         else:
             print("Auction is still active, no winner to display yet.")
 
+        if indexer is not None:
+            indexer.sync()
+            print(f"Indexed {len(indexer.bids(round_num=round_num + 1))} bids for round {round_num + 1}.")
+
         # Short pause before starting the next round
-        time.sleep(5)
+        clock.sleep(5)
+
+    if indexer is not None:
+        indexer.close()
+    if key_pool is not None:
+        key_pool.close()
+    print(rpc_metrics.summary())
+    print(f"View cache: {view_cache.summary()}")
+
+def main(argv=None):
+    """
+    Command line entry point: `python -m marl.auction_simulation`.
+    """
+    parser = argparse.ArgumentParser(description="Run the auction simulation.")
+    parser.add_argument('--iterations', type=int, default=5, help="Number of auction rounds")
+    parser.add_argument('--bids', type=int, default=25, help="Bid attempts per round")
+    parser.add_argument('--node-url', default=node_url, help="HTTP URL of the Hardhat node")
+    parser.add_argument('--backend', choices=BACKENDS, default='http',
+                        help="Chain to run on: the Hardhat node at --node-url, or an in-process EVM")
+    parser.add_argument('--concurrent', action='store_true', help="Bid from every account concurrently")
+    parser.add_argument('--index-db', help="SQLite database to index the auctions' bid and end events into")
+    parser.add_argument('--bidders', type=int, help="Number of generated bidder accounts, signed locally (default: the node's accounts)")
+    parser.add_argument('--rpc-metrics', metavar='PATH', help="Write the RPC latency and gas metrics to this JSON file at the end")
+    parser.add_argument('--prometheus-port', type=int, help="Serve the RPC metrics to Prometheus on this port while running")
+    args = parser.parse_args(argv)
+
+    connect(args.node_url, backend=args.backend)
+    if args.prometheus_port:
+        rpc_metrics.serve(args.prometheus_port)
+    run_simulation(concurrent=args.concurrent, rounds=args.iterations, bids_per_round=args.bids, index_db=args.index_db,
+                   bidders=args.bidders)
+    if args.rpc_metrics:
+        rpc_metrics.to_json(args.rpc_metrics)
 
 if __name__ == "__main__":
-    run_simulation()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,220 @@
+BACKENDS = ('http', 'eth-tester')
+default_node_url = 'http://127.0.0.1:8545'
+
+# Accounts of a fresh Hardhat node: the same mnemonic and derivation path give the same addresses
+# and keys, so contracts deployed by the first account also get the same addresses
+HARDHAT_MNEMONIC = 'test test test test test test test test test test test junk'
+HARDHAT_HD_PATH = "m/44'/60'/0'/0"
+HARDHAT_ACCOUNTS = 20
+HARDHAT_BALANCE = 10000 * 10 ** 18
+
+# InProcessNode reaches into eth-tester and py-evm internals (the undecorated sending methods, the
+# pending block header); it was written against these releases, pinned in requirements-eth-tester.txt
+ETH_TESTER_VERSION = '0.14.0b1'
+PY_EVM_VERSION = '0.12.1b1'
+
+
+def _to_int(value):
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def _undecorated(method):
+    try:
+        return method.__wrapped__
+    except AttributeError:
+        raise RuntimeError(
+            f"EthereumTester.{method.__name__} is no longer a decorated method, which InProcessNode needs for "
+            f"manual mining; install eth-tester=={ETH_TESTER_VERSION} and py-evm=={PY_EVM_VERSION}"
+        ) from None
+
+
+class InProcessNode:
+    """
+    In-process EVM (eth-tester on py-evm) standing in for a local Hardhat node. It starts with the
+    Hardhat node's funded accounts and answers the development RPC methods the simulations use
+    (`evm_mine`, `evm_increaseTime`, `evm_setNextBlockTimestamp`, `evm_setAutomine`, `evm_snapshot`,
+    `evm_revert`, `hardhat_setBalance` and `hardhat_dropTransaction`), so HardhatChain, VirtualClock
+    and TickMiner work on it unchanged. Every node is an isolated chain, and any number of them can
+    live in one process.
+
+    Blocks are one second apart unless time is moved forward: chain time does not follow the wall
+    clock, so simulations on this backend should use a VirtualClock.
+
+    Attributes:
+        tester: The EthereumTester holding the chain.
+        automine: Whether every transaction is mined in its own block as soon as it is sent. When
+            off, sent transactions are executed in the pending block until `evm_mine` is called;
+            gas is estimated on the latest block, so they should carry an explicit gas limit, as
+            the ones of TickMiner and `bulk_transact` do.
+        time_offset: Seconds added to chain time with `evm_increaseTime` so far.
+    """
+    def __init__(self, accounts=HARDHAT_ACCOUNTS, balance=HARDHAT_BALANCE):
+        """
+        Initializes a fresh chain.
+
+        Args:
+            accounts: Number of funded accounts.
+            balance: Balance of every account, in wei.
+
+        Raises:
+            RuntimeError: If the installed eth-tester lacks the internals this node relies on (see
+                `ETH_TESTER_VERSION`).
+        """
+        from eth_tester import EthereumTester, PyEVMBackend
+        from web3.providers.eth_tester.defaults import API_ENDPOINTS
+
+        backend = PyEVMBackend.from_mnemonic(
+            HARDHAT_MNEMONIC, num_accounts=accounts, hd_path=HARDHAT_HD_PATH,
+            genesis_state_overrides={'balance': balance}
+        )
+        self.tester = EthereumTester(backend)
+        self.automine = True
+        self.time_offset = 0
+        # Sending with automine, which mines a block per transaction
+        self._send_mined = {name: API_ENDPOINTS['eth'][name] for name in ('sendTransaction', 'sendRawTransaction')}
+        # eth-tester's own manual mining re-validates every queued transaction against the latest
+        # block, which rejects a sender's second nonce. The undecorated methods execute the
+        # transaction in the pending block instead, which then behaves like Hardhat's mempool.
+        self._send_pending = {
+            'sendTransaction': _undecorated(EthereumTester.send_transaction),
+            'sendRawTransaction': _undecorated(EthereumTester.send_raw_transaction),
+        }
+
+    @property
+    def chain(self):
+        # The py-evm chain; its `header` is the pending block's. Replaced by reverts to genesis.
+        return self.tester.backend.chain
+
+    def web3(self):
+        """
+        Returns a new Web3 instance connected to this chain.
+        """
+        from web3 import Web3, EthereumTesterProvider
+        return Web3(EthereumTesterProvider(self.tester, api_endpoints=self.endpoints()))
+
+    def endpoints(self):
+        """
+        Returns the RPC endpoints of EthereumTesterProvider, with `evm_mine` and the sending of
+        transactions following this node's mining mode, and Hardhat's development methods added.
+        """
+        from web3.providers.eth_tester.defaults import API_ENDPOINTS
+
+        endpoints = {namespace: dict(methods) for namespace, methods in API_ENDPOINTS.items()}
+        endpoints['eth'].update(
+            sendTransaction=self._send_transaction,
+            sendRawTransaction=self._send_raw_transaction,
+        )
+        endpoints['evm'].update(
+            mine=self._mine,
+            increaseTime=self._increase_time,
+            setNextBlockTimestamp=self._set_next_block_timestamp,
+            setAutomine=self._set_automine,
+            snapshot=self._snapshot,
+            revert=self._revert,
+        )
+        endpoints['hardhat'] = {
+            'setBalance': self._set_balance,
+            'dropTransaction': self._drop_transaction,
+        }
+        return endpoints
+
+    def _send_transaction(self, tester, params):
+        if self.automine:
+            return self._send_mined['sendTransaction'](tester, params)
+        transaction = params[0]
+        if 'nonce' not in transaction:
+            # eth-tester would take the nonce from the latest block, before the pending transactions
+            from eth_utils import to_canonical_address
+            state = self.chain.get_vm().state
+            transaction = dict(transaction, nonce=state.get_nonce(to_canonical_address(transaction['from'])))
+        return self._send_pending['sendTransaction'](tester, transaction)
+
+    def _send_raw_transaction(self, tester, params):
+        if self.automine:
+            return self._send_mined['sendRawTransaction'](tester, params)
+        return self._send_pending['sendRawTransaction'](tester, params[0])
+
+    def _mine(self, tester, params):
+        if params:
+            self._set_next_block_timestamp(tester, params[:1])
+        tester.mine_blocks(1)
+        return '0x0'
+
+    def _increase_time(self, tester, params):
+        seconds = _to_int(params[0])
+        self.chain.header = self.chain.header.copy(timestamp=self.chain.header.timestamp + seconds)
+        self.time_offset += seconds
+        return self.time_offset
+
+    def _set_next_block_timestamp(self, tester, params):
+        timestamp = _to_int(params[0])
+        latest = tester.get_block_by_number('latest')['timestamp']
+        if timestamp <= latest:
+            raise ValueError(f"Timestamp {timestamp} is lower than or equal to previous block's timestamp {latest}")
+        self.chain.header = self.chain.header.copy(timestamp=timestamp)
+        return True
+
+    def _set_automine(self, tester, params):
+        self.automine = bool(params[0])
+        return True
+
+    def _snapshot(self, tester, params):
+        # The provider's middleware turns the id into hex, as Hardhat returns it
+        return tester.take_snapshot()
+
+    def _revert(self, tester, params):
+        from eth_tester.exceptions import SnapshotNotFound
+        try:
+            tester.revert_to_snapshot(_to_int(params[0]))
+        except SnapshotNotFound:
+            return False
+        return True
+
+    def _set_balance(self, tester, params):
+        from eth_utils import to_canonical_address
+
+        address, balance = params
+        state = self.chain.get_vm().state
+        state.set_balance(to_canonical_address(address), _to_int(balance))
+        state.persist()
+        self.chain.header = self.chain.header.copy(state_root=state.state_root)
+        return True
+
+    def _drop_transaction(self, tester, params):
+        from eth_utils import to_bytes
+
+        tx_hash = to_bytes(hexstr=params[0])
+        chain = self.chain
+        pending = chain.get_block().transactions
+        kept = [transaction for transaction in pending if transaction.hash != tx_hash]
+        if len(kept) == len(pending):
+            return False
+        # Transactions are executed when sent, so the pending block is rebuilt without this one
+        header = chain.create_header_from_parent(chain.get_canonical_head())
+        chain.header = header.copy(timestamp=chain.header.timestamp)
+        for transaction in kept:
+            chain.apply_transaction(transaction)
+        return True
+
+
+def make_web3(backend='http', node_url=default_node_url):
+    """
+    Connects to the chain a simulation runs on.
+
+    Args:
+        backend: 'http' for the node at `node_url` (e.g. `npx hardhat node`), or 'eth-tester' for
+            a fresh InProcessNode, which needs no separate process.
+        node_url: HTTP URL of the node, for the 'http' backend.
+
+    Returns:
+        Web3: The connection.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend == 'http':
+        from web3 import Web3
+        return Web3(Web3.HTTPProvider(node_url))
+    if backend == 'eth-tester':
+        return InProcessNode().web3()
+    raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
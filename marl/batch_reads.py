@@ -0,0 +1,99 @@
+from web3.exceptions import Web3TypeError
+
+
+def batch_call(w3, calls, block_identifier=None):
+    """
+    Executes several contract view calls in a single JSON-RPC batch request, all pinned to the
+    same block so the returned values are mutually consistent.
+
+    Args:
+        w3: The Web3 instance.
+        calls: Bound contract functions, e.g. `[auction.functions.highestBid(), dao.functions.proposals(3)]`.
+        block_identifier: Block number to read at. Defaults to the latest block number, fetched
+            first so every call sees the same state: a call's block cannot depend on another
+            request of the same batch, so this costs a separate `eth_blockNumber` round trip.
+            Callers that know the block to read at (e.g. from the last receipt) should pass it.
+
+    Returns:
+        tuple: The block number read at and the list of decoded results, in the order of `calls`.
+    """
+    if block_identifier is None:
+        block_identifier = w3.eth.block_number
+
+    try:
+        batch = w3.batch_requests()
+    except Web3TypeError:
+        # Providers without JSON-RPC batching (e.g. in-process testers) fall back to one call each
+        return block_identifier, [call.call(block_identifier=block_identifier) for call in calls]
+
+    with batch:
+        for call in calls:
+            batch.add(call.call(block_identifier=block_identifier))
+        results = batch.execute()
+    return block_identifier, list(results)
+
+
+def batch_receipts(w3, tx_hashes):
+    """
+    Fetches the receipts of several transactions in a single JSON-RPC batch request.
+
+    Args:
+        w3: The Web3 instance.
+        tx_hashes: The transaction hashes.
+
+    Returns:
+        list: The receipts, in the order of `tx_hashes`.
+    """
+    if not tx_hashes:
+        return []
+    try:
+        batch = w3.batch_requests()
+    except Web3TypeError:
+        return [w3.eth.get_transaction_receipt(tx_hash) for tx_hash in tx_hashes]
+
+    with batch:
+        for tx_hash in tx_hashes:
+            batch.add(w3.eth.get_transaction_receipt(tx_hash))
+        results = batch.execute()
+    return list(results)
+
+
+def public_getters(contract):
+    """
+    Lists the argument-free view functions of a contract, i.e. its public state variables and
+    simple getters such as `highestBid`, `ended` or `getTotalResources`.
+
+    Args:
+        contract: A Web3 contract object.
+
+    Returns:
+        list: The function names, in ABI order.
+    """
+    return [
+        entry['name'] for entry in contract.abi
+        if entry.get('type') == 'function'
+        and entry.get('stateMutability') in ('view', 'pure')
+        and not entry.get('inputs')
+    ]
+
+
+def read_public_state(contract, block_identifier=None, getters=None):
+    """
+    Reads all public state of a contract in one batch request pinned to one block.
+
+    Args:
+        contract: A Web3 contract object.
+        block_identifier: Block number to read at (e.g. the block of the last receipt). Defaults to the
+            latest block, which costs an extra round trip (see `batch_call`).
+        getters: Optional subset of getter names to read. Defaults to every argument-free view function.
+
+    Returns:
+        dict: Getter name to value, plus `blockNumber` with the block the state was read at.
+    """
+    if getters is None:
+        getters = public_getters(contract)
+    calls = [contract.get_function_by_name(name)() for name in getters]
+    block_number, results = batch_call(contract.w3, calls, block_identifier)
+    state = dict(zip(getters, results))
+    state['blockNumber'] = block_number
+    return state
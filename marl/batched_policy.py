@@ -0,0 +1,58 @@
+import numpy as np
+
+
+class DecisionStage:
+    """
+    Decides the actions of every agent of a tick with a single batched forward pass of the policy,
+    instead of one `model.predict` call (and one numpy-to-tensor conversion) per agent.
+
+    Agents sharing the same observation (in the decentralized society they all observe the same
+    pool) are deduplicated, so the forward pass only covers the distinct observations of the tick
+    and its cost stays flat as the number of agents grows.
+
+    Attributes:
+        model: The stable_baselines3 model (or any object with a batched `predict(obs, deterministic)`).
+        deterministic: Whether greedy actions are taken.
+    """
+    def __init__(self, model, deterministic=True):
+        """
+        Initializes the decision stage.
+
+        Args:
+            model: The model used to decide the agents' actions.
+            deterministic: Whether greedy actions are taken.
+        """
+        self.model = model
+        self.deterministic = deterministic
+
+    def decide(self, observations):
+        """
+        Returns one action per observation, computed in one forward pass over the distinct observations.
+
+        Args:
+            observations: Array-like of shape (n_agents, *observation_shape).
+
+        Returns:
+            numpy.ndarray: The actions, of shape (n_agents,).
+        """
+        observations = np.asarray(observations, dtype=np.float32)
+        if len(observations) == 0:
+            return np.empty(0, dtype=np.int64)
+        unique, inverse = np.unique(observations, axis=0, return_inverse=True)
+        actions, _ = self.model.predict(unique, deterministic=self.deterministic)
+        return np.asarray(actions)[inverse.reshape(-1)]
+
+    def decide_shared(self, observation, n_agents):
+        """
+        Returns the actions of `n_agents` agents that all observe the same state.
+
+        Args:
+            observation: The shared observation.
+            n_agents: Number of agents.
+
+        Returns:
+            numpy.ndarray: The actions, of shape (n_agents,).
+        """
+        observation = np.asarray(observation, dtype=np.float32)
+        actions, _ = self.model.predict(observation[np.newaxis], deterministic=self.deterministic)
+        return np.full(n_agents, np.asarray(actions)[0])
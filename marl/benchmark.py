@@ -0,0 +1,423 @@
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from marl.artifacts import is_compiled, project_root
+
+# Bump when a benchmark's workload changes, so results are never compared with a baseline that
+# measured something else
+BENCHMARK_VERSION = 2
+
+default_baseline_path = os.path.join(project_root, 'benchmarks', 'baseline.json')
+
+# `memory` runs on the pure-Python contract replicas; `evm` deploys the compiled contracts on an
+# in-process eth-tester chain (py-evm), with the same bytecode as on the Hardhat node
+BACKENDS = ('memory', 'evm')
+
+DEFAULT_THRESHOLD = 0.1
+
+
+class _InMemoryEth:
+    # Transactions of the in-memory contracts execute (or raise) when sent
+    @staticmethod
+    def wait_for_transaction_receipt(tx_hash):
+        return {'status': 1, 'transactionHash': tx_hash}
+
+
+class _InMemoryWeb3:
+    eth = _InMemoryEth()
+
+
+class _TimedSink:
+    """
+    MetricsSink wrapper recording when every row (one simulation tick) is appended and how many
+    agents acted in it.
+    """
+    def __init__(self, sink):
+        self.sink = sink
+        self.times = [time.perf_counter()]
+        self.transactions = 0
+
+    def append(self, **row):
+        self.times.append(time.perf_counter())
+        self.transactions += sum(key.endswith('_action') and value >= 0 for key, value in row.items())
+        self.sink.append(**row)
+
+
+# Module globals of `decentralized_society_with_agents` set by `bench_simulate`, and its action
+# counters, updated in place by the agents
+_SIMULATION_GLOBALS = ('w3', 'resource_pool', 'farmer', 'builder', 'trader', 'accounts', 'env', 'rpc_metrics',
+                       'iterations', 'model', 'farmer_agent', 'builder_agent', 'trader_agent', 'agents',
+                       'decision_stage')
+_SIMULATION_COUNTERS = ('efficient_actions', 'selfish_actions')
+
+
+def _evm_web3():
+    from marl.backends import make_web3
+    return make_web3('eth-tester')
+
+
+def _throughput(steps, elapsed, unit='steps'):
+    return {f'{unit}_per_second': steps / elapsed, 'elapsed_seconds': elapsed, unit: steps}
+
+
+def bench_society_env(backend, n):
+    """
+    Steps DecentralizedSocietyEnv with random actions, resetting at the end of every episode.
+    """
+    from marl.society_env import make_chain_env, make_in_memory_env
+
+    if backend == 'memory':
+        env = make_in_memory_env(initial_resources=100)
+    else:
+        from marl.deployer import deploy_society
+        w3 = _evm_web3()
+        env = make_chain_env(w3, deploy_society(w3), verbose=False)
+    actions = np.random.default_rng(0).integers(0, 8, n)
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _ = env.step(int(action))
+        if done:
+            env.reset()
+    return _throughput(n, time.perf_counter() - start)
+
+
+def bench_dao_env(backend, n):
+    """
+    Steps SimulatedDAOVotingEnv (`memory`) or DAOVotingEnv on a deployed DAO with one open
+    proposal per step (`evm`).
+    """
+    from marl.dao_simulation import DAOVotingEnv, SimulatedDAOVotingEnv
+
+    if backend == 'memory':
+        env = SimulatedDAOVotingEnv()
+    else:
+        from marl.deployer import deploy_dao
+        w3 = _evm_web3()
+        contract = deploy_dao(w3)
+        for i in range(n + 1):
+            w3.eth.wait_for_transaction_receipt(
+                contract.functions.propose(f"Proposal {i}", "Benchmark").transact({'from': w3.eth.accounts[0]}))
+        env = DAOVotingEnv(contract, account=w3.eth.accounts[1])
+    start = time.perf_counter()
+    for i in range(n):
+        env.reset()
+        env.step(i % 2)
+    return _throughput(n, time.perf_counter() - start)
+
+
+def bench_auction_env(backend, n):
+    """
+    Steps AuctionEnv against rivals with random actions, resetting at the end of every auction.
+    Memory only: the environment has no chain counterpart.
+    """
+    from marl.auction_env import AuctionEnv
+    env = AuctionEnv(n_rivals=5, seed=0)
+    actions = np.random.default_rng(0).integers(0, env.action_space.n, n)
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _ = env.step(int(action))
+        if done:
+            env.reset()
+    return _throughput(n, time.perf_counter() - start)
+
+
+def bench_auction_bids(backend, n):
+    """
+    The bid loop of `auction_simulation.run_simulation`: read the auction state, bid from a
+    random account that is not the highest bidder, and wait for the receipt. On `evm` the state is
+    read pinned to the last bid's block from a deployed auction; on `memory` the same loop runs on
+    the InMemoryAuction replica, with the Hardhat node's number of accounts.
+    """
+    import random
+    from marl.auction_simulation import generate_dynamic_bid
+
+    rng = random.Random(0)
+    min_increment, max_increment = 10 ** 15, 10 ** 16  # 0.001 to 0.01 ether
+    if backend == 'memory':
+        from marl.auction_env import InMemoryAuction
+        from marl.backends import HARDHAT_ACCOUNTS
+
+        auction = InMemoryAuction(auction_end_time=10 ** 6)
+        accounts = list(range(HARDHAT_ACCOUNTS))
+        start = time.perf_counter()
+        for _ in range(n):
+            bidder = rng.choice([account for account in accounts if account != auction.highest_bidder])
+            value = generate_dynamic_bid(auction.highest_bid, min_increment, max_increment)
+            auction.bid(bidder, int(value), now=0)
+        return _throughput(n, time.perf_counter() - start, unit='bids')
+
+    from marl.auction_simulation import get_auction_state
+    from marl.deployer import deploy_auction
+
+    w3 = _evm_web3()
+    auction, receipt = deploy_auction(w3, bidding_time=10 ** 6, with_receipt=True)
+    accounts = w3.eth.accounts
+    last_block = receipt['blockNumber']
+    start = time.perf_counter()
+    for _ in range(n):
+        state = get_auction_state(auction, last_block)
+        bidder = rng.choice([account for account in accounts if account != state['highestBidder']])
+        value = generate_dynamic_bid(state['highestBid'], min_increment, max_increment)
+        tx_hash = auction.functions.bid().transact({'from': bidder, 'value': int(value)})
+        last_block = w3.eth.wait_for_transaction_receipt(tx_hash)['blockNumber']
+    return _throughput(n, time.perf_counter() - start, unit='bids')
+
+
+def bench_simulate(backend, n):
+    """
+    The per-action loop of `decentralized_society_with_agents.simulate` with the exported policy,
+    `n` iterations; reports transactions per second and the latency of a tick (one iteration).
+    Console output is discarded.
+    """
+    from marl import decentralized_society_with_agents as sim
+    from marl.metrics_sink import MetricsSink, society_columns
+    from marl.rpc_metrics import RpcMetrics
+    from marl.society_env import DecentralizedSocietyEnv, seed_resources
+
+    # The simulation reads its state from the module's globals: borrow them for this run and put
+    # them back afterwards, so a benchmark never leaves the module pointing at its own chain
+    saved = {name: getattr(sim, name) for name in _SIMULATION_GLOBALS}
+    counters = {name: dict(getattr(sim, name)) for name in _SIMULATION_COUNTERS}
+    try:
+        if backend == 'memory':
+            from marl.society_engine import InMemorySociety
+            society = InMemorySociety(initial_resources=100)
+            sim.w3 = _InMemoryWeb3()
+            contracts, sim.accounts = society, society.accounts
+        else:
+            from marl.deployer import deploy_society
+            sim.w3 = _evm_web3()
+            contracts, sim.accounts = deploy_society(sim.w3), sim.w3.eth.accounts
+            sim.w3.eth.wait_for_transaction_receipt(seed_resources(contracts.resource_pool, 100, sim.accounts[0]))
+        sim.resource_pool, sim.farmer, sim.builder, sim.trader = (
+            contracts.resource_pool, contracts.farmer, contracts.builder, contracts.trader)
+        sim.env = DecentralizedSocietyEnv(sim.resource_pool, sim.farmer, sim.builder, sim.trader, sim.accounts, verbose=False)
+        sim.rpc_metrics = RpcMetrics()
+        sim.iterations = n
+        sim.load_agents()
+
+        with tempfile.TemporaryDirectory() as directory, MetricsSink(directory, society_columns()) as sink:
+            timed = _TimedSink(sink)
+            with redirect_stdout(io.StringIO()):
+                sim.simulate_per_action(timed)
+    finally:
+        for name, value in saved.items():
+            setattr(sim, name, value)
+        for name, value in counters.items():
+            getattr(sim, name).clear()
+            getattr(sim, name).update(value)
+    ticks = np.diff(timed.times)
+    elapsed = timed.times[-1] - timed.times[0]
+    return {
+        'transactions_per_second': timed.transactions / elapsed,
+        'ticks_per_second': n / elapsed,
+        'tick_latency_p50_seconds': float(np.percentile(ticks, 50)),
+        'tick_latency_p95_seconds': float(np.percentile(ticks, 95)),
+        'elapsed_seconds': elapsed,
+        'transactions': timed.transactions,
+    }
+
+
+# Name to (function, iterations per backend); a benchmark only runs on the backends listed
+BENCHMARKS = {
+    'society_env': (bench_society_env, {'memory': 20000, 'evm': 200}),
+    'dao_env': (bench_dao_env, {'memory': 50000, 'evm': 100}),
+    'auction_env': (bench_auction_env, {'memory': 50000}),
+    'auction_bids': (bench_auction_bids, {'memory': 50000, 'evm': 100}),
+    'simulate': (bench_simulate, {'memory': 2000, 'evm': 100}),
+}
+
+
+def lower_is_better(metric):
+    """
+    Returns True for latency metrics, False for throughput metrics and None for metrics that are
+    not compared (e.g. counts).
+    """
+    if metric.endswith('_per_second'):
+        return False
+    if metric.startswith('tick_latency') and metric.endswith('_seconds'):
+        return True
+    return None
+
+
+def _best(runs):
+    # Best of the repeats: noise from other processes only ever makes a run slower
+    best = dict(runs[0])
+    for run in runs[1:]:
+        for metric, value in run.items():
+            direction = lower_is_better(metric)
+            if direction is not None and (value < best[metric] if direction else value > best[metric]):
+                best[metric] = value
+    return best
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(names=None, backends=BACKENDS, repeat=3, scale=1.0):
+    """
+    Runs the benchmarks, each on every backend, keeping the best of `repeat` runs.
+
+    A benchmark that cannot run on a backend (`evm` when the contracts are not compiled or
+    eth-tester is not installed) is reported as skipped with the reason; any other error is raised.
+
+    Args:
+        names: Benchmarks to run. Defaults to all of `BENCHMARKS`.
+        backends: Backends to run them on.
+        repeat: Number of runs of every benchmark.
+        scale: Factor applied to every benchmark's number of iterations.
+
+    Returns:
+        dict: The report: `version`, `revision`, `python`, `platform`, `created` and `results`
+        (`<name>[<backend>]` to its metrics, or to `{'skipped': reason}`).
+    """
+    # The EVM benchmarks deploy the compiled contracts, but never start a compilation themselves
+    unavailable = {}
+    if 'evm' in backends and not is_compiled():
+        unavailable['evm'] = "contracts not compiled (run `npx hardhat compile`)"
+
+    results = {}
+    for name in names or BENCHMARKS:
+        function, iterations = BENCHMARKS[name]
+        for backend in backends:
+            if backend not in iterations:
+                continue
+            if backend in unavailable:
+                results[f'{name}[{backend}]'] = {'skipped': unavailable[backend]}
+                continue
+            n = max(1, int(iterations[backend] * scale))
+            try:
+                results[f'{name}[{backend}]'] = _best([function(backend, n) for _ in range(repeat)])
+            except ImportError as e:
+                # Only a missing optional dependency (eth-tester, py-evm) makes a backend unavailable;
+                # any other error is a bug in the benchmark and is raised
+                if backend == 'memory':
+                    raise
+                results[f'{name}[{backend}]'] = {'skipped': f'{type(e).__name__}: {e}'}
+    return {
+        'version': BENCHMARK_VERSION,
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.time(),
+        'results': results,
+    }
+
+
+def save_report(report, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, report, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares a report with a baseline, metric by metric.
+
+    Args:
+        baseline: The baseline report.
+        report: The new report.
+        threshold: Relative change beyond which a metric counts as regressed (or improved).
+
+    Returns:
+        list: One dict per compared metric: `benchmark`, `metric`, `baseline`, `current`,
+        `change` (relative, positive when better) and `status` ('regressed', 'improved' or 'ok').
+
+    Raises:
+        ValueError: If the reports come from different benchmark versions.
+    """
+    if baseline.get('version') != report.get('version'):
+        raise ValueError(f"Baseline is from benchmark version {baseline.get('version')}, "
+                         f"not {report.get('version')}; record a new baseline")
+    rows = []
+    for benchmark, metrics in report['results'].items():
+        reference = baseline['results'].get(benchmark, {})
+        for metric, value in metrics.items():
+            direction = lower_is_better(metric)
+            if direction is None or not reference.get(metric):
+                continue
+            change = (reference[metric] - value if direction else value - reference[metric]) / reference[metric]
+            status = 'regressed' if change < -threshold else 'improved' if change > threshold else 'ok'
+            rows.append({'benchmark': benchmark, 'metric': metric, 'baseline': reference[metric], 'current': value,
+                         'change': change, 'status': status})
+    return rows
+
+
+def format_report(report):
+    lines = [f"Benchmarks (version {report['version']}, revision {report['revision']}, Python {report['python']})"]
+    for benchmark, metrics in report['results'].items():
+        if 'skipped' in metrics:
+            lines.append(f"  {benchmark:<24} skipped: {metrics['skipped']}")
+            continue
+        values = ', '.join(
+            f"{metric} {value * 1000:.3f} ms" if metric.endswith('_seconds') and lower_is_better(metric) else f"{metric} {value:,.1f}"
+            for metric, value in metrics.items() if lower_is_better(metric) is not None)
+        lines.append(f"  {benchmark:<24} {values}")
+    return '\n'.join(lines)
+
+
+def format_comparison(rows):
+    lines = ["  {:<24} {:<28} {:>14} {:>14} {:>8}  {}".format('benchmark', 'metric', 'baseline', 'current', 'change', 'status')]
+    for row in rows:
+        lines.append("  {:<24} {:<28} {:>14.6g} {:>14.6g} {:>7.1%}  {}".format(
+            row['benchmark'], row['metric'], row['baseline'], row['current'], row['change'], row['status']))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point: `python -m marl.benchmark`.
+
+    Exits with status 1 when a metric regressed by more than the threshold against the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the environments and simulation loops in-process.")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument('--backend', nargs='+', choices=BACKENDS, default=list(BACKENDS), help="Backends to run on")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark; the best is kept")
+    parser.add_argument('--scale', type=float, default=1.0, help="Factor applied to every benchmark's iterations")
+    parser.add_argument('--output', help="Write the report to this JSON file")
+    parser.add_argument('--baseline', default=default_baseline_path, help="Baseline report to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Record this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.only, args.backend, args.repeat, args.scale)
+    print(format_report(report))
+    if args.output:
+        save_report(report, args.output)
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+    rows = compare(load_report(args.baseline), report, args.threshold)
+    print(format_comparison(rows))
+    return 1 if any(row['status'] == 'regressed' for row in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+from collections import defaultdict
+from typing import NamedTuple
+
+from web3.logs import DISCARD
+
+from marl.hardhat_rpc import HardhatChain
+from marl.tick_mining import TICK_GAS, TickMiner, succeeded
+
+# Explicit gas for `vote`: a first vote on a proposal writes two storage slots and emits `Voted`,
+# well below this, and a fixed limit lets a block's capacity be known before sending
+VOTE_GAS = 100000
+
+
+class BulkVoteResult(NamedTuple):
+    """
+    Outcome of `bulk_vote`.
+
+    Attributes:
+        outcomes: One receipt (or Exception if the vote could not be sent) per vote, in order.
+        tally: Proposal id to {'for': n, 'against': m}, counted from the `Voted` events.
+        blocks: Number of blocks mined.
+    """
+    outcomes: list
+    tally: dict
+    blocks: int
+
+
+def pending_nonces(chain, senders):
+    """
+    Returns the next nonce of every sender, counting transactions still in the mempool, fetched in
+    one batch request.
+    """
+    senders = list(senders)
+    counts = chain.batch([('eth_getTransactionCount', [sender, 'pending']) for sender in senders])
+    return {sender: int(count, 16) if isinstance(count, str) else count for sender, count in zip(senders, counts)}
+
+
+def bulk_transact(w3, calls, gas=TICK_GAS, chain=None, key_pool=None):
+    """
+    Sends many contract transactions from many accounts and confirms them in as few blocks as
+    possible. Automine is turned off, nonces are assigned locally from the senders' pending counts,
+    and each block's worth of transactions (as many as fit the block gas limit at `gas` each) is
+    sent in one batch request, mined with `evm_mine` and its receipts fetched in one batch.
+
+    Args:
+        w3: A Web3 instance connected to a Hardhat node.
+        calls: List of (bound contract function, sender) pairs, sent in this order.
+        gas: Gas limit of every transaction.
+        chain: The HardhatChain of the node. Defaults to one built on `w3`.
+        key_pool: Optional KeyPool (`marl.key_pool`); calls from its accounts are signed locally,
+            in parallel, and sent as raw transactions.
+
+    Returns:
+        tuple: One outcome per call, in order (its receipt, with `status` 0 if it reverted, or the
+        exception raised when it was sent), and the number of blocks mined.
+    """
+    if chain is None:
+        chain = HardhatChain(w3)
+    if not calls:
+        return [], 0
+    per_block = max(1, w3.eth.get_block('latest')['gasLimit'] // gas)
+    nonces = pending_nonces(chain, {sender for _, sender in calls})
+
+    outcomes = []
+    blocks = 0
+    with TickMiner(w3, chain, gas) as miner:
+        for start in range(0, len(calls), per_block):
+            transactions = []
+            for function, sender in calls[start:start + per_block]:
+                transactions.append({
+                    'from': sender,
+                    'to': function.address,
+                    'data': function._encode_transaction_data(),
+                    'nonce': nonces[sender],
+                })
+                nonces[sender] += 1
+            if key_pool is not None:
+                local = [tx for tx in transactions if tx['from'] in key_pool]
+                signed = key_pool.sign_transactions([dict(tx, gas=gas) for tx in local])
+                for tx, raw in zip(local, signed):
+                    tx['raw'] = raw
+            miner.submit_many(transactions)
+            block_outcomes = miner.mine()
+            blocks += 1
+            # Rejected transactions did not use their nonce
+            rejected = {tx['from'] for tx, outcome in zip(transactions, block_outcomes) if isinstance(outcome, Exception)}
+            if rejected:
+                nonces.update(pending_nonces(chain, rejected))
+            outcomes.extend(block_outcomes)
+    return outcomes, blocks
+
+
+def tally_votes(contract, receipts):
+    """
+    Counts the votes recorded by the `Voted` events of the given receipts.
+
+    Args:
+        contract: The DAO contract.
+        receipts: Transaction receipts; exceptions and reverted receipts are skipped.
+
+    Returns:
+        dict: Proposal id to {'for': n, 'against': m}.
+    """
+    tally = defaultdict(lambda: {'for': 0, 'against': 0})
+    voted = contract.events.Voted()
+    for receipt in receipts:
+        if not succeeded(receipt):
+            continue
+        for event in voted.process_receipt(receipt, errors=DISCARD):
+            tally[event['args']['proposalId']]['for' if event['args']['voteFor'] else 'against'] += 1
+    return dict(tally)
+
+
+def bulk_vote(w3, contract, votes, gas=VOTE_GAS, chain=None, key_pool=None):
+    """
+    Casts many votes at once, see `bulk_transact`.
+
+    Args:
+        w3: A Web3 instance connected to a Hardhat node.
+        contract: The DAO contract.
+        votes: List of (voter, proposal id, choice) tuples; choice is truthy to vote for.
+        gas: Gas limit of every vote.
+        chain: The HardhatChain of the node. Defaults to one built on `w3`.
+        key_pool: Optional KeyPool signing the votes of its accounts locally.
+
+    Returns:
+        BulkVoteResult: The outcomes, the tally from the `Voted` events and the number of blocks mined.
+    """
+    calls = [(contract.functions.vote(int(proposal_id), bool(choice)), voter) for voter, proposal_id, choice in votes]
+    outcomes, blocks = bulk_transact(w3, calls, gas, chain, key_pool)
+    return BulkVoteResult(outcomes, tally_votes(contract, outcomes), blocks)
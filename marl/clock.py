@@ -0,0 +1,73 @@
+import time
+
+
+class WallClock:
+    """
+    Clock that waits in real time, for runs where the chain advances on its own.
+
+    Attributes:
+        w3: The Web3 instance used to read block timestamps.
+    """
+    def __init__(self, w3):
+        self.w3 = w3
+
+    def now(self):
+        """
+        Returns the timestamp of the latest block.
+        """
+        return self.w3.eth.get_block('latest')['timestamp']
+
+    def sleep(self, seconds):
+        """
+        Blocks for the given number of seconds.
+        """
+        time.sleep(seconds)
+
+    def wait_until(self, timestamp):
+        """
+        Blocks until chain time has passed the given timestamp.
+
+        Args:
+            timestamp: The target block timestamp.
+        """
+        current_time = self.now()
+        if current_time < timestamp:
+            wait_time = timestamp - current_time
+            print(f"Waiting for {wait_time} seconds...")
+            time.sleep(wait_time + 1)  # Wait a bit more to ensure the target time has passed
+
+
+class VirtualClock:
+    """
+    Clock that fast-forwards chain time on a local Hardhat node (`evm_increaseTime`/`evm_mine`)
+    instead of sleeping, so time-locked contract logic can be simulated in milliseconds.
+
+    Attributes:
+        chain: The HardhatChain used to manipulate time.
+    """
+    def __init__(self, chain):
+        self.chain = chain
+
+    def now(self):
+        """
+        Returns the timestamp of the latest block.
+        """
+        return self.chain.latest_timestamp()
+
+    def sleep(self, seconds):
+        """
+        Advances chain time by the given number of seconds without blocking.
+        """
+        if seconds > 0:
+            self.chain.increase_time(seconds)
+
+    def wait_until(self, timestamp):
+        """
+        Mines a block at the given timestamp if chain time has not reached it yet, so that the next
+        transaction sees `block.timestamp` past it.
+
+        Args:
+            timestamp: The target block timestamp.
+        """
+        if self.now() < timestamp:
+            self.chain.mine(timestamp)
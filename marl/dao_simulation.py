@@ -1,26 +1,40 @@
-import json
+import os
+import argparse
 import numpy as np
-from web3 import Web3
-from stable_baselines3 import DQN
-import subprocess
 import gym
 from gym import spaces
 import random
 
+from marl.artifacts import ensure_compiled, load_abi
+from marl.backends import BACKENDS, make_web3
+from marl.clock import VirtualClock
+from marl.hardhat_rpc import HardhatChain
+from marl.numpy_policy import export_policy, load_policy
+from marl.rpc_metrics import instrument
+from marl.view_cache import cache_views
+
+# web3 and torch are imported where they are first used, so importing this module neither
+# connects to a node nor trains a model.
+
+default_node_url = 'http://127.0.0.1:8545'
+model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dao_voting_model")
+
 class DAOVotingEnv(gym.Env):
     """
     Custom Environment for DAO Voting, compatible with OpenAI Gym.
     This environment simulates voting on proposals within a DAO (Decentralized Autonomous Organization).
     """
-    def __init__(self, contract):
+    def __init__(self, contract, account=None):
         """
         Initializes the DAOVotingEnv environment.
 
         Args:
             contract: A Web3 contract object representing the DAO smart contract.
+            account: Account casting the votes. Defaults to the Web3 instance's default account.
         """
         super(DAOVotingEnv, self).__init__()
         self.contract = contract
+        self.account = account
         self.proposal_id = 0
         self.action_space = spaces.Discrete(2)  # Two actions: Vote for or against
         self.observation_space = spaces.Box(low=0, high=1, shape=(1,), dtype=np.float32)
@@ -45,29 +59,29 @@ class DAOVotingEnv(gym.Env):
         
         Returns:
             observation: A new random float observation.
-            reward: Reward for the action taken (1 for vote for, -1 for vote against).
+            reward: Reward for the action taken (1 for vote for, -1 for vote against, 0 if the vote
+                was not recorded on chain).
             done: Boolean indicating whether the episode is finished.
-            info: An empty dictionary for additional info.
+            info: `vote_succeeded`, and the vote's `receipt` or the `error` that prevented it.
         """
-        done = False
-        reward = 0
-
-        # Simulate voting based on the action
-        if action == 0:
-            # Vote Against
-            tx = self.contract.functions.vote(self.proposal_id, False).transact()
-            reward = -1  # Example reward for voting against (modify as needed)
-        elif action == 1:
-            # Vote For
-            tx = self.contract.functions.vote(self.proposal_id, True).transact()
-            reward = 1  # Example reward for voting for (modify as needed)
+        transaction = {'from': self.account} if self.account is not None else {}
+        try:
+            tx = self.contract.functions.vote(self.proposal_id, action == 1).transact(transaction)
+            receipt = self.contract.w3.eth.wait_for_transaction_receipt(tx)
+            info = {'vote_succeeded': receipt['status'] == 1, 'receipt': receipt}
+        except Exception as e:
+            # Reverted during gas estimation, e.g. voting twice or after the voting period
+            info = {'vote_succeeded': False, 'error': str(e)}
+
+        # Example reward for voting for or against (modify as needed); a failed vote does not count
+        reward = (1 if action == 1 else -1) if info['vote_succeeded'] else 0
 
         # Example: End the episode after one action
         done = True
 
         # Return the next state (new observation), reward, done, and any additional info
         observation = np.array([random.random()])
-        return observation, reward, done, {}
+        return observation, reward, done, info
 
     def render(self, mode='human', close=False):
         """
@@ -75,60 +89,59 @@ class DAOVotingEnv(gym.Env):
         """
         pass
     
-# Connect to local Hardhat node
-web3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
-print("Connected to Ethereum:", web3.is_connected())
+# Set by `connect`
+web3 = None
+contract = None
+env = None
+rpc_metrics = None  # RpcMetrics of `web3` (see `marl.rpc_metrics`)
+view_cache = None  # ViewCache of `web3` (see `marl.view_cache`)
+
+def connect(node_url=default_node_url, backend='http'):
+    """
+    Connects to the node, deploys a fresh DAO contract and builds the voting environment on it.
+    Every request to the node is recorded in `rpc_metrics`, and view calls are cached in `view_cache`.
+
+    Args:
+        node_url: HTTP URL of the node.
+        backend: 'http' for the node at `node_url`, or 'eth-tester' for a fresh in-process chain
+            (see `marl.backends`).
+    """
+    global web3, contract, env, rpc_metrics, view_cache
+
+    web3 = make_web3(backend, node_url)
+    rpc_metrics = instrument(web3)
+    view_cache = cache_views(web3)
+    print("Connected to Ethereum:", web3.is_connected())
+
+    # Compile first so the deployment reads up-to-date artifacts, then load contract ABI and address
+    contract_abi = compile_and_get_abi()
+    contract_address = deploy_contract()
+    contract = web3.eth.contract(address=contract_address, abi=contract_abi)
+    rpc_metrics.register_abi(contract_abi, 'DAO')
+
+    # Initialize the custom Gym environment
+    env = DAOVotingEnv(contract)
 
 def compile_and_get_abi():
     """
-    Compiles the smart contract using Hardhat and loads the ABI (Application Binary Interface).
+    Returns the ABI of the DAO contract. The contracts are only recompiled with Hardhat when
+    their sources or solc settings changed since the last compilation (see `marl.artifacts`).
 
     Returns:
-        contract_abi: ABI of the compiled contract.
+        list: The ABI of the compiled DAO contract.
     """
-    # Run Hardhat compilation task
-    subprocess.run(["npx", "hardhat", "compile"], check=True)
-
-    # Load ABI from the newly generated artifact
-    with open('../artifacts/contracts/dao.sol/Dao.json', 'r') as abi_file:
-        contract_json = json.load(abi_file)
-        contract_abi = contract_json['abi']
-
-    return contract_abi
+    ensure_compiled()
+    return load_abi('dao.sol', 'DAO')
 
 def deploy_contract():
     """
-    Deploys the DAO contract using Hardhat and retrieves its address.
+    Deploys the DAO contract in-process from its compiled Hardhat artifact.
 
     Returns:
         contract_address: The address of the deployed contract.
-    
-    Raises:
-        Exception: If the contract address cannot be retrieved from the deployment output.
     """
-    result = subprocess.run(
-        ["npx", "hardhat", "run", "../scripts/dao.ts", "--network", "localhost"],
-        capture_output=True, text=True
-    )
-    output = result.stdout
-    contract_address = None
-    for line in output.splitlines():
-        if "DAO contract deployed to:" in line:
-            contract_address = line.split(": ")[1].strip()
-            break
-    if not contract_address:
-        raise Exception("Failed to deploy contract and capture contract address.")
-    return contract_address
-
-# Load contract ABI and address
-contract_address = deploy_contract()
-contract = web3.eth.contract(address=contract_address, abi=compile_and_get_abi())
-
-# Initialize the custom Gym environment
-env = DAOVotingEnv(contract)
-
-# Initialize DQN RL model
-model = DQN("MlpPolicy", env, verbose=1)
+    from marl.deployer import deploy_dao
+    return deploy_dao(web3).address
 
 # RL Agent class
 class RLAgent:
@@ -184,6 +197,21 @@ class RLAgent:
         tx = contract.functions.propose(title, description).transact({'from': self.account, 'gas': 3000000})
         web3.eth.wait_for_transaction_receipt(tx)
 
+    def execute_proposal(self, proposal_id):
+        """
+        Executes a proposal whose voting period is over.
+
+        Args:
+            proposal_id: The proposal ID to execute.
+
+        Returns:
+            bool: Whether the proposal passed, as reported by the ProposalExecuted event.
+        """
+        tx = contract.functions.executeProposal(proposal_id).transact({'from': self.account, 'gas': 3000000})
+        receipt = web3.eth.wait_for_transaction_receipt(tx)
+        executed = contract.events.ProposalExecuted().process_receipt(receipt)
+        return executed[0]['args']['passed']
+
 class SimulatedDAOVotingEnv(gym.Env):
     """
     Simulated Environment for training the RL model outside the blockchain.
@@ -244,48 +272,143 @@ class SimulatedDAOVotingEnv(gym.Env):
         """
         pass
 
-# Train the model on the simulated environment
-train_env = SimulatedDAOVotingEnv()
-model = DQN("MlpPolicy", train_env, verbose=1)
+def train(total_timesteps=10000, path=model_path):
+    """
+    Trains the voting model on the simulated environment, saves it and exports its NumPy policy.
 
-# Train the model (adjust the number of timesteps as needed)
-model.learn(total_timesteps=10000)
+    Args:
+        total_timesteps: Number of training timesteps.
+        path: Path of the model, without extension.
+    """
+    from stable_baselines3 import DQN
 
-# Save the trained model to disk
-model.save("dao_voting_model")
+    train_env = SimulatedDAOVotingEnv()
+    model = DQN("MlpPolicy", train_env, verbose=1)
 
-# Load the trained model
-model2 = DQN.load("dao_voting_model")
+    # Train the model (adjust the number of timesteps as needed)
+    model.learn(total_timesteps=total_timesteps)
 
-# Load the trained model
-model = DQN.load("dao_voting_model")
+    # Save the trained model to disk, along with its torch-free export
+    model.save(path)
+    export_policy(path + '.zip', path + '.npz')
 
-def run_simulation():
+def run_simulation(clock=None, path=model_path, proposals=1, voters=18):
     """
-    Runs the DAO voting simulation by creating a proposal and having RL agents vote on it.
+    Runs the DAO voting simulation by creating proposals, having RL agents vote on them and
+    executing them once the voting period is over. Must be called after `connect`.
+
+    Proposals, votes and executions are each sent in bulk (see `marl.bulk_voting`): automine is
+    turned off and every batch is confirmed in as few blocks as the block gas limit allows, and the
+    tally is counted from the `Voted` events of the receipts. The RPC latency and gas metrics are
+    printed at the end.
+
+    Args:
+        clock: The clock used to wait for the end of the voting period. Defaults to a VirtualClock,
+            which fast-forwards the Hardhat node's time instead of waiting a full day.
+        path: Path of the trained model, without extension.
+        proposals: Number of proposals created and voted on.
+        voters: Number of voters. Beyond the node's unlocked accounts, voters are generated local
+            accounts whose votes are signed in-process (see `marl.key_pool`).
     """
-    model = DQN.load("dao_voting_model")  # Load the model correctly here
-    accounts = web3.eth.accounts
-    proposer = RLAgent(accounts[0], model)  # Pass the model instance
-    voters = [RLAgent(account, model) for account in accounts[1:19]]  # Pass the model instance to each voter
-
-    print("Creating proposal...")
-    proposer.propose("Test Proposal", "This is a test proposal")
-
-    proposal_id = contract.functions.proposalCount().call() - 1
-    print(f"Proposal ID: {proposal_id}")
-
-    obs = env.reset()  # Get initial observation for each agent
+    from web3.logs import DISCARD
+    from marl.bulk_voting import bulk_transact, bulk_vote
+    from marl.key_pool import KeyPool
+    from marl.tick_mining import succeeded
 
-    print("Voting on proposal...")
-    for i, voter in enumerate(voters):
-        action = voter.decide_action(obs)
-        voter.execute_action(action, proposal_id)  # Execute action on the blockchain
-        print(f"Voter {i + 1} ({voter.account}) voted")
+    if clock is None:
+        clock = VirtualClock(HardhatChain(web3))
 
-    proposal_after_vote = contract.functions.proposals(proposal_id).call()
-    print(f"Votes FOR: {proposal_after_vote[3]}, Votes AGAINST: {proposal_after_vote[4]}")
+    model = load_policy(path)  # NumPy export of the trained model
+    accounts = web3.eth.accounts
+    proposer = RLAgent(accounts[0], model)  # Pass the model instance
+    key_pool = None
+    voter_accounts = accounts[1:voters + 1]
+    if voters > len(voter_accounts):
+        key_pool = KeyPool(web3, voters)
+        key_pool.fund()
+        voter_accounts = key_pool.addresses
+    voters = [RLAgent(account, model) for account in voter_accounts]  # Pass the model instance to each voter
+
+    print(f"Creating {proposals} proposal(s)...")
+    first_id = contract.functions.proposalCount().call()
+    proposal_ids = list(range(first_id, first_id + proposals))
+    outcomes, blocks = bulk_transact(web3, [
+        (contract.functions.propose(f"Test Proposal {proposal_id}", "This is a test proposal"), proposer.account)
+        for proposal_id in proposal_ids
+    ])
+    if not all(succeeded(outcome) for outcome in outcomes):
+        raise RuntimeError("Some proposals could not be created")
+    print(f"Proposal IDs: {first_id} to {proposal_ids[-1]}, created in {blocks} block(s)")
+
+    # One observation per proposal, shared by its voters, and every decision from one batched prediction
+    observations = np.array([env.reset() for _ in proposal_ids], dtype=np.float32)
+    with rpc_metrics.timer('decide'):
+        actions = proposer.decide_action(np.repeat(observations, len(voters), axis=0))
+    votes = [
+        (voter.account, proposal_id, actions[i * len(voters) + j] == 1)
+        for i, proposal_id in enumerate(proposal_ids) for j, voter in enumerate(voters)
+    ]
+
+    print(f"Casting {len(votes)} votes...")
+    try:
+        result = bulk_vote(web3, contract, votes, key_pool=key_pool)
+    finally:
+        if key_pool is not None:
+            key_pool.close()
+    failed = sum(not succeeded(outcome) for outcome in result.outcomes)
+    print(f"{len(votes) - failed} votes recorded in {result.blocks} block(s), {failed} failed")
+    for proposal_id in proposal_ids[:10]:
+        counts = result.tally.get(proposal_id, {'for': 0, 'against': 0})
+        print(f"Proposal {proposal_id}: Votes FOR: {counts['for']}, Votes AGAINST: {counts['against']}")
+
+    print("Waiting for the voting period to end...")
+    clock.wait_until(contract.functions.proposals(proposal_ids[-1]).call()[5])
+
+    outcomes, _ = bulk_transact(web3, [
+        (contract.functions.executeProposal(proposal_id), proposer.account) for proposal_id in proposal_ids
+    ])
+    executed = contract.events.ProposalExecuted()
+    results = [
+        event['args']['passed']
+        for outcome in outcomes if succeeded(outcome)
+        for event in executed.process_receipt(outcome, errors=DISCARD)
+    ]
+    passed = sum(results)
+    # Executions that reverted or were never mined emit no event and are neither passed nor rejected
+    print(f"Executed {len(results)} proposal(s): {passed} passed, {len(results) - passed} rejected, "
+          f"{proposals - len(results)} failed to execute")
+    print(rpc_metrics.summary())
+    print(f"View cache: {view_cache.summary()}")
+
+def main(argv=None):
+    """
+    Command line entry point: `python -m marl.dao_simulation`.
+    """
+    parser = argparse.ArgumentParser(description="Run the DAO voting simulation with RL agents.")
+    parser.add_argument('--iterations', type=int, default=1, help="Number of rounds of proposals to create, vote on and execute")
+    parser.add_argument('--proposals', type=int, default=1, help="Proposals voted on in every iteration")
+    parser.add_argument('--voters', type=int, default=18,
+                        help="Number of voters; above the node's unlocked accounts, local accounts are generated")
+    parser.add_argument('--node-url', default=default_node_url, help="HTTP URL of the Hardhat node")
+    parser.add_argument('--backend', choices=BACKENDS, default='http',
+                        help="Chain to run on: the Hardhat node at --node-url, or an in-process EVM")
+    parser.add_argument('--model-path', default=model_path, help="Path of the trained model, without extension")
+    parser.add_argument('--train', type=int, metavar='TIMESTEPS',
+                        help="Retrain the model for this many timesteps first (done with 10000 when no model exists)")
+    parser.add_argument('--rpc-metrics', metavar='PATH', help="Write the RPC latency and gas metrics to this JSON file at the end")
+    parser.add_argument('--prometheus-port', type=int, help="Serve the RPC metrics to Prometheus on this port while running")
+    args = parser.parse_args(argv)
+
+    if args.train or not (os.path.exists(args.model_path + '.zip') or os.path.exists(args.model_path + '.npz')):
+        train(args.train or 10000, args.model_path)
+    connect(args.node_url, backend=args.backend)
+    if args.prometheus_port:
+        rpc_metrics.serve(args.prometheus_port)
+    clock = VirtualClock(HardhatChain(web3))
+    for _ in range(args.iterations):
+        run_simulation(clock, args.model_path, args.proposals, args.voters)
+    if args.rpc_metrics:
+        rpc_metrics.to_json(args.rpc_metrics)
 
 if __name__ == '__main__':
-    env = DAOVotingEnv(contract)  # Ensure this environment is initialized here for testing/deployment
-    run_simulation()
+    main()
@@ -1,267 +1,131 @@
 import os
-import numpy as np
-from web3 import Web3
-import json
-from stable_baselines3 import DQN
-import gym
-from gym import spaces
-import matplotlib.pyplot as plt
-import csv
-from stable_baselines3.common.callbacks import BaseCallback
-
-w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+import argparse
 
-# Define paths and other simulation parameters
-tensorboard_log_dir = "./tensorboard_logs/"
-os.makedirs(tensorboard_log_dir, exist_ok=True)
-
-# Addresses of deployed contracts (replace these with actual addresses)
-resource_pool_address = '0x5FbDB2315678afecb367f032d93F642f64180aa3'
-farmer_address = '0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512'
-builder_address = '0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0'
-trader_address = '0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9'
-
-with open('../artifacts/contracts/decentralizedSociety/ResourcePool.sol/ResourcePool.json') as f:
-    resource_pool_abi = json.load(f)['abi']
+from marl.backends import BACKENDS, make_web3
+from marl.batched_policy import DecisionStage
+from marl.metrics_sink import (
+    MetricsSink, agent_metrics, export_csv, load_metrics, society_columns, society_csv_columns, society_row
+)
+from marl.numpy_policy import export_policy, load_policy
+from marl.rpc_metrics import instrument
+from marl.view_cache import cache_views
 
-with open('../artifacts/contracts/decentralizedSociety/Farmer.sol/Farmer.json') as f:
-    farmer_abi = json.load(f)['abi']
+# web3, torch and matplotlib are imported where they are first used, so importing this module
+# neither connects to a node nor loads a model.
 
-with open('../artifacts/contracts/decentralizedSociety/Builder.sol/Builder.json') as f:
-    builder_abi = json.load(f)['abi']
+default_node_url = 'http://127.0.0.1:8545'
 
-with open('../artifacts/contracts/decentralizedSociety/Trader.sol/Trader.json') as f:
-    trader_abi = json.load(f)['abi']
+# Define paths and other simulation parameters
+base_dir = os.path.dirname(os.path.abspath(__file__))
+model_path = os.path.join(base_dir, "decentralized_society_model")
+tensorboard_log_dir = "./tensorboard_logs/"
+metrics_dir = "simulation_metrics_with_agents"
 
-resource_pool = w3.eth.contract(address=resource_pool_address, abi=resource_pool_abi)
-farmer = w3.eth.contract(address=farmer_address, abi=farmer_abi)
-builder = w3.eth.contract(address=builder_address, abi=builder_abi)
-trader = w3.eth.contract(address=trader_address, abi=trader_abi)
+# Addresses of deployed contracts (the ones `scripts/decentralizedSociety.ts` gets on a fresh node)
+default_addresses = {
+    'resource_pool': '0x5FbDB2315678afecb367f032d93F642f64180aa3',
+    'farmer': '0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512',
+    'builder': '0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0',
+    'trader': '0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9',
+}
 
 # Simulation parameters
-accounts = w3.eth.accounts
 iterations = 1000
-
-class DecentralizedSocietyEnv(gym.Env):
+tick_mining = False  # Mine every iteration as a single block (see `simulate_tick_batched`)
+
+# Set by `connect` and `load_agents`
+w3 = None
+resource_pool = farmer = builder = trader = None
+accounts = []
+env = None
+model = None
+farmer_agent = builder_agent = trader_agent = None
+agents = []
+decision_stage = None
+rpc_metrics = None  # RpcMetrics of `w3` (see `marl.rpc_metrics`)
+view_cache = None  # ViewCache of `w3` (see `marl.view_cache`)
+
+def connect(node_url=default_node_url, addresses=None, backend='http'):
     """
-    Custom Gym Environment representing a decentralized society interacting with Ethereum smart contracts.
-    This environment facilitates interactions between Farmer, Builder, and Trader agents using a shared resource pool.
-
-    Attributes:
-        resource_pool: A Web3 contract object representing the Resource Pool.
-        farmer: A Web3 contract object representing the Farmer contract.
-        builder: A Web3 contract object representing the Builder contract.
-        trader: A Web3 contract object representing the Trader contract.
-        accounts: A list of Ethereum accounts.
-        total_resources: An integer representing the total resources in the pool.
-        last_action_success: A flag indicating the success of the last action (1 for success, 0 for failure).
-        action_space: Discrete action space with 8 possible actions (combination of farmer, builder, and trader choices).
-        observation_space: Box observation space representing the current total resources and last action success.
+    Connects to the node, binds the deployed society contracts and builds the environment the
+    agents observe. Every request to the node is recorded in `rpc_metrics`, and view calls are
+    cached in `view_cache`.
+
+    Args:
+        node_url: HTTP URL of the node.
+        addresses: Dict with the `resource_pool`, `farmer`, `builder` and `trader` addresses.
+            Defaults to `default_addresses`.
+        backend: 'http' for the node at `node_url`, or 'eth-tester' for a fresh in-process chain,
+            on which the society contracts are deployed first (see `marl.backends`).
     """
-    def __init__(self, resource_pool, farmer, builder, trader, accounts):
-        """
-        Initializes the decentralized society environment with smart contracts and Ethereum accounts.
-
-        Args:
-            resource_pool: The Web3 contract object for the Resource Pool.
-            farmer: The Web3 contract object for the Farmer.
-            builder: The Web3 contract object for the Builder.
-            trader: The Web3 contract object for the Trader.
-            accounts: A list of Ethereum accounts used for interacting with the contracts.
-        """
-        super(DecentralizedSocietyEnv, self).__init__()
-        self.resource_pool = resource_pool
-        self.farmer = farmer
-        self.builder = builder
-        self.trader = trader
-        self.accounts = accounts
-
-        # Use a single Discrete action space with 8 possible actions
-        self.action_space = spaces.Discrete(8)
-        
-        # Observation space: total resources and last action success
-        self.observation_space = spaces.Box(low=np.array([0, 0]), high=np.array([1000, 1]), dtype=np.float32)
-
-        self.total_resources = 100  # Initial resources
-        self.last_action_success = 1  # Last action success
-
-    def reset(self):
-        """
-        Resets the environment to its initial state with default resources and action success.
-
-        Returns:
-            observation: A numpy array representing the total resources and last action success.
-        """
-        self.total_resources = 100
-        self.last_action_success = 1
-        return np.array([self.total_resources, self.last_action_success], dtype=np.float32)
-
-    def step(self, action):
-        """
-        Executes one step in the environment based on the agent's action.
-
-        Args:
-            action: An integer representing the combined action of the farmer, builder, and trader.
-
-        Returns:
-            observation: A numpy array representing the current total resources and last action success.
-            reward: A sum of the rewards obtained by the farmer, builder, and trader for their actions.
-            done: A boolean flag indicating whether the simulation has reached a terminal state.
-            info: A dictionary containing additional information (currently empty).
-        """
-        rewards = np.zeros(3)  # Initialize rewards for farmer, builder, and trader
-        action_combination = [action % 2, (action // 2) % 2, (action // 4) % 2]
-        
-        # Process Farmer's action
-        try:
-            if action_combination[0] == 0:
-                self.farmer.functions.farmEfficient().transact({'from': self.accounts[0]})
-                rewards[0] = 5
-            else:
-                self.farmer.functions.farmSelfish().transact({'from': self.accounts[0]})
-                rewards[0] = -5
-        except Exception as e:
-            print("Farmer action failed:", str(e))
-            rewards[0] = -10  # Penalize for failed transaction
-
-        # Process Builder's action
-        try:
-            if action_combination[1] == 0:
-                self.builder.functions.buildEfficient().transact({'from': self.accounts[1]})
-                rewards[1] = 5
-            else:
-                self.builder.functions.buildSelfish().transact({'from': self.accounts[1]})
-                rewards[1] = -5
-        except Exception as e:
-            print("Builder action failed:", str(e))
-            rewards[1] = -10  # Penalize for failed transaction
-
-        # Process Trader's action
-        try:
-            if action_combination[2] == 0:
-                self.trader.functions.tradeEfficient().transact({'from': self.accounts[2]})
-                rewards[2] = 5
-            else:
-                self.trader.functions.tradeSelfish().transact({'from': self.accounts[2]})
-                rewards[2] = -5
-        except Exception as e:
-            print("Trader action failed:", str(e))
-            rewards[2] = -10  # Penalize for failed transaction
-
-        self.total_resources = self.resource_pool.functions.getTotalResources().call()
-        done = self.total_resources <= 0 or self.total_resources >= 1000
-        return np.array([self.total_resources, self.last_action_success], dtype=np.float32), np.sum(rewards), done, {}
-
-
-    def render(self, mode='human'):
-        """
-        Renders the current state of the environment to the console.
-        
-        Args:
-            mode: Render mode (currently only 'human' is supported).
-        """
-        print(f"Total Resources: {self.total_resources}, Last Action Success: {self.last_action_success}")
-
+    global w3, resource_pool, farmer, builder, trader, accounts, env, rpc_metrics, view_cache
+    from marl.deployer import connect_society, deploy_society
+    from marl.society_env import DecentralizedSocietyEnv
+
+    w3 = make_web3(backend, node_url)
+    if backend == 'http':
+        resource_pool, farmer, builder, trader = connect_society(w3, addresses or default_addresses)
+    else:
+        resource_pool, farmer, builder, trader = deploy_society(w3)
+    rpc_metrics = instrument(w3)
+    for name, contract in (('ResourcePool', resource_pool), ('Farmer', farmer), ('Builder', builder), ('Trader', trader)):
+        rpc_metrics.register_abi(contract.abi, name)
+    view_cache = cache_views(w3)
+    for contract in (farmer, builder, trader):
+        view_cache.mark_immutable(contract, 'resourcePool')
+    accounts = w3.eth.accounts
+    env = DecentralizedSocietyEnv(
+        resource_pool=resource_pool,
+        farmer=farmer,
+        builder=builder,
+        trader=trader,
+        accounts=accounts
+    )
+
+def train(total_timesteps=10000, path=model_path):
+    """
+    Trains a new model on the in-memory contract engine (no node required), saves it and exports
+    its NumPy policy.
 
-    def get_observation(self):
-        """
-        Returns the current observation of the environment's state.
-        
-        Returns:
-            A numpy array representing the total resources and last action success.
-        """
-        # This method should return an array-like object that matches the input shape of the model.
-        # Example: Return the total resources and last action success as the current state observation.
-        return np.array([self.total_resources, self.last_action_success], dtype=np.float32)
+    Args:
+        total_timesteps: Number of training timesteps.
+        path: Path of the model, without extension.
 
-class CustomTrainingCallback(BaseCallback):
+    Returns:
+        CustomTrainingCallback: The callback holding the training metrics.
     """
-    Custom callback for logging additional metrics during training.
-    Tracks cumulative rewards, loss, and exploration rate for each episode.
-    """
-    def __init__(self, verbose=0):
-        super(CustomTrainingCallback, self).__init__(verbose)
-        self.cumulative_rewards = []
-        self.losses = []
-        self.exploration_rates = []
-
-    def _on_step(self) -> bool:
-        # Log cumulative reward
-        reward = self.locals['rewards']
-        self.cumulative_rewards.append(sum(reward))
-
-        # If using the logger, capture the current loss (optional)
-        loss = self.locals['infos'][0].get('loss', None)
-        if loss:
-            self.losses.append(loss)
-
-        # Log exploration rate
-        self.exploration_rates.append(self.model.exploration_rate)
-        
-        return True
-
-    def plot_metrics(self):
-        # Plot cumulative rewards
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.cumulative_rewards)
-        plt.title("Cumulative Reward vs. Timesteps")
-        plt.xlabel("Timesteps")
-        plt.ylabel("Cumulative Reward")
-        plt.show()
-
-        # Plot loss over time (if loss logging is active)
-        if self.losses:
-            plt.figure(figsize=(10, 6))
-            plt.plot(self.losses)
-            plt.title("Loss vs. Timesteps")
-            plt.xlabel("Timesteps")
-            plt.ylabel("Loss")
-            plt.show()
-
-        # Plot exploration decay
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.exploration_rates)
-        plt.title("Exploration Decay (ε) vs. Timesteps")
-        plt.xlabel("Timesteps")
-        plt.ylabel("Exploration Rate (ε)")
-        plt.show()
-
-    def save_metrics_to_csv(self, filename='training_metrics.csv'):
-        # Save the logged metrics to a CSV file for analysis
-        with open(filename, 'w', newline='') as csvfile:
-            csv_writer = csv.writer(csvfile)
-            csv_writer.writerow(['Timesteps', 'Cumulative Reward', 'Loss', 'Exploration Rate'])
-            for i in range(len(self.cumulative_rewards)):
-                csv_writer.writerow([
-                    i+1, 
-                    self.cumulative_rewards[i], 
-                    self.losses[i] if self.losses else None, 
-                    self.exploration_rates[i]
-                ])
-                
-# Train the model on the simulated environment
-env = DecentralizedSocietyEnv(
-    resource_pool=resource_pool,
-    farmer=farmer,
-    builder=builder,
-    trader=trader,
-    accounts=w3.eth.accounts
-)
+    from stable_baselines3 import DQN
+    from marl.society_env import make_in_memory_env
+    from marl.training_callback import CustomTrainingCallback
 
-# model = DQN("MlpPolicy", env, verbose=1, tensorboard_log=tensorboard_log_dir )
+    os.makedirs(tensorboard_log_dir, exist_ok=True)
+    train_env = make_in_memory_env(initial_resources=100)
+    trained_model = DQN("MlpPolicy", train_env, verbose=1, tensorboard_log=tensorboard_log_dir)
 
-# Uncomment to retrain
-# Create the custom callback to log metrics
-# callback = CustomTrainingCallback(verbose=1)
+    # Create the custom callback to log metrics
+    callback = CustomTrainingCallback(verbose=1)
+    trained_model.learn(total_timesteps=total_timesteps, callback=callback)
 
-# Train the model (adjust the number of timesteps as needed)
-# model.learn(total_timesteps=10000, callback=callback)
+    # Save the trained model to disk, along with its torch-free export
+    trained_model.save(path)
+    export_policy(path + '.zip', path + '.npz')
+    return callback
 
-# Save the trained model to disk
-# model.save("decentralized_society_model")
+def load_agents(path=model_path):
+    """
+    Loads the trained model as a NumPy policy and creates the farmer, builder and trader agents.
+    Must be called after `connect`.
 
-# Load the trained model
-model = DQN.load("decentralized_society_model")
+    Args:
+        path: Path of the model, without extension.
+    """
+    global model, farmer_agent, builder_agent, trader_agent, agents, decision_stage
+    model = load_policy(path)
+    farmer_agent = Agent(accounts[0], farmer.functions.farmEfficient, farmer.functions.farmSelfish, model)
+    builder_agent = Agent(accounts[1], builder.functions.buildEfficient, builder.functions.buildSelfish, model)
+    trader_agent = Agent(accounts[2], trader.functions.tradeEfficient, trader.functions.tradeSelfish, model)
+    agents = [farmer_agent, builder_agent, trader_agent]
+    decision_stage = DecisionStage(model)
 
 class Agent:
     """
@@ -289,14 +153,22 @@ class Agent:
         self.contract_function_efficient = contract_function_efficient
         self.contract_function_selfish = contract_function_selfish
 
-    def decide_and_act(self, agent_type):
+    def decide_and_act(self, agent_type, action=None):
         """
         Determines which action to take (efficient or selfish) based on the DQN model's prediction
         and executes the corresponding smart contract function. Tracks the action taken.
+
+        Args:
+            agent_type: 'farmer', 'builder' or 'trader'.
+            action: Action already decided by a `DecisionStage` for this tick. When omitted, the
+                agent runs its own forward pass on the current observation.
         """
-        obs = env.get_observation()  # Get the current state observation
-        action, _ = self.model.predict(obs, deterministic=True)  # Get action from the model
+        if action is None:
+            obs = env.get_observation()  # Get the current state observation
+            action, _ = self.model.predict(obs, deterministic=True)  # Get action from the model
         
+        action = int(action)
+        failed = False
         try:
             if action == 0:
                 tx = self.contract_function_efficient().transact({'from': self.account})
@@ -304,78 +176,207 @@ class Agent:
                 
                 # Update action tracking for efficient action
                 efficient_actions[agent_type] += 1
-                if agent_type == 'farmer':
-                    farmer_rewards.append(5)
-                elif agent_type == 'builder':
-                    builder_rewards.append(5)
-                elif agent_type == 'trader':
-                    trader_rewards.append(5)
+                reward = 5
             else:
                 tx = self.contract_function_selfish().transact({'from': self.account})
                 print(f"{self.account[:6]} chose to act selfishly.")
                 
                 # Update action tracking for selfish action
                 selfish_actions[agent_type] += 1
-                if agent_type == 'farmer':
-                    farmer_rewards.append(-5)
-                elif agent_type == 'builder':
-                    builder_rewards.append(-5)
-                elif agent_type == 'trader':
-                    trader_rewards.append(-5)
+                reward = -5
             
             w3.eth.wait_for_transaction_receipt(tx)
         except Exception as e:
             print(f"Action failed for {self.account[:6]}: {str(e)}")
             # Penalize in case of failure
-            if agent_type == 'farmer':
-                farmer_rewards.append(-10)
-            elif agent_type == 'builder':
-                builder_rewards.append(-10)
-            elif agent_type == 'trader':
-                trader_rewards.append(-10)
-
-
-# Initialize tracking variables for both MARL and random simulations
-total_resources_over_time = []
-farmer_rewards = []
-builder_rewards = []
-trader_rewards = []
+            reward = -10
+            failed = True
+        return action, reward, failed
+
+
+    def submit(self, action, tick):
+        """
+        Submits the transaction of an already decided action to a TickMiner, without waiting for it.
+
+        Args:
+            action: The action (0 for efficient, anything else for selfish).
+            tick: The active TickMiner.
+
+        Returns:
+            int: Index of the transaction's outcome in the list returned by `tick.mine()`.
+        """
+        function = self.contract_function_efficient if int(action) == 0 else self.contract_function_selfish
+        return tick.submit(function(), self.account)
+
+    def record_outcome(self, agent_type, action, outcome):
+        """
+        Tracks the outcome of a transaction mined by a TickMiner, as `decide_and_act` does for
+        transactions mined on their own.
+
+        Args:
+            agent_type: 'farmer', 'builder' or 'trader'.
+            action: The submitted action.
+            outcome: The transaction's outcome from `tick.mine()`.
+
+        Returns:
+            tuple: The action, the reward and whether the transaction failed.
+        """
+        from marl.tick_mining import succeeded
+
+        action = int(action)
+        if not succeeded(outcome):
+            print(f"Action failed for {self.account[:6]}: {outcome if isinstance(outcome, Exception) else 'reverted'}")
+            # Penalize in case of failure
+            return action, -10, True
+        if action == 0:
+            print(f"{self.account[:6]} chose to act efficiently.")
+            efficient_actions[agent_type] += 1
+            return action, 5, False
+        print(f"{self.account[:6]} chose to act selfishly.")
+        selfish_actions[agent_type] += 1
+        return action, -5, False
+
+
+# Initialize tracking variables for both MARL and random simulations. Per-iteration metrics are
+# streamed to `metrics_dir` instead of being kept in memory.
 efficient_actions = {'farmer': 0, 'builder': 0, 'trader': 0}
 selfish_actions = {'farmer': 0, 'builder': 0, 'trader': 0}
 
 def simulate():
     """
     Simulates the interactions of the decentralized society over multiple iterations. 
-    Each iteration, the farmer, builder, and trader agents decide and execute their actions.
-    Tracks the total resources and actions taken over time.
+    Each iteration, the actions of the farmer, builder, and trader agents are decided in one batched
+    forward pass, then executed. The total resources and every agent's action, reward and failure
+    are streamed to `metrics_dir`. With `tick_mining`, each iteration is mined as a single block
+    (see `simulate_tick_batched`). The RPC latency and gas metrics are printed at the end.
+    """
+    with MetricsSink(metrics_dir, society_columns()) as sink:
+        if tick_mining:
+            simulate_tick_batched(sink)
+        else:
+            simulate_per_action(sink)
+
+    print(rpc_metrics.summary())
+    print(f"View cache: {view_cache.summary()}")
+
+    # Plot results or write them to a CSV for further analysis
+    plot_results()
+
+def observe(total_resources, last_action_success):
+    """
+    Returns the observation the agents decide on, as `DecentralizedSocietyEnv.step` would return
+    it, from the resources read from the pool and the success of the last tick's actions. The
+    environment is updated too, so `env.get_observation()` reports the same state.
+
+    Args:
+        total_resources: Resources in the pool, as read with `getTotalResources`.
+        last_action_success: 1 if every action of the last tick succeeded, else 0.
+    """
+    env.total_resources = total_resources
+    env.last_action_success = int(last_action_success)
+    return env.get_observation()
+
+def simulate_per_action(sink):
+    """
+    Runs the simulation with one block per agent action: every transaction is sent and waited for
+    before the next agent acts, so the builder and trader see the resources left by the farmer.
+
+    Args:
+        sink: The MetricsSink the per-iteration metrics are appended to.
     """
+    total_resources = resource_pool.functions.getTotalResources().call()
+    last_action_success = 1
     for i in range(iterations):
         print(f"\nIteration {i+1}")
+        row = society_row(i + 1)
 
-        # Agents decide and act
-        farmer_agent.decide_and_act('farmer')
+        # All agents observe the same society state, so one forward pass decides the whole tick
+        with rpc_metrics.timer('decide'):
+            actions = decision_stage.decide_shared(observe(total_resources, last_action_success), len(agents))
+
+        # Agents act
+        outcomes = [farmer_agent.decide_and_act('farmer', actions[0])]
+        row.update(agent_metrics('farmer', *outcomes[0]))
         total_resources = resource_pool.functions.getTotalResources().call()
-        total_resources_over_time.append(total_resources)
+        row['total_resources'] = total_resources
         print(f"Total Resources in Society: {total_resources}")
 
         if total_resources >= 5:
-            builder_agent.decide_and_act('builder')
+            outcomes.append(builder_agent.decide_and_act('builder', actions[1]))
+            row.update(agent_metrics('builder', *outcomes[-1]))
 
         if total_resources >= 10:
-            trader_agent.decide_and_act('trader')
+            outcomes.append(trader_agent.decide_and_act('trader', actions[2]))
+            row.update(agent_metrics('trader', *outcomes[-1]))
+
+        sink.append(**row)
+        if len(outcomes) > 1:
+            # The next tick observes the pool after the builder's and trader's actions too
+            total_resources = resource_pool.functions.getTotalResources().call()
+        last_action_success = int(not any(failed for _, _, failed in outcomes))
 
         # Track the results of each agent's action
         print(f"Efficient Actions: {efficient_actions}")
         print(f"Selfish Actions: {selfish_actions}")
 
-    # Plot results or write them to a CSV for further analysis
-    plot_results()
+def simulate_tick_batched(sink):
+    """
+    Runs the simulation with one block per iteration: automine is turned off, the transactions of
+    all acting agents are submitted without waiting, then a single block is mined with `evm_mine`
+    and the receipts are collected in one batch request. The transactions execute in agent order
+    within the block.
+
+    Since no transaction of the tick is mined before the others are sent, the builder and trader
+    are gated on the resources at the start of the iteration rather than after the farmer's action.
+
+    Args:
+        sink: The MetricsSink the per-iteration metrics are appended to.
+    """
+    from marl.tick_mining import TickMiner
+
+    total_resources = resource_pool.functions.getTotalResources().call()
+    last_action_success = 1
+    with TickMiner(w3) as tick:
+        for i in range(iterations):
+            print(f"\nIteration {i+1}")
+            row = society_row(i + 1)
+
+            # All agents observe the same society state, so one forward pass decides the whole tick
+            with rpc_metrics.timer('decide'):
+                actions = decision_stage.decide_shared(observe(total_resources, last_action_success), len(agents))
+
+            acting = [('farmer', farmer_agent, actions[0])]
+            if total_resources >= 5:
+                acting.append(('builder', builder_agent, actions[1]))
+            if total_resources >= 10:
+                acting.append(('trader', trader_agent, actions[2]))
+
+            # Agents act, all in the same block
+            submitted = [agent.submit(action, tick) for _, agent, action in acting]
+            outcomes = tick.mine()
+            last_action_success = 1
+            for (agent_type, agent, action), index in zip(acting, submitted):
+                action, reward, failed = agent.record_outcome(agent_type, action, outcomes[index])
+                row.update(agent_metrics(agent_type, action, reward, failed))
+                last_action_success &= not failed
+
+            total_resources = resource_pool.functions.getTotalResources().call()
+            row['total_resources'] = total_resources
+            print(f"Total Resources in Society: {total_resources}")
+            sink.append(**row)
+
+            # Track the results of each agent's action
+            print(f"Efficient Actions: {efficient_actions}")
+            print(f"Selfish Actions: {selfish_actions}")
 
 def plot_results():
     """
     Plot the results of the simulation for analysis.
     """
+    import matplotlib.pyplot as plt
+
     # Plot total resources over time
+    total_resources_over_time = load_metrics(metrics_dir, ['total_resources'])['total_resources']
     plt.plot(total_resources_over_time, label="Total Resources")
     plt.title("Total Resources Over Time")
     plt.xlabel("Iteration")
@@ -384,16 +385,38 @@ def plot_results():
     plt.show()
 
     # Optionally: Write metrics to CSV
-    with open('simulation_results_with_agents.csv', 'w', newline='') as csvfile:
-        csv_writer = csv.writer(csvfile)
-        csv_writer.writerow(['Iteration', 'Total Resources', 'Farmer Reward', 'Builder Reward', 'Trader Reward'])
-        for i in range(len(total_resources_over_time)):
-            csv_writer.writerow([i+1, total_resources_over_time[i], farmer_rewards[i], builder_rewards[i], trader_rewards[i]])
-
-# Initialize agents
-farmer_agent = Agent(accounts[0], farmer.functions.farmEfficient, farmer.functions.farmSelfish, model)
-builder_agent = Agent(accounts[1], builder.functions.buildEfficient, builder.functions.buildSelfish, model)
-trader_agent = Agent(accounts[2], trader.functions.tradeEfficient, trader.functions.tradeSelfish, model)
-
-# Run the simulation
-simulate()
\ No newline at end of file
+    export_csv(metrics_dir, 'simulation_results_with_agents.csv', *society_csv_columns())
+
+def main(argv=None):
+    """
+    Command line entry point: `python -m marl.decentralized_society_with_agents`.
+    """
+    global iterations, metrics_dir, tick_mining
+    parser = argparse.ArgumentParser(description="Run the decentralized society simulation with trained agents.")
+    parser.add_argument('--iterations', type=int, default=iterations, help="Number of simulation iterations")
+    parser.add_argument('--node-url', default=default_node_url, help="HTTP URL of the Hardhat node")
+    parser.add_argument('--backend', choices=BACKENDS, default='http',
+                        help="Chain to run on: the Hardhat node at --node-url, or an in-process EVM")
+    parser.add_argument('--model-path', default=model_path, help="Path of the trained model, without extension")
+    parser.add_argument('--train', type=int, metavar='TIMESTEPS', help="Retrain the model for this many timesteps first")
+    parser.add_argument('--metrics-dir', default=metrics_dir, help="Directory the per-iteration metrics are streamed to")
+    parser.add_argument('--tick-mining', action='store_true', help="Mine all transactions of an iteration in a single block")
+    parser.add_argument('--rpc-metrics', metavar='PATH', help="Write the RPC latency and gas metrics to this JSON file at the end")
+    parser.add_argument('--prometheus-port', type=int, help="Serve the RPC metrics to Prometheus on this port while running")
+    args = parser.parse_args(argv)
+
+    if args.train:
+        train(args.train, args.model_path)
+    iterations = args.iterations
+    metrics_dir = args.metrics_dir
+    tick_mining = args.tick_mining
+    connect(args.node_url, backend=args.backend)
+    load_agents(args.model_path)
+    if args.prometheus_port:
+        rpc_metrics.serve(args.prometheus_port)
+    simulate()
+    if args.rpc_metrics:
+        rpc_metrics.to_json(args.rpc_metrics)
+
+if __name__ == '__main__':
+    main()
@@ -1,37 +1,69 @@
 import random
-from web3 import Web3
-import json
-import matplotlib.pyplot as plt
-import csv
+import argparse
 
-w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+from marl.backends import BACKENDS, make_web3
+from marl.metrics_sink import MetricsSink, export_csv, load_metrics, society_columns, society_csv_columns, society_row
+from marl.rpc_metrics import instrument
+from marl.view_cache import cache_views
 
-# Addresses of deployed contracts (replace these with actual addresses)
-resource_pool_address = '0x5FbDB2315678afecb367f032d93F642f64180aa3'
-farmer_address = '0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512'
-builder_address = '0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0'
-trader_address = '0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9'
+# web3 and matplotlib are imported where they are first used, so importing this module does not
+# connect to a node.
 
-with open('../artifacts/contracts/decentralizedSociety/ResourcePool.sol/ResourcePool.json') as f:
-    resource_pool_abi = json.load(f)['abi']
+default_node_url = 'http://127.0.0.1:8545'
 
-with open('../artifacts/contracts/decentralizedSociety/Farmer.sol/Farmer.json') as f:
-    farmer_abi = json.load(f)['abi']
-
-with open('../artifacts/contracts/decentralizedSociety/Builder.sol/Builder.json') as f:
-    builder_abi = json.load(f)['abi']
-
-with open('../artifacts/contracts/decentralizedSociety/Trader.sol/Trader.json') as f:
-    trader_abi = json.load(f)['abi']
-
-resource_pool = w3.eth.contract(address=resource_pool_address, abi=resource_pool_abi)
-farmer = w3.eth.contract(address=farmer_address, abi=farmer_abi)
-builder = w3.eth.contract(address=builder_address, abi=builder_abi)
-trader = w3.eth.contract(address=trader_address, abi=trader_abi)
+# Addresses of deployed contracts (the ones `scripts/decentralizedSociety.ts` gets on a fresh node)
+default_addresses = {
+    'resource_pool': '0x5FbDB2315678afecb367f032d93F642f64180aa3',
+    'farmer': '0xe7f1725E7734CE288F8367e1Bb143E90bb3F0512',
+    'builder': '0x9fE46736679d2D9a65F0992F2272dE9f3c7fa6e0',
+    'trader': '0xCf7Ed3AccA5a467e9e704C703E8D87F634fB0Fc9',
+}
 
 # Simulation parameters
-accounts = w3.eth.accounts
 iterations = 50
+tick_mining = False  # Mine every iteration as a single block (see `simulate_tick_batched`)
+metrics_dir = "simulation_metrics_no_agents"
+
+# Set by `connect`
+w3 = None
+resource_pool = farmer = builder = trader = None
+accounts = []
+agent_farmer = agent_builder = agent_trader = None
+rpc_metrics = None  # RpcMetrics of `w3` (see `marl.rpc_metrics`)
+view_cache = None  # ViewCache of `w3` (see `marl.view_cache`)
+
+def connect(node_url=default_node_url, addresses=None, backend='http'):
+    """
+    Connects to the node and binds the deployed society contracts. Every request to the node is
+    recorded in `rpc_metrics`, and view calls are cached in `view_cache`.
+
+    Args:
+        node_url: HTTP URL of the node.
+        addresses: Dict with the `resource_pool`, `farmer`, `builder` and `trader` addresses.
+            Defaults to `default_addresses`.
+        backend: 'http' for the node at `node_url`, or 'eth-tester' for a fresh in-process chain,
+            on which the society contracts are deployed first (see `marl.backends`).
+    """
+    global w3, resource_pool, farmer, builder, trader, accounts, agent_farmer, agent_builder, agent_trader, rpc_metrics, view_cache
+    from marl.deployer import connect_society, deploy_society
+
+    w3 = make_web3(backend, node_url)
+    if backend == 'http':
+        resource_pool, farmer, builder, trader = connect_society(w3, addresses or default_addresses)
+    else:
+        resource_pool, farmer, builder, trader = deploy_society(w3)
+    rpc_metrics = instrument(w3)
+    for name, contract in (('ResourcePool', resource_pool), ('Farmer', farmer), ('Builder', builder), ('Trader', trader)):
+        rpc_metrics.register_abi(contract.abi, name)
+    view_cache = cache_views(w3)
+    for contract in (farmer, builder, trader):
+        view_cache.mark_immutable(contract, 'resourcePool')
+    accounts = w3.eth.accounts
+
+    # Initialize agents
+    agent_farmer = FarmerRLAgent(accounts[0], "model")
+    agent_builder = BuilderRLAgent(accounts[2], "model")
+    agent_trader = TraderRLAgent(accounts[2], "model")
 
 class FarmerRLAgent:
     """
@@ -170,103 +202,172 @@ class TraderRLAgent:
             
         w3.eth.wait_for_transaction_receipt(tx_trade)
 
-# Initialize agents
-agent_farmer = FarmerRLAgent(accounts[0], "model") 
-agent_builder = BuilderRLAgent(accounts[2], "model")
-agent_trader = TraderRLAgent(accounts[2], "model")
-
-# Initialize tracking variables for both MARL and random simulations
-total_resources_over_time = []
-farmer_rewards = []
-builder_rewards = []
-trader_rewards = []
+# Initialize tracking variables for both MARL and random simulations. Per-iteration metrics are
+# streamed to `metrics_dir` instead of being kept in memory.
 efficient_actions = {'farmer': 0, 'builder': 0, 'trader': 0}
 selfish_actions = {'farmer': 0, 'builder': 0, 'trader': 0}
 
 def simulate():
     """
     Simulate the decentralized society by having agents make decisions for a set number of iterations.
-    Track total resources and agent actions over time.
+    The total resources and every agent's action, reward and failure are streamed to `metrics_dir`.
+    With `tick_mining`, each iteration is mined as a single block (see `simulate_tick_batched`).
+    The RPC latency and gas metrics are printed at the end.
     """
-    for i in range(iterations):
-        print(f"\nIteration {i+1}")
-
-        # Step 1: Farmer's choice: either farm efficiently or selfishly
-        try:
-            if random.choice([True, False]):  # Randomly choose efficient or selfish
-                tx_farm = farmer.functions.farmEfficient().transact({'from': accounts[0]})
-                print("Farmer chose to farm efficiently")
-                efficient_actions['farmer'] += 1
-                farmer_rewards.append(5)  # Reward for efficient farming
-            else:
-                tx_farm = farmer.functions.farmSelfish().transact({'from': accounts[0]})
-                print("Farmer chose to farm selfishly")
-                selfish_actions['farmer'] += 1
-                farmer_rewards.append(-5)  # Penalty for selfish farming
-            w3.eth.wait_for_transaction_receipt(tx_farm)
-        except Exception as e:
-            print(f"Farmer failed to farm: {e}")
-            farmer_rewards.append(-10)  # Penalty for failure
-
-        # Step 2: Check total resources in society
-        total_resources = resource_pool.functions.getTotalResources().call()
-        print(f"Total Resources in Society: {total_resources}")
-        total_resources_over_time.append(total_resources)
-
-        # Step 3: Builder's choice: either build efficiently or selfishly
-        if total_resources >= 5:  # Assuming builder needs at least 5 resources
-            try:
-                if random.choice([True, False]):  # Randomly choose efficient or selfish
-                    tx_build = builder.functions.buildEfficient().transact({'from': accounts[1]})
-                    print("Builder chose to build efficiently")
-                    efficient_actions['builder'] += 1
-                    builder_rewards.append(5)  # Reward for efficient building
-                else:
-                    tx_build = builder.functions.buildSelfish().transact({'from': accounts[1]})
-                    print("Builder chose to build selfishly")
-                    selfish_actions['builder'] += 1
-                    builder_rewards.append(-5)  # Penalty for selfish building
-                w3.eth.wait_for_transaction_receipt(tx_build)
-            except Exception as e:
-                print(f"Builder failed to build: {e}")
-                builder_rewards.append(-10)  # Penalty for failure
+    with MetricsSink(metrics_dir, society_columns()) as sink:
+        if tick_mining:
+            simulate_tick_batched(sink)
         else:
-            print("Not enough resources for building")
-            builder_rewards.append(0)  # No action taken
-
-        # Step 4: Trader's choice: either trade efficiently or selfishly
-        if total_resources >= 10:  # Ensuring enough resources for a selfish trade
-            try:
-                if random.choice([True, False]):  # Randomly choose efficient or selfish
-                    tx_trade = trader.functions.tradeEfficient().transact({'from': accounts[2]})
-                    print("Trader chose to trade efficiently")
-                    efficient_actions['trader'] += 1
-                    trader_rewards.append(7)  # Reward for efficient trading
+            for i in range(iterations):
+                print(f"\nIteration {i+1}")
+                row = society_row(i + 1)
+
+                # Step 1: Farmer's choice: either farm efficiently or selfishly
+                row['farmer_action'] = 0 if random.choice([True, False]) else 1  # Randomly choose efficient or selfish
+                try:
+                    if row['farmer_action'] == 0:
+                        tx_farm = farmer.functions.farmEfficient().transact({'from': accounts[0]})
+                        print("Farmer chose to farm efficiently")
+                        efficient_actions['farmer'] += 1
+                        row['farmer_reward'] = 5  # Reward for efficient farming
+                    else:
+                        tx_farm = farmer.functions.farmSelfish().transact({'from': accounts[0]})
+                        print("Farmer chose to farm selfishly")
+                        selfish_actions['farmer'] += 1
+                        row['farmer_reward'] = -5  # Penalty for selfish farming
+                    w3.eth.wait_for_transaction_receipt(tx_farm)
+                except Exception as e:
+                    print(f"Farmer failed to farm: {e}")
+                    row['farmer_reward'] = -10  # Penalty for failure
+                    row['farmer_failed'] = True
+
+                # Step 2: Check total resources in society
+                total_resources = resource_pool.functions.getTotalResources().call()
+                print(f"Total Resources in Society: {total_resources}")
+                row['total_resources'] = total_resources
+
+                # Step 3: Builder's choice: either build efficiently or selfishly
+                if total_resources >= 5:  # Assuming builder needs at least 5 resources
+                    row['builder_action'] = 0 if random.choice([True, False]) else 1  # Randomly choose efficient or selfish
+                    try:
+                        if row['builder_action'] == 0:
+                            tx_build = builder.functions.buildEfficient().transact({'from': accounts[1]})
+                            print("Builder chose to build efficiently")
+                            efficient_actions['builder'] += 1
+                            row['builder_reward'] = 5  # Reward for efficient building
+                        else:
+                            tx_build = builder.functions.buildSelfish().transact({'from': accounts[1]})
+                            print("Builder chose to build selfishly")
+                            selfish_actions['builder'] += 1
+                            row['builder_reward'] = -5  # Penalty for selfish building
+                        w3.eth.wait_for_transaction_receipt(tx_build)
+                    except Exception as e:
+                        print(f"Builder failed to build: {e}")
+                        row['builder_reward'] = -10  # Penalty for failure
+                        row['builder_failed'] = True
                 else:
-                    tx_trade = trader.functions.tradeSelfish().transact({'from': accounts[2]})
-                    print("Trader chose to trade selfishly")
-                    selfish_actions['trader'] += 1
-                    trader_rewards.append(-7)  # Penalty for selfish trading
-                w3.eth.wait_for_transaction_receipt(tx_trade)
-            except Exception as e:
-                print(f"Trader failed to trade: {e}")
-                trader_rewards.append(-10)  # Penalty for failure
-        else:
-            print("Not enough resources for trading")
-            trader_rewards.append(0)  # No action taken
+                    print("Not enough resources for building")
+                    row['builder_reward'] = 0  # No action taken
+
+                # Step 4: Trader's choice: either trade efficiently or selfishly
+                if total_resources >= 10:  # Ensuring enough resources for a selfish trade
+                    row['trader_action'] = 0 if random.choice([True, False]) else 1  # Randomly choose efficient or selfish
+                    try:
+                        if row['trader_action'] == 0:
+                            tx_trade = trader.functions.tradeEfficient().transact({'from': accounts[2]})
+                            print("Trader chose to trade efficiently")
+                            efficient_actions['trader'] += 1
+                            row['trader_reward'] = 7  # Reward for efficient trading
+                        else:
+                            tx_trade = trader.functions.tradeSelfish().transact({'from': accounts[2]})
+                            print("Trader chose to trade selfishly")
+                            selfish_actions['trader'] += 1
+                            row['trader_reward'] = -7  # Penalty for selfish trading
+                        w3.eth.wait_for_transaction_receipt(tx_trade)
+                    except Exception as e:
+                        print(f"Trader failed to trade: {e}")
+                        row['trader_reward'] = -10  # Penalty for failure
+                        row['trader_failed'] = True
+                else:
+                    print("Not enough resources for trading")
+                    row['trader_reward'] = 0  # No action taken
+
+                sink.append(**row)
+
+                # Print final resources after actions
+                total_resources = resource_pool.functions.getTotalResources().call()
+                print(f"Total Resources after trading: {total_resources}")
 
-        # Print final resources after actions
-        total_resources = resource_pool.functions.getTotalResources().call()
-        print(f"Total Resources after trading: {total_resources}")
+    print(rpc_metrics.summary())
+    print(f"View cache: {view_cache.summary()}")
 
     # Plot results or write them to a CSV for further analysis
     plot_results()
 
+def simulate_tick_batched(sink):
+    """
+    Runs the baseline with one block per iteration: automine is turned off, the transactions of all
+    acting agents are submitted without waiting, then a single block is mined with `evm_mine` and
+    the receipts are collected in one batch request. The builder and trader are gated on the
+    resources at the start of the iteration, since the farmer's transaction is not mined yet.
+
+    Args:
+        sink: The MetricsSink the per-iteration metrics are appended to.
+    """
+    from marl.tick_mining import TickMiner, succeeded
+
+    # Agent type: (account, efficient function, selfish function, resources needed to act, reward)
+    roles = {
+        'farmer': (accounts[0], farmer.functions.farmEfficient, farmer.functions.farmSelfish, 0, 5),
+        'builder': (accounts[1], builder.functions.buildEfficient, builder.functions.buildSelfish, 5, 5),
+        'trader': (accounts[2], trader.functions.tradeEfficient, trader.functions.tradeSelfish, 10, 7),
+    }
+
+    total_resources = resource_pool.functions.getTotalResources().call()
+    with TickMiner(w3) as tick:
+        for i in range(iterations):
+            print(f"\nIteration {i+1}")
+            row = society_row(i + 1)
+
+            submitted = {}
+            for agent_type, (account, efficient, selfish, needed, _) in roles.items():
+                if total_resources < needed:
+                    print(f"Not enough resources for the {agent_type}")
+                    row[f'{agent_type}_reward'] = 0  # No action taken
+                    continue
+                action = 0 if random.choice([True, False]) else 1  # Randomly choose efficient or selfish
+                row[f'{agent_type}_action'] = action
+                submitted[agent_type] = tick.submit((efficient if action == 0 else selfish)(), account)
+
+            outcomes = tick.mine()
+            for agent_type, index in submitted.items():
+                reward = roles[agent_type][4]
+                if not succeeded(outcomes[index]):
+                    print(f"{agent_type.capitalize()} action failed")
+                    row[f'{agent_type}_reward'] = -10  # Penalty for failure
+                    row[f'{agent_type}_failed'] = True
+                elif row[f'{agent_type}_action'] == 0:
+                    print(f"{agent_type.capitalize()} acted efficiently")
+                    efficient_actions[agent_type] += 1
+                    row[f'{agent_type}_reward'] = reward
+                else:
+                    print(f"{agent_type.capitalize()} acted selfishly")
+                    selfish_actions[agent_type] += 1
+                    row[f'{agent_type}_reward'] = -reward
+
+            total_resources = resource_pool.functions.getTotalResources().call()
+            row['total_resources'] = total_resources
+            print(f"Total Resources in Society: {total_resources}")
+            sink.append(**row)
+
 def plot_results():
     """
     Plot the simulation results.
     """
+    import matplotlib.pyplot as plt
+
     # Plot total resources over time
+    total_resources_over_time = load_metrics(metrics_dir, ['total_resources'])['total_resources']
     plt.plot(total_resources_over_time, label="Total Resources")
     plt.title("Total Resources Over Time")
     plt.xlabel("Iteration")
@@ -275,11 +376,33 @@ def plot_results():
     plt.show()
 
     # Optionally: Write metrics to CSV
-    with open('simulation_results_no_agents.csv', 'w', newline='') as csvfile:
-        csv_writer = csv.writer(csvfile)
-        csv_writer.writerow(['Iteration', 'Total Resources', 'Farmer Reward', 'Builder Reward', 'Trader Reward'])
-        for i in range(len(total_resources_over_time)):
-            csv_writer.writerow([i+1, total_resources_over_time[i], farmer_rewards[i], builder_rewards[i], trader_rewards[i]])
-
-# Run the simulation
-simulate()
+    export_csv(metrics_dir, 'simulation_results_no_agents.csv', *society_csv_columns())
+
+def main(argv=None):
+    """
+    Command line entry point: `python -m marl.decentralized_society_without_agents`.
+    """
+    global iterations, metrics_dir, tick_mining
+    parser = argparse.ArgumentParser(description="Run the random-decision baseline of the decentralized society simulation.")
+    parser.add_argument('--iterations', type=int, default=iterations, help="Number of simulation iterations")
+    parser.add_argument('--node-url', default=default_node_url, help="HTTP URL of the Hardhat node")
+    parser.add_argument('--backend', choices=BACKENDS, default='http',
+                        help="Chain to run on: the Hardhat node at --node-url, or an in-process EVM")
+    parser.add_argument('--metrics-dir', default=metrics_dir, help="Directory the per-iteration metrics are streamed to")
+    parser.add_argument('--tick-mining', action='store_true', help="Mine all transactions of an iteration in a single block")
+    parser.add_argument('--rpc-metrics', metavar='PATH', help="Write the RPC latency and gas metrics to this JSON file at the end")
+    parser.add_argument('--prometheus-port', type=int, help="Serve the RPC metrics to Prometheus on this port while running")
+    args = parser.parse_args(argv)
+
+    iterations = args.iterations
+    metrics_dir = args.metrics_dir
+    tick_mining = args.tick_mining
+    connect(args.node_url, backend=args.backend)
+    if args.prometheus_port:
+        rpc_metrics.serve(args.prometheus_port)
+    simulate()
+    if args.rpc_metrics:
+        rpc_metrics.to_json(args.rpc_metrics)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+from typing import NamedTuple
+
+from eth_account import Account
+from web3.contract import Contract
+
+from marl.artifacts import load_abi, load_artifact
+
+
+def deploy(w3, source, contract_name, *args, deployer=None, with_receipt=False):
+    """
+    Deploys a contract from its Hardhat artifact directly through web3.
+
+    Args:
+        w3: The Web3 instance.
+        source: Path of the Solidity file relative to `contracts/`.
+        contract_name: Name of the contract to deploy.
+        *args: Constructor arguments.
+        deployer: Sending account. Defaults to the node's first account, as in the Hardhat scripts.
+        with_receipt: If True, the deployment receipt is returned along with the contract, e.g. to
+            pin the first reads to its block.
+
+    Returns:
+        Contract: A contract instance bound to the deployed address, or a (contract, receipt) tuple
+            with `with_receipt`.
+    """
+    abi, bytecode = load_artifact(source, contract_name)
+    if deployer is None:
+        deployer = w3.eth.accounts[0]
+    factory = w3.eth.contract(abi=abi, bytecode=bytecode)
+    tx_hash = factory.constructor(*args).transact({'from': deployer})
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    contract = w3.eth.contract(address=receipt['contractAddress'], abi=abi)
+    return (contract, receipt) if with_receipt else contract
+
+
+class SocietyContracts(NamedTuple):
+    """
+    Handles of the contracts deployed by `scripts/decentralizedSociety.ts`.
+    """
+    resource_pool: Contract
+    farmer: Contract
+    builder: Contract
+    trader: Contract
+
+
+def deploy_auction(w3, bidding_time=30, beneficiary=None, deployer=None, with_receipt=False):
+    """
+    Deploys the Auction contract, like `scripts/auction.ts`.
+
+    Args:
+        w3: The Web3 instance.
+        bidding_time: Duration of the auction in seconds.
+        beneficiary: Address receiving the highest bid. Defaults to a freshly generated address.
+        deployer: Sending account. Defaults to the node's first account.
+        with_receipt: If True, the deployment receipt is returned too (see `deploy`).
+
+    Returns:
+        Contract: The deployed Auction contract, or a (contract, receipt) tuple with `with_receipt`.
+    """
+    if beneficiary is None:
+        beneficiary = Account.create().address
+    return deploy(w3, 'auction.sol', 'Auction', bidding_time, beneficiary, deployer=deployer, with_receipt=with_receipt)
+
+
+def deploy_dao(w3, deployer=None):
+    """
+    Deploys the DAO contract, like `scripts/dao.ts`.
+
+    Returns:
+        Contract: The deployed DAO contract.
+    """
+    return deploy(w3, 'dao.sol', 'DAO', deployer=deployer)
+
+
+def deploy_society(w3, deployer=None):
+    """
+    Deploys the ResourcePool and the Farmer, Builder and Trader contracts bound to it, like
+    `scripts/decentralizedSociety.ts`.
+
+    Returns:
+        SocietyContracts: The deployed contracts.
+    """
+    if deployer is None:
+        deployer = w3.eth.accounts[0]
+    resource_pool = deploy(w3, 'decentralizedSociety/resourcePool.sol', 'ResourcePool', deployer=deployer)
+    return SocietyContracts(
+        resource_pool=resource_pool,
+        farmer=deploy(w3, 'decentralizedSociety/farmer.sol', 'Farmer', resource_pool.address, deployer=deployer),
+        builder=deploy(w3, 'decentralizedSociety/builder.sol', 'Builder', resource_pool.address, deployer=deployer),
+        trader=deploy(w3, 'decentralizedSociety/trader.sol', 'Trader', resource_pool.address, deployer=deployer),
+    )
+
+
+def connect_society(w3, addresses):
+    """
+    Builds contract handles for a society deployed at the given addresses.
+
+    Args:
+        w3: The Web3 instance.
+        addresses: Dict with the `resource_pool`, `farmer`, `builder` and `trader` addresses.
+
+    Returns:
+        SocietyContracts: The contract handles.
+    """
+    return SocietyContracts(
+        resource_pool=w3.eth.contract(address=addresses['resource_pool'], abi=load_abi('decentralizedSociety/resourcePool.sol', 'ResourcePool')),
+        farmer=w3.eth.contract(address=addresses['farmer'], abi=load_abi('decentralizedSociety/farmer.sol', 'Farmer')),
+        builder=w3.eth.contract(address=addresses['builder'], abi=load_abi('decentralizedSociety/builder.sol', 'Builder')),
+        trader=w3.eth.contract(address=addresses['trader'], abi=load_abi('decentralizedSociety/trader.sol', 'Trader')),
+    )
@@ -0,0 +1,156 @@
+import time
+
+from marl.rpc_metrics import collector
+from marl.view_cache import view_cache
+
+
+class HardhatChain:
+    """
+    Thin wrapper around the Hardhat node's development RPC methods (`evm_*`), used to control
+    chain time and block production from the simulations.
+
+    Attributes:
+        w3: The Web3 instance connected to the Hardhat node.
+    """
+    def __init__(self, w3):
+        """
+        Initializes the wrapper.
+
+        Args:
+            w3: A Web3 instance connected to a Hardhat node.
+        """
+        self.w3 = w3
+
+    def _request(self, method, params):
+        return self.w3.manager.request_blocking(method, params)
+
+    def batch(self, requests, raise_errors=True):
+        """
+        Sends several RPC requests in one JSON-RPC batch (one HTTP round trip). Providers without
+        batch support get the requests one by one.
+
+        Args:
+            requests: List of (method, params) tuples, executed by the node in order.
+            raise_errors: If False, a failed request yields a ValueError in its place in the
+                results instead of failing the whole batch.
+
+        Returns:
+            list: The results, in request order.
+
+        Raises:
+            ValueError: If any request returned an error and `raise_errors` is True.
+        """
+        make_batch_request = getattr(self.w3.provider, 'make_batch_request', None)
+        if make_batch_request is None:
+            results = []
+            for method, params in requests:
+                try:
+                    results.append(self._request(method, params))
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    results.append(ValueError(str(e)))
+            return results
+        requests = list(requests)
+        metrics = collector(self.w3)
+        start = time.perf_counter()
+        responses = make_batch_request(requests)
+        if metrics is not None:
+            # The provider is called directly, past the middleware that records single requests
+            metrics.record_batch(requests, responses, time.perf_counter() - start)
+        cache = view_cache(self.w3)
+        if cache is not None:
+            if isinstance(responses, list):
+                for (method, _), response in zip(requests, responses):
+                    cache.observe(method, response)
+            else:
+                cache.invalidate()
+        if not isinstance(responses, list):
+            raise ValueError(f"Batch request failed: {responses.get('error')}")
+        errors = [response['error'] for response in responses if 'error' in response]
+        if errors and raise_errors:
+            raise ValueError(f"Batch request failed: {errors[0]}")
+        return [
+            ValueError(response['error'].get('message', response['error'])) if 'error' in response else response['result']
+            for response in responses
+        ]
+
+    def latest_timestamp(self):
+        """
+        Returns the timestamp of the latest block.
+        """
+        return self.w3.eth.get_block('latest')['timestamp']
+
+    def increase_time(self, seconds):
+        """
+        Moves chain time forward; the offset applies from the next mined block.
+
+        Args:
+            seconds: Number of seconds to add.
+
+        Returns:
+            int: The total time offset applied by the node so far.
+        """
+        return int(self._request('evm_increaseTime', [int(seconds)]))
+
+    def set_next_block_timestamp(self, timestamp):
+        """
+        Fixes the timestamp of the next mined block.
+
+        Args:
+            timestamp: Unix timestamp, strictly greater than the latest block's.
+        """
+        self._request('evm_setNextBlockTimestamp', [int(timestamp)])
+
+    def mine(self, timestamp=None):
+        """
+        Mines a single block, optionally with the given timestamp.
+        """
+        self._request('evm_mine', [int(timestamp)] if timestamp is not None else [])
+
+    def set_automine(self, enabled):
+        """
+        Turns automatic mining of every transaction on or off (`evm_setAutomine`). With automine
+        off, sent transactions wait in the mempool until `mine` is called.
+        """
+        self._request('evm_setAutomine', [bool(enabled)])
+
+    def snapshot(self):
+        """
+        Takes a snapshot of the whole chain state (`evm_snapshot`).
+
+        Returns:
+            str: Snapshot identifier to pass to `revert`.
+        """
+        return self._request('evm_snapshot', [])
+
+    def revert(self, snapshot_id):
+        """
+        Restores the chain state of a snapshot (`evm_revert`). The node consumes the snapshot (and
+        every later one), so a new snapshot must be taken to revert to the same state again.
+
+        Args:
+            snapshot_id: Identifier returned by `snapshot`.
+
+        Returns:
+            bool: True if the snapshot existed and was restored.
+        """
+        return bool(self._request('evm_revert', [snapshot_id]))
+
+    def revert_and_snapshot(self, snapshot_id):
+        """
+        Reverts to a snapshot and immediately takes a new one of the same state, in a single round trip.
+
+        Args:
+            snapshot_id: Identifier returned by `snapshot`.
+
+        Returns:
+            str: The identifier of the new snapshot.
+
+        Raises:
+            ValueError: If the snapshot did not exist.
+        """
+        reverted, new_snapshot_id = self.batch([('evm_revert', [snapshot_id]), ('evm_snapshot', [])])
+        if not reverted:
+            raise ValueError(f"Unknown snapshot {snapshot_id}")
+        return new_snapshot_id
@@ -0,0 +1,199 @@
+import os
+from multiprocessing import Pool
+
+from eth_account import Account
+from eth_utils import keccak
+
+from marl.hardhat_rpc import HardhatChain
+
+# Seed of the default key set; change it to get a disjoint set of accounts
+DEFAULT_SEED = b'ethereum-simulations'
+
+# Balance every generated account is funded with (10,000 ether)
+DEFAULT_BALANCE = 10 ** 22
+
+# Batches smaller than this are signed in-process, where the pool's IPC would cost more than it saves
+MIN_PARALLEL_BATCH = 64
+
+
+def derive_key(seed, index):
+    """
+    Returns the private key of the `index`-th account of a seed, as 32 bytes.
+    """
+    return keccak(seed + index.to_bytes(32, 'big'))
+
+
+def _address(key):
+    return Account.from_key(key).address
+
+
+def _sign(item):
+    key, transaction = item
+    return '0x' + bytes(Account.sign_transaction(transaction, key).raw_transaction).hex()
+
+
+class KeyPool:
+    """
+    Deterministic local accounts for simulations that need more participants than the node's 20
+    unlocked accounts. The keys are derived from a seed, funded in one batch request with
+    `hardhat_setBalance`, and transactions are signed locally (in a process pool for large
+    batches) and sent with `eth_sendRawTransaction`, so the node does no signing.
+
+    Attributes:
+        w3: The Web3 instance.
+        chain: The HardhatChain used for batch requests.
+        addresses: Checksum addresses of the accounts, in derivation order.
+        processes: Number of signing processes; defaults to the number of CPUs.
+    """
+    def __init__(self, w3, size, seed=DEFAULT_SEED, chain=None, processes=None):
+        """
+        Derives the keys.
+
+        Args:
+            w3: A Web3 instance connected to a Hardhat node.
+            size: Number of accounts.
+            seed: Bytes the keys are derived from; the same seed always gives the same accounts.
+            chain: The HardhatChain of the node. Defaults to one built on `w3`.
+            processes: Number of signing processes; defaults to the number of CPUs.
+        """
+        self.w3 = w3
+        self.chain = chain if chain is not None else HardhatChain(w3)
+        self.processes = processes
+        self._chain_id = None
+        self._gas_price = None
+        self._nonces = {}
+        self._pool = None
+
+        # Deriving an address costs about as much as signing, so it is parallelized the same way
+        keys = [derive_key(seed, index) for index in range(size)]
+        self.addresses = self._map(_address, keys)
+        self._keys = dict(zip(self.addresses, keys))
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def __contains__(self, address):
+        return address in self._keys
+
+    @property
+    def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    def gas_price(self, refresh=False):
+        """
+        Returns the gas price the pool signs with: twice the node's, since full blocks raise the
+        base fee meanwhile. It is read from the node once per batch of `sign_transactions` and
+        reused by `transact` until the next batch or a rejected transaction.
+
+        Args:
+            refresh: Whether to read the node's gas price again.
+        """
+        if refresh or self._gas_price is None:
+            self._gas_price = 2 * self.w3.eth.gas_price
+        return self._gas_price
+
+    def fund(self, balance=DEFAULT_BALANCE):
+        """
+        Sets the balance of every account with `hardhat_setBalance`, in one batch request.
+
+        Args:
+            balance: Balance in wei.
+        """
+        self.chain.batch([('hardhat_setBalance', [address, hex(balance)]) for address in self.addresses])
+
+    def sign_transactions(self, transactions):
+        """
+        Signs transactions from the pool's accounts, in a process pool for large batches.
+
+        Args:
+            transactions: Transaction dicts with `from`, `to`, `nonce` and `gas`, and optionally
+                `data`, `value` and `gasPrice` (defaults to `gas_price`, refreshed for the batch).
+
+        Returns:
+            list: The raw signed transactions as hex strings, in order.
+        """
+        if not transactions:
+            return []
+        gas_price = None
+        items = []
+        for transaction in transactions:
+            transaction = dict(transaction)
+            key = self._keys[transaction.pop('from')]
+            if 'gasPrice' not in transaction:
+                if gas_price is None:
+                    gas_price = self.gas_price(refresh=True)
+                transaction['gasPrice'] = gas_price
+            transaction.setdefault('value', 0)
+            transaction.setdefault('data', '0x')
+            transaction['chainId'] = self.chain_id
+            items.append((key, transaction))
+
+        return self._map(_sign, items)
+
+    def _map(self, function, items):
+        processes = self.processes or os.cpu_count()
+        if len(items) < MIN_PARALLEL_BATCH or processes == 1:
+            return [function(item) for item in items]
+        if self._pool is None:
+            self._pool = Pool(processes)
+        return self._pool.map(function, items, chunksize=max(1, len(items) // (4 * processes)))
+
+    def send_raw(self, raw_transactions):
+        """
+        Sends signed transactions in one batch request.
+
+        Returns:
+            list: The transaction hashes, or a ValueError for every transaction the node rejected.
+        """
+        return self.chain.batch([('eth_sendRawTransaction', [raw]) for raw in raw_transactions], raise_errors=False)
+
+    def transact(self, function, sender, value=0, gas=None, gas_price=None):
+        """
+        Sends a single contract transaction signed locally, like `function.transact` does for
+        unlocked accounts. Nonces are counted locally from the sender's pending count, and the
+        gas price is the pool's cached one, so a transaction costs no extra round trip.
+
+        Args:
+            function: A bound contract function.
+            sender: One of the pool's addresses.
+            value: Wei sent along.
+            gas: Gas limit; estimated by the node when None.
+            gas_price: Gas price in wei; defaults to `gas_price()`.
+
+        Returns:
+            The transaction hash.
+        """
+        if sender not in self._nonces:
+            self._nonces[sender] = self.w3.eth.get_transaction_count(sender, 'pending')
+        transaction = {'from': sender, 'to': function.address, 'data': function._encode_transaction_data(),
+                       'value': value, 'nonce': self._nonces[sender]}
+        transaction['gas'] = gas if gas is not None else self.w3.eth.estimate_gas(transaction)
+        transaction['gasPrice'] = gas_price if gas_price is not None else self.gas_price()
+        raw = self.sign_transactions([transaction])[0]
+        try:
+            tx_hash = self.w3.eth.send_raw_transaction(raw)
+        except Exception:
+            # The nonce was not used, and the gas price may have fallen behind the base fee: read
+            # both from the node again next time
+            del self._nonces[sender]
+            self._gas_price = None
+            raise
+        self._nonces[sender] += 1
+        return tx_hash
+
+    def close(self):
+        """
+        Stops the signing processes.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
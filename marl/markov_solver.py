@@ -0,0 +1,313 @@
+import functools
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import splu
+
+from marl.society_env import make_in_memory_env
+
+# Number of combined actions of DecentralizedSocietyEnv (farmer, builder and trader choices)
+N_ACTIONS = 8
+
+# Solved chains kept by `solve`, least recently used first out; each holds sparse matrices and
+# results of the size of its state space
+MAX_CACHED_CHAINS = 32
+
+
+@functools.lru_cache(maxsize=None)
+def transition_table(max_resources=1000):
+    """
+    Enumerates one `DecentralizedSocietyEnv.step` of the in-memory contracts for every resource
+    level below `max_resources` and every action, so the chain follows exactly the rules (and
+    reverts) of the environment.
+
+    Args:
+        max_resources: Resource level at which an episode ends by saturation.
+
+    Returns:
+        tuple: Arrays of shape (max_resources, 8) with the resources after the step, the reward and
+        the success flag of the step.
+    """
+    env = make_in_memory_env(verbose=False)
+    next_resources = np.empty((max_resources, N_ACTIONS), dtype=np.int64)
+    rewards = np.empty((max_resources, N_ACTIONS))
+    success = np.empty((max_resources, N_ACTIONS), dtype=np.int64)
+    for resources in range(max_resources):
+        for action in range(N_ACTIONS):
+            env.resource_pool.total_resources = resources
+            observation, reward, _, _ = env.step(action)
+            next_resources[resources, action] = observation[0]
+            rewards[resources, action] = reward
+            success[resources, action] = observation[1]
+    return next_resources, rewards, success
+
+
+def policy_probabilities(policy, max_resources=1000):
+    """
+    Normalizes a stochastic policy to an array of shape (max_resources, 2, 8): the probability of
+    every action given the observed resources and last action success.
+
+    Args:
+        policy: Action probabilities of shape (8,) (state independent), (max_resources, 8)
+            (depending on the resources) or (max_resources, 2, 8) (depending on the full observation).
+        max_resources: Resource level at which an episode ends by saturation.
+
+    Returns:
+        numpy.ndarray: The probabilities.
+    """
+    policy = np.asarray(policy, dtype=float)
+    if policy.shape == (N_ACTIONS,):
+        policy = np.broadcast_to(policy, (max_resources, 2, N_ACTIONS))
+    elif policy.shape == (max_resources, N_ACTIONS):
+        policy = np.broadcast_to(policy[:, None, :], (max_resources, 2, N_ACTIONS))
+    elif policy.shape != (max_resources, 2, N_ACTIONS):
+        raise ValueError(f"Policy of shape {policy.shape} does not match {max_resources} resource levels")
+    if (policy < 0).any() or not np.allclose(policy.sum(axis=-1), 1):
+        raise ValueError("Policy rows must be probability distributions")
+    return policy
+
+
+def policy_from_model(model, max_resources=1000, exploration_rate=0.0):
+    """
+    Tabulates the policy of a trained model (a stable_baselines3 model or a NumpyPolicy) over every
+    observation: its greedy action, mixed with uniformly random actions with probability
+    `exploration_rate`, as an epsilon-greedy DQN acts.
+
+    Args:
+        model: Any object with `predict(observations, deterministic=True)`.
+        max_resources: Resource level at which an episode ends by saturation.
+        exploration_rate: Probability of a uniformly random action.
+
+    Returns:
+        numpy.ndarray: Action probabilities of shape (max_resources, 2, 8).
+    """
+    resources, success = np.meshgrid(np.arange(max_resources), [0, 1], indexing='ij')
+    observations = np.column_stack([resources.ravel(), success.ravel()]).astype(np.float32)
+    actions, _ = model.predict(observations, deterministic=True)
+    policy = np.full((max_resources * 2, N_ACTIONS), exploration_rate / N_ACTIONS)
+    policy[np.arange(len(policy)), np.asarray(actions).ravel()] += 1 - exploration_rate
+    return policy.reshape(max_resources, 2, N_ACTIONS)
+
+
+class SocietyMarkovChain:
+    """
+    Exact analysis of DecentralizedSocietyEnv under a fixed stochastic policy. The environment's
+    state is the observation (total resources, last action success), so with a policy giving
+    action probabilities per observation its evolution is a finite Markov chain: the transient
+    states are the observations with 0 <= resources < max_resources, and every step that leaves
+    the pool at 0 or below (collapse) or at max_resources or above (saturation) ends the episode.
+
+    Results are computed on first access with sparse LU factorizations and kept on the instance;
+    use `solve` to share instances between callers with the same policy.
+
+    Attributes:
+        max_resources: Resource level at which an episode ends by saturation.
+        initial_resources: Resources at the start of every episode.
+        policy: Action probabilities of shape (max_resources, 2, 8).
+        transitions: Sparse matrix of shape (n + 2, n + 2) over the n transient states followed by
+            the COLLAPSE and SATURATION absorbing states.
+        rewards: Expected reward of a step from every transient state.
+    """
+    COLLAPSE = 0
+    SATURATION = 1
+
+    def __init__(self, policy, max_resources=1000, initial_resources=100):
+        """
+        Builds the transition matrix.
+
+        Args:
+            policy: Action probabilities, see `policy_probabilities`.
+            max_resources: Resource level at which an episode ends by saturation.
+            initial_resources: Resources at the start of every episode.
+        """
+        self.max_resources = max_resources
+        self.initial_resources = initial_resources
+        self.policy = policy_probabilities(policy, max_resources)
+        self.n_states = 2 * max_resources
+
+        next_resources, step_rewards, success = transition_table(max_resources)
+        # Transient state of (resources, success) is 2 * resources + success
+        targets = 2 * next_resources + success
+        targets = np.where(next_resources <= 0, self.n_states + self.COLLAPSE, targets)
+        targets = np.where(next_resources >= max_resources, self.n_states + self.SATURATION, targets)
+
+        rows = np.repeat(np.arange(self.n_states), N_ACTIONS)
+        cols = np.repeat(targets, 2, axis=0).ravel()
+        probabilities = self.policy.reshape(self.n_states, N_ACTIONS)
+        absorbing = self.n_states + np.arange(2)
+        self.transitions = sparse.csr_matrix(
+            (np.concatenate([probabilities.ravel(), np.ones(2)]),
+             (np.concatenate([rows, absorbing]), np.concatenate([cols, absorbing]))),
+            shape=(self.n_states + 2, self.n_states + 2)
+        )
+        self.rewards = (probabilities * np.repeat(step_rewards, 2, axis=0)).sum(axis=1)
+
+    def state_index(self, resources, success=1):
+        """
+        Returns the index of the transient state of an observation.
+        """
+        if not 0 <= resources < self.max_resources:
+            raise ValueError(f"Resources {resources} are not a transient state")
+        return 2 * resources + success
+
+    @functools.cached_property
+    def absorption_probabilities(self):
+        """
+        Probability of ending the episode by collapse and by saturation from every transient state,
+        as an array of shape (n, 2). Rows sum to less than one for states from which the policy can
+        get stuck forever (e.g. repeating actions that all revert).
+        """
+        Q = self.transitions[:self.n_states, :self.n_states]
+        R = self.transitions[:self.n_states, self.n_states:].toarray()
+        # Only states that can reach an absorbing state get a non-zero probability; restricting the
+        # system to them keeps I - Q invertible when the policy has closed non-absorbing classes
+        reach = self._reaches(R.sum(axis=1) > 0)
+        probabilities = np.zeros((self.n_states, 2))
+        if reach.any():
+            probabilities[reach] = self._solve(Q[reach][:, reach], R[reach])
+        return probabilities
+
+    @functools.cached_property
+    def expected_steps(self):
+        """
+        Expected number of steps until the episode ends from every transient state; infinite where
+        the episode may never end.
+        """
+        return self._expected_total(np.ones(self.n_states))
+
+    @functools.cached_property
+    def expected_rewards(self):
+        """
+        Expected sum of the rewards of an episode from every transient state; NaN where the episode
+        may never end.
+        """
+        total = self._expected_total(self.rewards)
+        total[np.isinf(total)] = np.nan
+        return total
+
+    @functools.cached_property
+    def stationary_distribution(self):
+        """
+        Long-run fraction of steps spent at every resource level when every finished episode restarts
+        at `initial_resources`, as the environment runs under stable_baselines3's auto-reset. If the
+        policy can get stuck in a closed set of states, the mass of every such set is weighted by the
+        probability of falling into it.
+
+        Returns:
+            numpy.ndarray: Probabilities of shape (max_resources,).
+        """
+        start = self.state_index(self.initial_resources)
+        # Restarting chain: the probability of ending the episode goes back to the initial state
+        ends = np.asarray(self.transitions[:self.n_states, self.n_states:].sum(axis=1)).ravel()
+        restarts = sparse.csr_matrix((ends, (np.arange(self.n_states), np.full(self.n_states, start))),
+                                     shape=(self.n_states, self.n_states))
+        P = (self.transitions[:self.n_states, :self.n_states] + restarts).tocsr()
+        P.eliminate_zeros()
+
+        n_classes, labels = csgraph.connected_components(P, directed=True, connection='strong')
+        rows, cols = P.nonzero()
+        leaves_class = np.zeros(n_classes, dtype=bool)
+        leaves_class[labels[rows][labels[rows] != labels[cols]]] = True
+        closed = np.flatnonzero(~leaves_class)
+
+        # Probability of eventually entering every closed class from the initial state
+        entry = np.zeros(n_classes)
+        in_closed = ~leaves_class[labels]
+        if in_closed[start]:
+            entry[labels[start]] = 1
+        else:
+            transient = np.flatnonzero(~in_closed)
+            position = np.full(n_classes, -1)
+            position[closed] = np.arange(len(closed))
+            coo = P[transient].tocoo()
+            into_closed = in_closed[coo.col]
+            into = np.zeros((len(transient), len(closed)))
+            np.add.at(into, (coo.row[into_closed], position[labels[coo.col[into_closed]]]), coo.data[into_closed])
+            hit = self._solve(P[transient][:, transient], into)
+            entry[closed] = hit[np.searchsorted(transient, start)]
+
+        distribution = np.zeros(self.n_states)
+        for label in closed[entry[closed] > 0]:
+            members = np.flatnonzero(labels == label)
+            distribution[members] = entry[label] * self._class_stationary(P[members][:, members])
+        return distribution.reshape(self.max_resources, 2).sum(axis=1)
+
+    def summary(self, resources=None):
+        """
+        Returns the results for an episode starting at `resources` (by default `initial_resources`)
+        with a successful last action, as after a reset.
+
+        Returns:
+            dict: `collapse_probability`, `saturation_probability`, `expected_steps` and `expected_reward`.
+        """
+        index = self.state_index(self.initial_resources if resources is None else resources)
+        collapse, saturation = self.absorption_probabilities[index]
+        return {
+            'collapse_probability': collapse,
+            'saturation_probability': saturation,
+            'expected_steps': self.expected_steps[index],
+            'expected_reward': self.expected_rewards[index],
+        }
+
+    def _reaches(self, targets):
+        # States with a path to one of `targets`: predecessors are added until none is new
+        graph = self.transitions[:self.n_states, :self.n_states]
+        reached = targets.copy()
+        frontier = targets
+        while frontier.any():
+            frontier = (graph @ frontier.astype(float) > 0) & ~reached
+            reached |= frontier
+        return reached
+
+    def _expected_total(self, values):
+        # Expected sum of `values` over the steps of an episode, finite where the episode surely ends
+        certain = np.isclose(self.absorption_probabilities.sum(axis=1), 1)
+        total = np.full(self.n_states, np.inf)
+        if certain.any():
+            Q = self.transitions[:self.n_states, :self.n_states]
+            total[certain] = self._solve(Q[certain][:, certain], values[certain])
+        return total
+
+    @staticmethod
+    def _solve(Q, b):
+        # Solves (I - Q) x = b
+        identity = sparse.identity(Q.shape[0], format='csc')
+        return splu((identity - Q).tocsc()).solve(np.asarray(b, dtype=float))
+
+    @staticmethod
+    def _class_stationary(P):
+        # Stationary distribution of an irreducible block: pi (P - I) = 0 with one equation
+        # replaced by the normalization
+        n = P.shape[0]
+        if n == 1:
+            return np.ones(1)
+        A = (P.T - sparse.identity(n)).tolil()
+        A[n - 1, :] = np.ones(n)
+        b = np.zeros(n)
+        b[-1] = 1
+        return splu(A.tocsc()).solve(b)
+
+
+def solve(policy, max_resources=1000, initial_resources=100):
+    """
+    Returns the SocietyMarkovChain of a policy, reusing the instance (and every result it already
+    computed) when the same policy is among the last `MAX_CACHED_CHAINS` solved.
+
+    Args:
+        policy: Action probabilities, see `policy_probabilities`.
+        max_resources: Resource level at which an episode ends by saturation.
+        initial_resources: Resources at the start of every episode.
+
+    Returns:
+        SocietyMarkovChain: The chain.
+    """
+    probabilities = np.ascontiguousarray(policy_probabilities(policy, max_resources))
+    return _solved_chain(probabilities.tobytes(), max_resources, initial_resources)
+
+
+@functools.lru_cache(maxsize=MAX_CACHED_CHAINS)
+def _solved_chain(probabilities, max_resources, initial_resources):
+    # Keyed on the bytes of the policy probabilities, which are hashable unlike the array
+    policy = np.frombuffer(probabilities).reshape(max_resources, 2, N_ACTIONS)
+    return SocietyMarkovChain(policy, max_resources, initial_resources)
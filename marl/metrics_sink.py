@@ -0,0 +1,215 @@
+import os
+import csv
+import glob
+import time
+import numpy as np
+
+AGENT_TYPES = ('farmer', 'builder', 'trader')
+
+# Value of an `<agent>_action` column when the agent did not act in the iteration
+NO_ACTION = -1
+
+
+def society_columns(agent_types=AGENT_TYPES):
+    """
+    Returns the columns recorded by the society simulations: the iteration, the pool total after
+    the farmer acted, and for every agent its action (0 efficient, 1 selfish, `NO_ACTION`), its
+    reward and whether its transaction failed.
+
+    Args:
+        agent_types: Names of the agents.
+
+    Returns:
+        dict: Column name to NumPy dtype, in column order.
+    """
+    columns = {'iteration': np.int64, 'total_resources': np.int64}
+    for agent_type in agent_types:
+        columns[f'{agent_type}_action'] = np.int8
+        columns[f'{agent_type}_reward'] = np.int32
+        columns[f'{agent_type}_failed'] = np.bool_
+    return columns
+
+
+def society_row(iteration, agent_types=AGENT_TYPES):
+    """
+    Returns a row of the society columns for an iteration in which no agent has acted yet.
+    """
+    row = {'iteration': iteration}
+    for agent_type in agent_types:
+        row[f'{agent_type}_action'] = NO_ACTION
+    return row
+
+
+def agent_metrics(agent_type, action, reward, failed):
+    """
+    Returns the columns of one agent's action in a society row.
+    """
+    return {f'{agent_type}_action': action, f'{agent_type}_reward': reward, f'{agent_type}_failed': failed}
+
+
+def society_csv_columns(agent_types=AGENT_TYPES):
+    """
+    Returns the columns and header of the society CSV exports: the historical Iteration, Total
+    Resources and per-agent reward columns first, then the per-agent action and failure flags.
+
+    Returns:
+        tuple: (columns, header).
+    """
+    columns = ['iteration', 'total_resources'] + [f'{agent_type}_reward' for agent_type in agent_types]
+    header = ['Iteration', 'Total Resources'] + [f'{agent_type.capitalize()} Reward' for agent_type in agent_types]
+    for suffix in ('action', 'failed'):
+        columns += [f'{agent_type}_{suffix}' for agent_type in agent_types]
+        header += [f'{agent_type.capitalize()} {suffix.capitalize()}' for agent_type in agent_types]
+    return columns, header
+
+
+class MetricsSink:
+    """
+    Streaming, bounded-memory writer for per-iteration simulation metrics. Rows are kept in
+    preallocated column buffers of `chunk_size` rows and written to disk as one `.npz` chunk (one
+    `.npy` array per column) whenever the buffers fill up or `flush_interval` seconds have passed,
+    so memory stays constant however long the run is and a crash loses at most one chunk.
+
+    Attributes:
+        directory: Directory holding the chunk files.
+        columns: Column name to NumPy dtype.
+        chunk_size: Maximum number of rows per chunk.
+        flush_interval: Seconds after which buffered rows are written even if the chunk is not full
+            (None to only flush full chunks).
+    """
+    def __init__(self, directory, columns, chunk_size=4096, flush_interval=10.0, append=False):
+        """
+        Initializes the sink.
+
+        Args:
+            directory: Directory holding the chunk files; created if needed.
+            columns: Column name to NumPy dtype (see `society_columns`).
+            chunk_size: Maximum number of rows per chunk.
+            flush_interval: Seconds after which buffered rows are written even if the chunk is not full.
+            append: Whether to keep the chunks already in `directory` and add after them. Otherwise
+                they are removed.
+        """
+        self.directory = directory
+        self.columns = dict(columns)
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+
+        os.makedirs(directory, exist_ok=True)
+        existing = chunk_paths(directory)
+        if not append:
+            for path in existing:
+                os.remove(path)
+            existing = []
+        self._chunk_index = len(existing)
+
+        self._buffers = {name: np.zeros(chunk_size, dtype=dtype) for name, dtype in self.columns.items()}
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def append(self, **values):
+        """
+        Appends one row. Columns not given are recorded as 0 (False for flags).
+
+        Raises:
+            KeyError: If a value is given for an unknown column.
+        """
+        for name in values:
+            if name not in self._buffers:
+                raise KeyError(f"Unknown metrics column {name}")
+        for name, buffer in self._buffers.items():
+            buffer[self._size] = values.get(name, 0)
+        self._size += 1
+
+        if self._size == self.chunk_size or (
+            self.flush_interval is not None and time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows as a new chunk. The chunk is written to a temporary file first
+        and renamed, so readers never see a partial chunk.
+        """
+        self._last_flush = time.monotonic()
+        if self._size == 0:
+            return
+        path = os.path.join(self.directory, f'chunk-{self._chunk_index:06d}.npz')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **{name: buffer[:self._size] for name, buffer in self._buffers.items()})
+        os.replace(tmp_path, path)
+        self._chunk_index += 1
+        self._size = 0
+
+    def close(self):
+        """
+        Flushes the remaining rows.
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def chunk_paths(directory):
+    """
+    Returns the chunk files of a metrics directory, in write order.
+    """
+    return sorted(glob.glob(os.path.join(directory, 'chunk-*.npz')))
+
+
+def iter_chunks(directory, columns=None):
+    """
+    Yields the chunks of a metrics directory one at a time, as dicts of column arrays.
+
+    Args:
+        directory: Directory written by a MetricsSink.
+        columns: Columns to load. Defaults to all of them.
+    """
+    for path in chunk_paths(directory):
+        with np.load(path) as chunk:
+            yield {name: chunk[name] for name in (columns or chunk.files)}
+
+
+def load_metrics(directory, columns=None):
+    """
+    Loads whole columns of a metrics directory into memory, e.g. for plotting.
+
+    Args:
+        directory: Directory written by a MetricsSink.
+        columns: Columns to load. Defaults to all of them.
+
+    Returns:
+        dict: Column name to array.
+    """
+    chunks = list(iter_chunks(directory, columns))
+    if not chunks:
+        return {name: np.empty(0) for name in (columns or [])}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def export_csv(directory, csv_path, columns=None, header=None):
+    """
+    Exports a metrics directory to a row-oriented CSV file, one chunk at a time so memory use does
+    not depend on the number of rows.
+
+    Args:
+        directory: Directory written by a MetricsSink.
+        csv_path: Path of the CSV file.
+        columns: Columns to export, in order. Defaults to all of them.
+        header: Header row. Defaults to the column names.
+    """
+    with open(csv_path, 'w', newline='') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        header_written = False
+        for chunk in iter_chunks(directory, columns):
+            if not header_written:
+                csv_writer.writerow(header or list(chunk))
+                header_written = True
+            csv_writer.writerows(zip(*(chunk[name].tolist() for name in chunk)))
+        if not header_written:
+            csv_writer.writerow(header or columns or [])
+
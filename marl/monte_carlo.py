@@ -0,0 +1,304 @@
+import argparse
+import itertools
+from multiprocessing import Pool
+from typing import NamedTuple
+
+import numpy as np
+
+from marl.society_engine import (
+    FARM_EFFICIENT_YIELD,
+    FARM_SELFISH_LOSS,
+    BUILD_RESOURCES_NEEDED,
+    BUILD_RESOURCES_WASTED,
+    TRADE_EFFICIENT_GAIN,
+    TRADE_SELFISH_LOSS,
+)
+
+
+class SocietyParams(NamedTuple):
+    """
+    Rules of the random-policy baseline (`decentralized_society_without_agents.simulate`). The
+    defaults are the amounts hardcoded in the contracts and the rewards and thresholds of the baseline.
+    """
+    initial_resources: int = 100
+    farm_yield: int = FARM_EFFICIENT_YIELD
+    farm_loss: int = FARM_SELFISH_LOSS
+    build_needed: int = BUILD_RESOURCES_NEEDED
+    build_wasted: int = BUILD_RESOURCES_WASTED
+    trade_gain: int = TRADE_EFFICIENT_GAIN
+    trade_loss: int = TRADE_SELFISH_LOSS
+    build_threshold: int = 5    # The builder only acts with at least this many resources after farming
+    trade_threshold: int = 10   # Same for the trader
+    farm_reward: int = 5
+    build_reward: int = 5
+    trade_reward: int = 7
+    failure_penalty: int = 10
+
+
+def parameter_grid(**values):
+    """
+    Returns the cartesian product of parameter values as SocietyParams, the other fields keeping
+    their defaults, e.g. `parameter_grid(farm_yield=[5, 10, 15], trade_gain=[7, 14])`.
+    """
+    names = list(values)
+    return [SocietyParams(**dict(zip(names, combination))) for combination in itertools.product(*values.values())]
+
+
+def step(params, resources, choices):
+    """
+    Advances a batch of societies by one iteration of the baseline, in place.
+
+    The farmer acts first; the builder and trader then act if the resources after farming reach
+    their thresholds. Every agent's choice is encoded as one bit of `choices` (bit 0 farmer,
+    bit 1 builder, bit 2 trader; set means selfish), and an action whose `require` would fail
+    leaves the resources unchanged and is penalized, as on chain.
+
+    Args:
+        params: The SocietyParams.
+        resources: Integer array with the resources of every society; updated in place.
+        choices: Integer array with the encoded choices of every society.
+
+    Returns:
+        numpy.ndarray: The reward collected by every society in this iteration.
+    """
+    p = params
+    penalty = -p.failure_penalty
+
+    # Farmer
+    selfish = (choices & 1).astype(bool)
+    ok = ~selfish | (resources >= p.farm_loss)
+    resources += np.where(selfish, -p.farm_loss, p.farm_yield) * ok
+    reward = np.where(ok, np.where(selfish, -p.farm_reward, p.farm_reward), penalty)
+    after_farming = resources.copy()
+
+    # Builder
+    acts = after_farming >= p.build_threshold
+    selfish = (choices & 2).astype(bool)
+    cost = np.where(selfish, p.build_needed + p.build_wasted, p.build_needed)
+    ok = resources >= cost
+    resources -= cost * (acts & ok)
+    reward += acts * np.where(ok, np.where(selfish, -p.build_reward, p.build_reward), penalty)
+
+    # Trader
+    acts = after_farming >= p.trade_threshold
+    selfish = (choices & 4).astype(bool)
+    ok = ~selfish | (resources >= p.trade_loss)
+    resources += np.where(selfish, -p.trade_loss, p.trade_gain) * (acts & ok)
+    reward += acts * np.where(ok, np.where(selfish, -p.trade_reward, p.trade_reward), penalty)
+    return reward
+
+
+def transition_tables(params):
+    """
+    Compiles `step` into lookup tables. A transition only depends on the choices and on the
+    resources up to a cap above which every threshold and `require` passes, so the kernel can
+    advance a batch with one gather instead of evaluating every rule.
+
+    Returns:
+        tuple: The cap, and the resource deltas and rewards as flat arrays indexed by
+        `choices * (cap + 1) + min(resources, cap)`.
+    """
+    p = params
+    cap = p.farm_loss + p.build_needed + p.build_wasted + p.trade_loss + p.build_threshold + p.trade_threshold + 1
+    levels = np.tile(np.arange(cap + 1, dtype=np.int64), 8)
+    choices = np.repeat(np.arange(8, dtype=np.int64), cap + 1)
+    resources = levels.copy()
+    rewards = step(params, resources, choices)
+    return cap, resources - levels, rewards
+
+
+def max_resources(params, horizon):
+    """
+    Returns an upper bound of the resources reachable within `horizon` iterations.
+    """
+    return params.initial_resources + horizon * (max(params.farm_yield, 0) + max(params.trade_gain, 0))
+
+
+def max_reward(params, horizon):
+    """
+    Returns an upper bound of the total reward a society can collect within `horizon` iterations.
+    """
+    return horizon * (max(params.farm_reward, 0) + max(params.build_reward, 0) + max(params.trade_reward, 0))
+
+
+def max_penalty(params, horizon):
+    """
+    Returns an upper bound of the total penalty a society can collect within `horizon` iterations.
+    """
+    per_iteration = max(params.failure_penalty, params.farm_reward) + max(params.failure_penalty, params.build_reward) \
+        + max(params.failure_penalty, params.trade_reward)
+    return horizon * per_iteration
+
+
+def simulate_chunk(params, n_trajectories, horizon, seed):
+    """
+    Simulates `n_trajectories` independent societies for `horizon` iterations with a vectorized
+    kernel and returns mergeable histograms of the outcomes.
+
+    Args:
+        params: The SocietyParams.
+        n_trajectories: Number of societies.
+        horizon: Number of iterations.
+        seed: Seed or `numpy.random.SeedSequence` of the chunk's random stream.
+
+    Returns:
+        dict: `resources` (horizon + 1, max resources + 1) counts of societies per resource level
+        and iteration, `survival` counts per number of iterations survived before the resources
+        dropped to zero (index `horizon` for societies that never collapsed) and `reward` counts per total reward, offset by `max_penalty`.
+    """
+    rng = np.random.default_rng(seed)
+    cap, deltas, step_rewards = transition_tables(params)
+    n_levels = max_resources(params, horizon) + 1
+    offset = max_penalty(params, horizon)
+
+    resources = np.full(n_trajectories, params.initial_resources, dtype=np.int64)
+    rewards = np.zeros(n_trajectories, dtype=np.int64)
+    survival = np.full(n_trajectories, horizon, dtype=np.int64)
+    alive = np.ones(n_trajectories, dtype=bool)
+    resources_hist = np.zeros((horizon + 1, n_levels), dtype=np.int64)
+    resources_hist[0, params.initial_resources] = n_trajectories
+
+    for t in range(1, horizon + 1):
+        index = rng.integers(0, 8, n_trajectories) * (cap + 1) + np.minimum(resources, cap)
+        resources += deltas[index]
+        rewards += step_rewards[index]
+        collapsed = alive & (resources <= 0)
+        survival[collapsed] = t - 1
+        alive &= ~collapsed
+        resources_hist[t] = np.bincount(resources, minlength=n_levels)
+
+    return {
+        'resources': resources_hist,
+        'survival': np.bincount(survival, minlength=horizon + 1),
+        'reward': np.bincount(rewards + offset, minlength=offset + max_reward(params, horizon) + 1),
+    }
+
+
+def _simulate_task(task):
+    index, params, n_trajectories, horizon, seed = task
+    return index, simulate_chunk(params, n_trajectories, horizon, seed)
+
+
+def _histogram_quantiles(counts, quantiles, offset=0):
+    cumulative = np.cumsum(counts, axis=-1)
+    total = cumulative[..., -1:]
+    targets = np.asarray(quantiles) * total
+    if counts.ndim == 1:
+        return np.searchsorted(cumulative, targets, side='left') - offset
+    return np.array([np.searchsorted(c, q, side='left') for c, q in zip(cumulative, targets)]) - offset
+
+
+def summarize(params, histograms, horizon, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Turns the merged histograms of a parameter set into distributional statistics.
+
+    Returns:
+        dict: `params`, `trajectories`, `survival_rate` (fraction that never collapsed),
+        `mean_survival_time` (iterations before collapse, censored at the horizon),
+        `survival_time_quantiles`, `final_resource_quantiles`, `resource_quantiles` (one row per
+        iteration), `mean_reward` and `reward_quantiles`.
+    """
+    survival = histograms['survival']
+    n = int(survival.sum())
+    reward = histograms['reward']
+    offset = max_penalty(params, horizon)
+    levels = np.arange(len(reward)) - offset
+    resource_quantiles = _histogram_quantiles(histograms['resources'], quantiles)
+    return {
+        'params': params,
+        'trajectories': n,
+        'survival_rate': survival[horizon] / n,
+        'mean_survival_time': float(np.dot(np.arange(horizon + 1), survival) / n),
+        'survival_time_quantiles': _histogram_quantiles(survival, quantiles),
+        'final_resource_quantiles': resource_quantiles[-1],
+        'resource_quantiles': resource_quantiles,
+        'mean_reward': float(np.dot(levels, reward) / n),
+        'reward_quantiles': _histogram_quantiles(reward, quantiles, offset),
+    }
+
+
+def run_sweep(grid=None, n_trajectories=1_000_000, horizon=50, seed=0, processes=None, chunk_size=100_000,
+              quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Runs `n_trajectories` random-policy societies for every parameter set of a grid, split into
+    chunks simulated across a process pool. Every chunk draws from its own random stream, spawned
+    from `seed` with `numpy.random.SeedSequence`, so results are reproducible and independent of
+    the number of processes.
+
+    Args:
+        grid: List of SocietyParams (see `parameter_grid`). Defaults to the contracts' parameters.
+        n_trajectories: Number of trajectories per parameter set.
+        horizon: Number of iterations per trajectory (the chain baseline runs 50).
+        seed: Root seed.
+        processes: Number of worker processes; defaults to the number of CPUs. 1 runs in-process.
+        chunk_size: Number of trajectories simulated together by one task.
+        quantiles: Quantiles reported by `summarize`.
+
+    Returns:
+        list: One `summarize` dict per parameter set, in grid order.
+    """
+    if grid is None:
+        grid = [SocietyParams()]
+    grid_seeds = np.random.SeedSequence(seed).spawn(len(grid))
+
+    tasks = []
+    for index, (params, grid_seed) in enumerate(zip(grid, grid_seeds)):
+        sizes = [chunk_size] * (n_trajectories // chunk_size)
+        if n_trajectories % chunk_size:
+            sizes.append(n_trajectories % chunk_size)
+        for size, chunk_seed in zip(sizes, grid_seed.spawn(len(sizes))):
+            tasks.append((index, params, size, horizon, chunk_seed))
+
+    if processes == 1:
+        results = map(_simulate_task, tasks)
+        return _merge(grid, results, horizon, quantiles)
+    with Pool(processes) as pool:
+        return _merge(grid, pool.imap_unordered(_simulate_task, tasks), horizon, quantiles)
+
+
+def _merge(grid, results, horizon, quantiles):
+    merged = [None] * len(grid)
+    for index, histograms in results:
+        if merged[index] is None:
+            merged[index] = histograms
+        else:
+            for name, counts in histograms.items():
+                merged[index][name] += counts
+    return [summarize(params, histograms, horizon, quantiles) for params, histograms in zip(grid, merged)]
+
+
+def _parse_grid(specs):
+    values = {}
+    for spec in specs:
+        name, _, numbers = spec.partition('=')
+        if name not in SocietyParams._fields:
+            raise ValueError(f"Unknown parameter {name}")
+        values[name] = [int(number) for number in numbers.split(',')]
+    return parameter_grid(**values)
+
+
+def main(argv=None):
+    """
+    Command line entry point: `python -m marl.monte_carlo --grid farm_yield=5,10,15`.
+    """
+    parser = argparse.ArgumentParser(description="Monte Carlo sweep of the random-policy society baseline.")
+    parser.add_argument('--trajectories', type=int, default=1_000_000, help="Trajectories per parameter set")
+    parser.add_argument('--horizon', type=int, default=50, help="Iterations per trajectory")
+    parser.add_argument('--seed', type=int, default=0, help="Root seed")
+    parser.add_argument('--processes', type=int, help="Worker processes (defaults to the number of CPUs)")
+    parser.add_argument('--grid', nargs='*', default=[], metavar='NAME=V1,V2',
+                        help=f"Parameter values to sweep, among: {', '.join(SocietyParams._fields)}")
+    args = parser.parse_args(argv)
+
+    results = run_sweep(_parse_grid(args.grid), args.trajectories, args.horizon, args.seed, args.processes)
+    for result in results:
+        changed = {name: value for name, value in result['params']._asdict().items()
+                   if value != SocietyParams._field_defaults[name]}
+        print(f"{changed or 'defaults'}: survival rate {result['survival_rate']:.4f}, "
+              f"mean survival {result['mean_survival_time']:.2f}, "
+              f"final resources (5/25/50/75/95%) {result['final_resource_quantiles'].tolist()}, "
+              f"mean reward {result['mean_reward']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+import os
+import signal
+import subprocess
+import time
+from functools import partial
+
+from web3 import Web3
+from stable_baselines3.common.vec_env import SubprocVecEnv
+
+from marl.artifacts import ensure_compiled, project_root
+from marl.backends import InProcessNode
+from marl.deployer import connect_society, deploy_society
+from marl.society_env import make_chain_env
+
+# First port of a pool's nodes, clear of the main Hardhat node on 8545
+default_base_port = 8645
+
+
+class HardhatNode:
+    """
+    A local Hardhat node running as a child process on its own port.
+
+    Attributes:
+        port: The port the node listens on.
+        url: HTTP URL of the node.
+        process: The `npx hardhat node` process, or None when stopped.
+        society_addresses: Addresses of the society contracts deployed on this node.
+    """
+    def __init__(self, port):
+        self.port = port
+        self.url = f'http://127.0.0.1:{port}'
+        self.process = None
+        self.society_addresses = None
+
+    def launch(self):
+        """
+        Launches the node process without waiting for it to accept requests. It gets its own
+        process group, since `npx` runs Hardhat as a child process that must be stopped with it.
+        """
+        self.process = subprocess.Popen(
+            ["npx", "hardhat", "node", "--hostname", "127.0.0.1", "--port", str(self.port)],
+            cwd=project_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+        )
+
+    def wait_ready(self, timeout=60):
+        """
+        Blocks until the launched node answers JSON-RPC requests.
+
+        Args:
+            timeout: Seconds to wait for the node to come up.
+
+        Raises:
+            RuntimeError: If the node exits or does not answer within the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Hardhat node on port {self.port} exited with code {self.process.returncode}")
+            if self.is_healthy():
+                return
+            time.sleep(0.25)
+        self.stop()
+        raise RuntimeError(f"Hardhat node on port {self.port} did not start within {timeout} seconds")
+
+    def start(self, timeout=60):
+        """
+        Starts the node and blocks until it answers JSON-RPC requests.
+        """
+        self.launch()
+        self.wait_ready(timeout)
+
+    def stop(self):
+        """
+        Terminates the node's process group: `npx` and the Hardhat process it started. Processes
+        of the group still running once `npx` has exited (or after 10 seconds) are killed.
+        """
+        if self.process is not None:
+            self._signal_group(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                pass
+            self._signal_group(signal.SIGKILL)
+            self.process.wait()
+            self.process = None
+
+    def _signal_group(self, sig):
+        try:
+            os.killpg(self.process.pid, sig)
+        except ProcessLookupError:
+            # Every process of the group has exited already
+            pass
+
+    def is_healthy(self):
+        """
+        Returns True if the process is alive and answers JSON-RPC requests.
+        """
+        if self.process is None or self.process.poll() is not None:
+            return False
+        w3 = Web3(Web3.HTTPProvider(self.url, request_kwargs={'timeout': 2}))
+        return w3.is_connected()
+
+    def deploy_society(self):
+        """
+        Deploys the ResourcePool, Farmer, Builder and Trader contracts on this node.
+        """
+        contracts = deploy_society(Web3(Web3.HTTPProvider(self.url)))
+        self.society_addresses = {name: contract.address for name, contract in contracts._asdict().items()}
+
+
+def make_node_env(url, addresses, initial_resources=100):
+    """
+    Environment factory run inside a SubprocVecEnv worker: connects to one node of the pool and
+    returns a snapshot-reset DecentralizedSocietyEnv for the society deployed there.
+
+    Args:
+        url: HTTP URL of the node.
+        addresses: Dict with the deployed society addresses (see `connect_society`).
+        initial_resources: Resources at the start of every episode.
+
+    Returns:
+        DecentralizedSocietyEnv: The environment.
+    """
+    w3 = Web3(Web3.HTTPProvider(url))
+    return make_chain_env(w3, connect_society(w3, addresses), initial_resources=initial_resources, verbose=False)
+
+
+def make_in_process_env(initial_resources=100):
+    """
+    Environment factory run inside a SubprocVecEnv worker: starts an in-process chain (see
+    `marl.backends.InProcessNode`), deploys the society on it and returns a snapshot-reset
+    DecentralizedSocietyEnv for it.
+
+    Args:
+        initial_resources: Resources at the start of every episode.
+
+    Returns:
+        DecentralizedSocietyEnv: The environment.
+    """
+    w3 = InProcessNode().web3()
+    return make_chain_env(w3, deploy_society(w3), initial_resources=initial_resources, verbose=False)
+
+
+def make_in_process_vec_env(size, initial_resources=100, start_method=None):
+    """
+    Counterpart of `HardhatNodePool.make_vec_env` that needs no Hardhat node: each of the `size`
+    worker processes steps its environment on its own in-process chain, with no HTTP in between.
+
+    Args:
+        size: Number of environments (and worker processes).
+        initial_resources: Resources at the start of every episode.
+        start_method: Multiprocessing start method passed to SubprocVecEnv.
+
+    Returns:
+        SubprocVecEnv: The vectorized environment.
+    """
+    # Compile once here rather than in every worker
+    ensure_compiled()
+    return SubprocVecEnv([partial(make_in_process_env, initial_resources) for _ in range(size)], start_method=start_method)
+
+
+class HardhatNodePool:
+    """
+    Pool of K local Hardhat nodes on distinct ports, each with its own society deployment, so that
+    on-chain environments can run in parallel on separate cores.
+
+    Attributes:
+        nodes: The HardhatNode instances.
+        initial_resources: Resources at the start of every episode of the pool's environments.
+    """
+    def __init__(self, size, base_port=default_base_port, initial_resources=100):
+        """
+        Initializes the pool without starting any node.
+
+        Args:
+            size: Number of nodes (K).
+            base_port: Port of the first node; node i listens on `base_port + i`.
+            initial_resources: Resources at the start of every episode.
+        """
+        self.nodes = [HardhatNode(base_port + i) for i in range(size)]
+        self.initial_resources = initial_resources
+
+    def start(self, timeout=60):
+        """
+        Compiles the contracts if needed, then starts every node and deploys the society contracts on it.
+        If any node fails to start or deploy, every node is stopped before the error is raised, so no
+        `npx hardhat node` process is left behind.
+        """
+        ensure_compiled()
+        try:
+            # Launch every node first so their Node.js startups overlap
+            for node in self.nodes:
+                node.launch()
+            for node in self.nodes:
+                node.wait_ready(timeout)
+                node.deploy_society()
+        except BaseException:
+            self.stop()
+            raise
+
+    def stop(self):
+        """
+        Stops every node.
+        """
+        for node in self.nodes:
+            node.stop()
+
+    def health_check(self):
+        """
+        Returns a list with the health of every node.
+        """
+        return [node.is_healthy() for node in self.nodes]
+
+    def restart_unhealthy(self, timeout=60):
+        """
+        Restarts the nodes that died or stopped answering and redeploys their contracts.
+        Environments connected to a restarted node must be recreated, since its chain state is new.
+
+        Returns:
+            list: Indices of the restarted nodes.
+        """
+        restarted = []
+        for i, node in enumerate(self.nodes):
+            if not node.is_healthy():
+                node.stop()
+                node.start(timeout)
+                node.deploy_society()
+                restarted.append(i)
+        return restarted
+
+    def make_vec_env(self, start_method=None):
+        """
+        Exposes one DecentralizedSocietyEnv per node through a SubprocVecEnv, so each environment
+        steps in its own process against its own node.
+
+        Args:
+            start_method: Multiprocessing start method passed to SubprocVecEnv.
+
+        Returns:
+            SubprocVecEnv: The vectorized environment.
+        """
+        env_fns = [
+            partial(make_node_env, node.url, node.society_addresses, self.initial_resources)
+            for node in self.nodes
+        ]
+        return SubprocVecEnv(env_fns, start_method=start_method)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
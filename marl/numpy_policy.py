@@ -0,0 +1,190 @@
+import os
+import hashlib
+import argparse
+import numpy as np
+
+_activations = {
+    'ReLU': lambda x: np.maximum(x, 0, out=x),
+    'Tanh': lambda x: np.tanh(x, out=x),
+    'Identity': lambda x: x,
+}
+
+
+def _digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def export_policy(model_path, out_path=None):
+    """
+    Exports the Q-network of a trained stable_baselines3 DQN model to a compact `.npz` weight file
+    that `NumpyPolicy` can run without torch or stable_baselines3. The digest of the `.zip` is
+    stored with the weights, so `load_policy` can tell when the export is stale.
+
+    Args:
+        model_path: Path of the saved model, with or without the `.zip` extension.
+        out_path: Path of the weight file. Defaults to the model path with a `.npz` extension.
+
+    Returns:
+        str: The path of the weight file.
+    """
+    # Only the export needs torch and stable_baselines3
+    from stable_baselines3 import DQN
+
+    base_path = model_path[:-4] if model_path.endswith('.zip') else model_path
+    if out_path is None:
+        out_path = base_path + '.npz'
+    model = DQN.load(base_path)
+
+    weights = {}
+    activations = []
+    n_layers = 0
+    for module in model.q_net.q_net:
+        name = type(module).__name__
+        if name == 'Linear':
+            weights[f'W{n_layers}'] = module.weight.detach().cpu().numpy().T.astype(np.float32)
+            weights[f'b{n_layers}'] = module.bias.detach().cpu().numpy().astype(np.float32)
+            n_layers += 1
+        elif name in _activations:
+            activations.append(name)
+        else:
+            raise ValueError(f"Unsupported layer in Q-network: {name}")
+
+    np.savez(
+        out_path,
+        activations=np.array(activations),
+        observation_shape=np.array(model.observation_space.shape),
+        n_actions=np.array(model.action_space.n),
+        exploration_rate=np.array(model.exploration_rate),
+        source_sha256=np.array(_digest(base_path + '.zip')),
+        **weights
+    )
+    return out_path
+
+
+class NumpyPolicy:
+    """
+    Torch-free DQN policy running the exported Q-network with NumPy. Exposes the same
+    `predict(obs, deterministic=...)` interface as a stable_baselines3 DQN model.
+
+    Attributes:
+        weights: The (W, b) pairs of the linear layers, W of shape (in_features, out_features).
+        activations: Activation functions applied after every hidden layer.
+        observation_shape: Shape of a single observation.
+        n_actions: Number of discrete actions.
+        exploration_rate: Probability of a random action when predicting non-deterministically.
+    """
+    def __init__(self, weights, activations, observation_shape, n_actions, exploration_rate=0.0, seed=None):
+        """
+        Initializes the policy from its weights.
+
+        Args:
+            weights: List of (W, b) pairs, one per linear layer.
+            activations: Names of the activations applied after every hidden layer ('ReLU', 'Tanh', 'Identity').
+            observation_shape: Shape of a single observation.
+            n_actions: Number of discrete actions.
+            exploration_rate: Epsilon used when `deterministic=False`, as in DQN.predict.
+            seed: Seed of the generator used for exploration.
+        """
+        self.weights = weights
+        self.activations = [_activations[name] for name in activations]
+        self.observation_shape = tuple(observation_shape)
+        self.n_actions = n_actions
+        self.exploration_rate = exploration_rate
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def load(cls, path, seed=None):
+        """
+        Loads a weight file written by `export_policy`.
+
+        Args:
+            path: Path of the `.npz` file.
+            seed: Seed of the generator used for exploration.
+
+        Returns:
+            NumpyPolicy: The policy.
+        """
+        with np.load(path) as data:
+            n_layers = len(data['activations']) + 1
+            return cls(
+                weights=[(data[f'W{i}'], data[f'b{i}']) for i in range(n_layers)],
+                activations=[str(name) for name in data['activations']],
+                observation_shape=data['observation_shape'],
+                n_actions=int(data['n_actions']),
+                exploration_rate=float(data['exploration_rate']),
+                seed=seed
+            )
+
+    def q_values(self, observations):
+        """
+        Returns the Q-values of a batch of observations, of shape (n, n_actions).
+        """
+        x = observations.reshape(len(observations), -1)
+        for (W, b), activation in zip(self.weights[:-1], self.activations):
+            x = activation(x @ W + b)
+        W, b = self.weights[-1]
+        return x @ W + b
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=False):
+        """
+        Returns the action(s) for an observation or a batch of observations, like DQN.predict.
+
+        Args:
+            observation: A single observation or a batch of shape (n, *observation_shape).
+            state: Unused, kept for interface compatibility.
+            episode_start: Unused, kept for interface compatibility.
+            deterministic: Whether to take the greedy action; otherwise each action is random with
+                probability `exploration_rate`.
+
+        Returns:
+            tuple: The action(s) and None (no recurrent state).
+        """
+        observation = np.asarray(observation, dtype=np.float32)
+        vectorized = observation.shape != self.observation_shape
+        observations = observation if vectorized else observation[np.newaxis]
+
+        actions = self.q_values(observations).argmax(axis=1)
+        if not deterministic and self.exploration_rate > 0:
+            explore = self.rng.random(len(actions)) < self.exploration_rate
+            actions[explore] = self.rng.integers(0, self.n_actions, int(explore.sum()))
+
+        return (actions if vectorized else actions[0]), None
+
+
+def load_policy(model_path, seed=None):
+    """
+    Loads the `.npz` export of a trained model as a NumpyPolicy, without torch or
+    stable_baselines3. The export is never regenerated here: when it is missing, or was exported
+    from another version of the `.zip` next to it, an error points to `python -m marl.numpy_policy`.
+
+    Args:
+        model_path: Path of the model, without extension.
+        seed: Seed of the generator used for exploration.
+
+    Returns:
+        NumpyPolicy: The policy.
+
+    Raises:
+        FileNotFoundError: If there is no `.npz` export.
+        ValueError: If the export does not match the `.zip` model.
+    """
+    npz_path = model_path + '.npz'
+    zip_path = model_path + '.zip'
+    export_command = f"python -m marl.numpy_policy {zip_path}"
+    if not os.path.exists(npz_path):
+        raise FileNotFoundError(f"No NumPy export of the model at {npz_path}; create it with `{export_command}`")
+    if os.path.exists(zip_path):
+        with np.load(npz_path) as data:
+            source = str(data['source_sha256']) if 'source_sha256' in data else None
+        if source != _digest(zip_path):
+            raise ValueError(f"{npz_path} was not exported from {zip_path}; re-export it with `{export_command}`")
+    return NumpyPolicy.load(npz_path, seed=seed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export a trained DQN model to a NumPy weight file.")
+    parser.add_argument('model_path', help="Path of the saved stable_baselines3 model (.zip)")
+    parser.add_argument('out_path', nargs='?', help="Path of the weight file (defaults to <model>.npz)")
+    args = parser.parse_args()
+    print(f"Policy exported to {export_policy(args.model_path, args.out_path)}")
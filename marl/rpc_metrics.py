@@ -0,0 +1,499 @@
+import json
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_utils import function_abi_to_4byte_selector
+
+# web3 is imported where the middleware is built, so importing this module does not load it.
+
+# Upper bounds in seconds of the latency histogram buckets: 10 us to about 3 minutes, each bucket
+# sqrt(2) times wider than the previous one, so percentiles are estimated within about 20%
+LATENCY_BUCKETS = tuple(1e-5 * 2 ** (k / 2) for k in range(49))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Methods whose first parameter is a transaction calling a contract function
+CALL_METHODS = ('eth_call', 'eth_estimateGas', 'eth_sendTransaction')
+SEND_METHODS = ('eth_sendTransaction', 'eth_sendRawTransaction')
+
+# Sent transactions whose receipt is awaited for their gas; the oldest are forgotten beyond this
+MAX_PENDING_RECEIPTS = 100000
+
+# Function label of contract deployments
+CREATE = '<create>'
+
+# Collector of every instrumented Web3 instance, for code that talks to the provider directly
+_collectors = weakref.WeakKeyDictionary()
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets: recording a value is one bisection and two additions,
+    and the buckets map directly onto a Prometheus histogram.
+
+    Attributes:
+        bounds: Upper bounds of the buckets; values above the last one go to an overflow bucket.
+        counts: Number of values in every bucket.
+        count: Number of values recorded.
+        total: Sum of the values recorded.
+        min: Smallest value recorded.
+        max: Largest value recorded.
+    """
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        Estimates the `q`-quantile by linear interpolation within its bucket, narrowed to the
+        recorded range.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = max(self.bounds[i - 1] if i else 0.0, self.min)
+                upper = min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.max
+
+    def to_dict(self):
+        stats = {'count': self.count, 'total_seconds': self.total,
+                 'mean': self.total / self.count if self.count else 0.0, 'max': self.max}
+        for q in QUANTILES:
+            stats[f'p{round(q * 100)}'] = self.quantile(q)
+        return stats
+
+
+class GasStats:
+    """
+    Gas used by the mined transactions of one contract function.
+
+    Attributes:
+        count: Number of receipts.
+        reverted: Number of receipts with status 0.
+        total: Total gas used.
+        min: Smallest gas used.
+        max: Largest gas used.
+    """
+    def __init__(self):
+        self.count = 0
+        self.reverted = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def add(self, gas_used, status):
+        self.count += 1
+        self.reverted += not status
+        self.total += gas_used
+        self.min = gas_used if self.min is None else min(self.min, gas_used)
+        self.max = max(self.max, gas_used)
+
+    def to_dict(self):
+        return {'count': self.count, 'reverted': self.reverted, 'total': self.total,
+                'mean': self.total / self.count if self.count else 0.0, 'min': self.min, 'max': self.max}
+
+
+def _to_int(value):
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def _to_hex(value):
+    if isinstance(value, str):
+        return value.lower()
+    return '0x' + bytes(value).hex()
+
+
+def _format_ms(seconds):
+    return f"{seconds * 1000:.2f}"
+
+
+def raw_transaction_fields(raw):
+    """
+    Returns the `to` address and the calldata of a signed raw transaction (legacy, EIP-2930 or
+    EIP-1559), as hex strings; `to` is None for a contract creation.
+    """
+    import rlp
+
+    raw = bytes.fromhex(raw[2:]) if isinstance(raw, str) else bytes(raw)
+    if raw[0] >= 0xc0:
+        fields, to_index = rlp.decode(raw), 3
+    else:
+        fields, to_index = rlp.decode(raw[1:]), {1: 4, 2: 5}[raw[0]]
+    to, data = fields[to_index], fields[to_index + 2]
+    return ('0x' + to.hex()) if to else None, '0x' + data.hex()
+
+
+class RpcMetrics:
+    """
+    Collects, for every JSON-RPC method and every contract function, call counts and latency
+    histograms, plus the gas used by every function's mined transactions. Requests are recorded by
+    the middleware installed with `instrument`; `marl.hardhat_rpc.HardhatChain.batch` records its
+    batches too. Recording is thread-safe and costs a few microseconds per request.
+
+    Contract functions are identified by the 4-byte selector of the calldata and named after the
+    ABIs given to `register_abi`; unknown selectors are reported as is. Gas is taken from the
+    receipts fetched by the simulation itself (`eth_getTransactionReceipt`), matched to the
+    function by the hash returned when the transaction was sent, so no extra request is made.
+
+    Attributes:
+        rpc: Method name to latency Histogram of its single requests.
+        batched: Method name to number of requests sent inside JSON-RPC batches.
+        batches: Latency Histogram of the batch requests.
+        errors: Method name to number of requests that returned an error.
+        functions: (function, method) to latency Histogram, for `eth_call`, `eth_estimateGas` and
+            the transaction sends.
+        gas: Function name to GasStats.
+        timers: Name to latency Histogram of the code blocks timed with `timer`.
+        started: `time.time()` when the collector was created.
+    """
+    def __init__(self):
+        self.rpc = defaultdict(Histogram)
+        self.batched = defaultdict(int)
+        self.batches = Histogram()
+        self.errors = defaultdict(int)
+        self.functions = defaultdict(Histogram)
+        self.gas = defaultdict(GasStats)
+        self.timers = defaultdict(Histogram)
+        self.started = time.time()
+        self._selectors = {}
+        self._sent = {}  # Transaction hash to function name, until its receipt is seen
+        self._lock = threading.Lock()
+
+    def register_abi(self, abi, name):
+        """
+        Names the functions of a contract ABI as `<name>.<function>` in the metrics.
+
+        Args:
+            abi: The contract ABI.
+            name: Name of the contract.
+        """
+        for entry in abi:
+            if entry.get('type') == 'function':
+                selector = '0x' + function_abi_to_4byte_selector(entry).hex()
+                self._selectors[selector] = f"{name}.{entry['name']}"
+
+    def function_name(self, to, data):
+        """
+        Returns the name of the function called by calldata `data` sent to `to`, or None if the
+        transaction calls no function.
+        """
+        if not to:
+            return CREATE
+        if not data or len(data) < 10:
+            return None
+        selector = data[:10].lower()
+        return self._selectors.get(selector, selector)
+
+    def _function(self, method, params):
+        if method == 'eth_sendRawTransaction':
+            try:
+                return self.function_name(*raw_transaction_fields(params[0]))
+            except Exception:
+                return None
+        transaction = params[0] if params else None
+        if not isinstance(transaction, dict):
+            return None
+        data = transaction.get('data', transaction.get('input'))
+        return self.function_name(transaction.get('to'), _to_hex(data) if data is not None else None)
+
+    def _inspect(self, method, params, response):
+        # Called with the lock held; returns the function of a contract call, if any
+        if 'error' in response:
+            self.errors[method] += 1
+        function = self._function(method, params) if method in CALL_METHODS or method == 'eth_sendRawTransaction' else None
+        result = response.get('result')
+        if result is None:
+            return function
+        if function is not None and method in SEND_METHODS:
+            if len(self._sent) >= MAX_PENDING_RECEIPTS:
+                del self._sent[next(iter(self._sent))]
+            self._sent[_to_hex(result)] = function
+        elif method == 'eth_getTransactionReceipt' and self._sent:
+            sent = self._sent.pop(_to_hex(result['transactionHash']), None)
+            if sent is not None:
+                self.gas[sent].add(_to_int(result['gasUsed']), _to_int(result['status']))
+        return function
+
+    def record(self, method, params, response, elapsed):
+        """
+        Records a single request.
+
+        Args:
+            method: The RPC method.
+            params: Its parameters.
+            response: The JSON-RPC response dict, or None if the request raised.
+            elapsed: Latency in seconds.
+        """
+        with self._lock:
+            self.rpc[method].observe(elapsed)
+            if response is None:
+                self.errors[method] += 1
+                return
+            function = self._inspect(method, params, response)
+            if function is not None:
+                self.functions[function, method].observe(elapsed)
+
+    def record_batch(self, requests, responses, elapsed):
+        """
+        Records a JSON-RPC batch request.
+
+        Args:
+            requests: List of (method, params) tuples.
+            responses: The list of responses, or the single error response of a failed batch.
+            elapsed: Latency of the whole batch in seconds.
+        """
+        with self._lock:
+            self.batches.observe(elapsed)
+            failed = not isinstance(responses, list)
+            for i, (method, params) in enumerate(requests):
+                self.batched[method] += 1
+                if failed:
+                    self.errors[method] += 1
+                else:
+                    self._inspect(method, params, responses[i])
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Times the enclosed block, e.g. `with metrics.timer('model.predict'): ...`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.timers[name].observe(elapsed)
+
+    def to_dict(self):
+        """
+        Returns every metric as plain JSON-serializable data.
+        """
+        with self._lock:
+            functions = defaultdict(dict)
+            for (function, method), histogram in self.functions.items():
+                functions[function][method] = histogram.to_dict()
+            return {
+                'started': self.started,
+                'elapsed': time.time() - self.started,
+                'rpc': {method: dict(histogram.to_dict(), errors=self.errors.get(method, 0))
+                        for method, histogram in self.rpc.items()},
+                'batches': dict(self.batches.to_dict(), requests=dict(self.batched)),
+                'errors': dict(self.errors),
+                'functions': dict(functions),
+                'gas': {function: stats.to_dict() for function, stats in self.gas.items()},
+                'timers': {name: histogram.to_dict() for name, histogram in self.timers.items()},
+            }
+
+    def to_json(self, path=None):
+        """
+        Returns the metrics as a JSON string, also written to `path` if given.
+        """
+        text = json.dumps(self.to_dict(), indent=2, sort_keys=True)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self, prefix='marl'):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+
+        def histogram(name, help_text, series):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} histogram')
+            for labels, h in series:
+                cumulative = 0
+                for bound, count in zip(h.bounds, h.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_{name}_bucket{{{labels}le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{prefix}_{name}_bucket{{{labels}le="+Inf"}} {h.count}')
+                labels = f'{{{labels.rstrip(",")}}}' if labels else ''
+                lines.append(f'{prefix}_{name}_sum{labels} {h.total}')
+                lines.append(f'{prefix}_{name}_count{labels} {h.count}')
+
+        def counter(name, help_text, series):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            for labels, value in series:
+                lines.append(f'{prefix}_{name}{{{labels}}} {value}')
+
+        with self._lock:
+            histogram('rpc_request_duration_seconds', "Latency of single JSON-RPC requests.",
+                      [(f'method="{method}",', h) for method, h in sorted(self.rpc.items())])
+            histogram('rpc_batch_duration_seconds', "Latency of JSON-RPC batch requests.", [('', self.batches)])
+            counter('rpc_batched_requests_total', "Requests sent inside JSON-RPC batches.",
+                    [(f'method="{method}"', n) for method, n in sorted(self.batched.items())])
+            counter('rpc_errors_total', "JSON-RPC requests that returned an error.",
+                    [(f'method="{method}"', n) for method, n in sorted(self.errors.items())])
+            histogram('contract_call_duration_seconds', "Latency of contract calls and transaction sends.",
+                      [(f'function="{function}",method="{method}",', h)
+                       for (function, method), h in sorted(self.functions.items())])
+            counter('gas_used_total', "Gas used by mined transactions.",
+                    [(f'function="{function}"', stats.total) for function, stats in sorted(self.gas.items())])
+            counter('transactions_total', "Mined transactions, by receipt status.",
+                    [(f'function="{function}",status="{status}"', n)
+                     for function, stats in sorted(self.gas.items())
+                     for status, n in (('success', stats.count - stats.reverted), ('reverted', stats.reverted))])
+            histogram('timer_duration_seconds', "Duration of timed simulation steps.",
+                      [(f'name="{name}",', h) for name, h in sorted(self.timers.items())])
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, host='127.0.0.1'):
+        """
+        Serves `to_prometheus` over HTTP from a background thread, for Prometheus to scrape.
+
+        Returns:
+            ThreadingHTTPServer: The server; call `shutdown()` to stop it.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def summary(self):
+        """
+        Returns a human-readable table of the busiest methods and functions and of the gas used.
+        """
+        data = self.to_dict()
+        lines = [f"RPC metrics over {data['elapsed']:.1f}s"]
+        row = "  {:<44} {:>8} {:>10} {:>9} {:>9} {:>9}"
+
+        def table(title, entries):
+            if not entries:
+                return
+            lines.append(row.format(title, 'calls', 'total s', 'p50 ms', 'p95 ms', 'p99 ms'))
+            for name, stats in sorted(entries, key=lambda entry: -entry[1]['total_seconds']):
+                lines.append(row.format(name, stats['count'], f"{stats['total_seconds']:.3f}",
+                                        _format_ms(stats['p50']), _format_ms(stats['p95']), _format_ms(stats['p99'])))
+
+        table('method', list(data['rpc'].items()))
+        if data['batches']['count']:
+            table('batch', [(f"batch ({sum(data['batches']['requests'].values())} requests)", data['batches'])])
+        table('function', [(f"{function} [{method}]", stats)
+                           for function, methods in data['functions'].items() for method, stats in methods.items()])
+        table('timer', list(data['timers'].items()))
+        if data['gas']:
+            lines.append("  {:<44} {:>8} {:>10} {:>9} {:>9}".format('gas', 'txs', 'mean', 'max', 'reverted'))
+            for function, stats in sorted(data['gas'].items()):
+                lines.append("  {:<44} {:>8} {:>10.0f} {:>9} {:>9}".format(
+                    function, stats['count'], stats['mean'], stats['max'], stats['reverted']))
+        if data['errors']:
+            lines.append(f"  errors: {data['errors']}")
+        return '\n'.join(lines)
+
+
+def collector(w3):
+    """
+    Returns the RpcMetrics a Web3 instance was instrumented with, or None.
+    """
+    try:
+        return _collectors.get(w3)
+    except TypeError:
+        return None
+
+
+def _middleware(metrics):
+    from web3.middleware import Web3Middleware
+
+    class RpcMetricsMiddleware(Web3Middleware):
+        def wrap_make_request(self, make_request):
+            def middleware(method, params):
+                start = time.perf_counter()
+                response = None
+                try:
+                    response = make_request(method, params)
+                    return response
+                finally:
+                    metrics.record(method, params, response, time.perf_counter() - start)
+
+            return middleware
+
+        def wrap_make_batch_request(self, make_batch_request):
+            def middleware(requests_info):
+                start = time.perf_counter()
+                response = make_batch_request(requests_info)
+                metrics.record_batch(requests_info, response, time.perf_counter() - start)
+                return response
+
+            return middleware
+
+        async def async_wrap_make_request(self, make_request):
+            async def middleware(method, params):
+                start = time.perf_counter()
+                response = None
+                try:
+                    response = await make_request(method, params)
+                    return response
+                finally:
+                    metrics.record(method, params, response, time.perf_counter() - start)
+
+            return middleware
+
+        async def async_wrap_make_batch_request(self, make_batch_request):
+            async def middleware(requests_info):
+                start = time.perf_counter()
+                response = await make_batch_request(requests_info)
+                metrics.record_batch(requests_info, response, time.perf_counter() - start)
+                return response
+
+            return middleware
+
+    return RpcMetricsMiddleware
+
+
+def instrument(w3, metrics=None):
+    """
+    Records every request of a Web3 (or AsyncWeb3) instance. The middleware is the innermost
+    layer, so the latencies are the provider's round trips and the parameters are those sent.
+
+    Args:
+        w3: The Web3 instance.
+        metrics: The RpcMetrics to record into. Defaults to a new one.
+
+    Returns:
+        RpcMetrics: The collector.
+    """
+    if metrics is None:
+        metrics = RpcMetrics()
+    w3.middleware_onion.inject(_middleware(metrics), name='rpc_metrics', layer=0)
+    _collectors[w3] = metrics
+    return metrics
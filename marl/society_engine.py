@@ -0,0 +1,276 @@
+import itertools
+
+# Amounts hardcoded in contracts/decentralizedSociety/*.sol
+FARM_EFFICIENT_YIELD = 10   # Farmer.farmEfficient
+FARM_SELFISH_LOSS = 10      # Farmer.farmSelfish
+BUILD_RESOURCES_NEEDED = 5  # Builder.buildEfficient / buildSelfish
+BUILD_RESOURCES_WASTED = 10 # Builder.buildSelfish
+TRADE_EFFICIENT_GAIN = 7    # Trader.tradeEfficient
+TRADE_SELFISH_LOSS = 7      # Trader.tradeSelfish
+
+REVERT_REASON = "Not enough resources"
+
+
+class RevertError(Exception):
+    """
+    Raised when an in-memory contract call hits a `require` that would revert on chain.
+    The message mirrors the one produced by web3 for a reverted transaction.
+    """
+    def __init__(self, reason=REVERT_REASON):
+        super(RevertError, self).__init__(f"execution reverted: {reason}")
+        self.reason = reason
+
+
+class _ContractFunction:
+    """
+    Callable standing in for `contract.functions.<name>`. Calling it binds the arguments and
+    returns an object exposing `transact()` and `call()`, like a web3 ContractFunction.
+    """
+    def __init__(self, contract, fn, view):
+        self.contract = contract
+        self.fn = fn
+        self.view = view
+
+    def __call__(self, *args):
+        return _BoundFunction(self, args)
+
+
+class _BoundFunction:
+    """
+    A contract function bound to its arguments, ready to be transacted or called.
+    """
+    __slots__ = ('function', 'args')
+
+    def __init__(self, function, args):
+        self.function = function
+        self.args = args
+
+    def transact(self, transaction=None):
+        """
+        Executes the function and persists its state changes.
+
+        Returns:
+            bytes: A unique pseudo transaction hash.
+
+        Raises:
+            RevertError: If a `require` in the function fails. No state is changed in that case.
+        """
+        self.function.fn(*self.args)
+        return self.function.contract.pool._next_tx_hash()
+
+    def call(self, transaction=None, block_identifier='latest'):
+        """
+        Executes the function without persisting state changes and returns its result.
+        """
+        if self.function.view:
+            return self.function.fn(*self.args)
+        pool = self.function.contract.pool
+        saved = pool.total_resources
+        try:
+            return self.function.fn(*self.args)
+        finally:
+            pool.total_resources = saved
+
+
+class _Functions:
+    """
+    Namespace holding the `_ContractFunction`s of an in-memory contract.
+    """
+    pass
+
+
+class _InMemoryContract:
+    """
+    Base class for the in-memory contracts. Subclasses list their ABI-visible functions in
+    `_abi_functions` as (solidity name, python method name, is view) tuples.
+    """
+    _abi_functions = ()
+
+    def _build_functions(self):
+        self.functions = _Functions()
+        for name, method, view in self._abi_functions:
+            setattr(self.functions, name, _ContractFunction(self, getattr(self, method), view))
+
+
+class InMemoryResourcePool(_InMemoryContract):
+    """
+    Pure-Python replica of `ResourcePool.sol`.
+
+    Attributes:
+        total_resources: The shared resource counter (`totalResources` on chain).
+        pool: Self-reference so the pool and its dependents share one code path.
+        functions: web3-style function namespace (`addResources`, `useResources`, ...).
+    """
+    _abi_functions = (
+        ('addResources', 'add_resources', False),
+        ('useResources', 'use_resources', False),
+        ('reduceResources', 'reduce_resources', False),
+        ('getTotalResources', 'get_total_resources', True),
+        ('totalResources', 'get_total_resources', True),
+    )
+
+    def __init__(self, total_resources=0):
+        """
+        Initializes the pool.
+
+        Args:
+            total_resources: Starting value of `totalResources` (0 after a fresh deployment).
+        """
+        self.total_resources = total_resources
+        self.pool = self
+        self._tx_counter = itertools.count(1)
+        self._build_functions()
+
+    def _next_tx_hash(self):
+        return next(self._tx_counter).to_bytes(32, 'big')
+
+    def add_resources(self, amount):
+        self.total_resources += amount
+
+    def use_resources(self, amount):
+        if self.total_resources < amount:
+            raise RevertError()
+        self.total_resources -= amount
+
+    def reduce_resources(self, amount):
+        if self.total_resources < amount:
+            raise RevertError()
+        self.total_resources -= amount
+
+    def get_total_resources(self):
+        return self.total_resources
+
+
+class InMemoryFarmer(_InMemoryContract):
+    """
+    Pure-Python replica of `Farmer.sol`, acting on an `InMemoryResourcePool`.
+    """
+    _abi_functions = (
+        ('farmEfficient', 'farm_efficient', False),
+        ('farmSelfish', 'farm_selfish', False),
+    )
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._build_functions()
+
+    def farm_efficient(self):
+        self.pool.add_resources(FARM_EFFICIENT_YIELD)
+
+    def farm_selfish(self):
+        if self.pool.total_resources < FARM_SELFISH_LOSS:
+            raise RevertError()
+        self.pool.reduce_resources(FARM_SELFISH_LOSS)
+
+
+class InMemoryBuilder(_InMemoryContract):
+    """
+    Pure-Python replica of `Builder.sol`, acting on an `InMemoryResourcePool`.
+    """
+    _abi_functions = (
+        ('buildEfficient', 'build_efficient', False),
+        ('buildSelfish', 'build_selfish', False),
+    )
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._build_functions()
+
+    def build_efficient(self):
+        if self.pool.total_resources < BUILD_RESOURCES_NEEDED:
+            raise RevertError()
+        self.pool.use_resources(BUILD_RESOURCES_NEEDED)
+
+    def build_selfish(self):
+        if self.pool.total_resources < BUILD_RESOURCES_NEEDED + BUILD_RESOURCES_WASTED:
+            raise RevertError()
+        self.pool.use_resources(BUILD_RESOURCES_NEEDED + BUILD_RESOURCES_WASTED)
+
+
+class InMemoryTrader(_InMemoryContract):
+    """
+    Pure-Python replica of `Trader.sol`, acting on an `InMemoryResourcePool`.
+    """
+    _abi_functions = (
+        ('tradeEfficient', 'trade_efficient', False),
+        ('tradeSelfish', 'trade_selfish', False),
+    )
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._build_functions()
+
+    def trade_efficient(self):
+        self.pool.add_resources(TRADE_EFFICIENT_GAIN)
+
+    def trade_selfish(self):
+        if self.pool.total_resources < TRADE_SELFISH_LOSS:
+            raise RevertError()
+        self.pool.reduce_resources(TRADE_SELFISH_LOSS)
+
+
+class InMemorySociety:
+    """
+    In-process stand-in for the ResourcePool/Farmer/Builder/Trader deployment made by
+    `scripts/decentralizedSociety.ts`. The contract handles expose the same
+    `functions.<name>().transact()/.call()` surface as web3 contracts, so they can be passed
+    anywhere the on-chain contracts are expected.
+
+    Attributes:
+        resource_pool: The in-memory ResourcePool.
+        farmer: The in-memory Farmer bound to `resource_pool`.
+        builder: The in-memory Builder bound to `resource_pool`.
+        trader: The in-memory Trader bound to `resource_pool`.
+        accounts: Placeholder account addresses, one per role.
+    """
+    def __init__(self, initial_resources=0):
+        """
+        Deploys the in-memory contracts.
+
+        Args:
+            initial_resources: Resources in the pool right after deployment.
+        """
+        self.resource_pool = InMemoryResourcePool(initial_resources)
+        self.farmer = InMemoryFarmer(self.resource_pool)
+        self.builder = InMemoryBuilder(self.resource_pool)
+        self.trader = InMemoryTrader(self.resource_pool)
+        self.accounts = ['0x' + f'{i:040x}' for i in range(1, 4)]
+        self._snapshots = []
+
+    def snapshot(self):
+        """
+        Records the current state, mirroring `evm_snapshot`.
+
+        Returns:
+            int: Identifier to pass to `revert`.
+        """
+        self._snapshots.append(self.resource_pool.total_resources)
+        return len(self._snapshots) - 1
+
+    def revert(self, snapshot_id):
+        """
+        Restores a recorded state, mirroring `evm_revert`: the snapshot and every later one
+        are consumed.
+
+        Args:
+            snapshot_id: Identifier returned by `snapshot`.
+
+        Returns:
+            bool: True if the snapshot existed and was restored.
+        """
+        if snapshot_id >= len(self._snapshots):
+            return False
+        self.resource_pool.total_resources = self._snapshots[snapshot_id]
+        del self._snapshots[snapshot_id:]
+        return True
+
+    def revert_and_snapshot(self, snapshot_id):
+        """
+        Reverts to a snapshot and immediately takes a new one of the same state.
+
+        Returns:
+            int: The identifier of the new snapshot.
+        """
+        if not self.revert(snapshot_id):
+            raise ValueError(f"Unknown snapshot {snapshot_id}")
+        return self.snapshot()
@@ -0,0 +1,248 @@
+import numpy as np
+import gym
+from gym import spaces
+
+from marl.hardhat_rpc import HardhatChain
+from marl.society_engine import InMemorySociety
+
+
+class DecentralizedSocietyEnv(gym.Env):
+    """
+    Custom Gym Environment representing a decentralized society interacting with Ethereum smart contracts.
+    This environment facilitates interactions between Farmer, Builder, and Trader agents using a shared resource pool.
+
+    Attributes:
+        resource_pool: A Web3 contract object representing the Resource Pool.
+        farmer: A Web3 contract object representing the Farmer contract.
+        builder: A Web3 contract object representing the Builder contract.
+        trader: A Web3 contract object representing the Trader contract.
+        accounts: A list of Ethereum accounts.
+        chain: Optional snapshot provider (`snapshot()`/`revert_and_snapshot(snapshot_id)`) used to restore contract state on reset.
+        verbose: Whether failed actions are printed.
+        initial_resources: Resources at the start of every episode when no snapshot provider is used.
+        total_resources: An integer representing the total resources in the pool.
+        last_action_success: A flag indicating the success of the last action (1 for success, 0 for failure).
+        action_space: Discrete action space with 8 possible actions (combination of farmer, builder, and trader choices).
+        observation_space: Box observation space representing the current total resources and last action success.
+    """
+    def __init__(self, resource_pool, farmer, builder, trader, accounts, chain=None, verbose=True, initial_resources=100):
+        """
+        Initializes the decentralized society environment with smart contracts and Ethereum accounts.
+
+        Args:
+            resource_pool: The Web3 contract object for the Resource Pool.
+            farmer: The Web3 contract object for the Farmer.
+            builder: The Web3 contract object for the Builder.
+            trader: The Web3 contract object for the Trader.
+            accounts: A list of Ethereum accounts used for interacting with the contracts.
+            chain: Optional snapshot provider (`InMemorySociety` or `HardhatChain`). When given, a snapshot of the
+                current contract state is taken here and every reset reverts to it.
+            verbose: Whether failed actions are printed.
+            initial_resources: Resources at the start of every episode when no snapshot provider is used;
+                with one, the episode starts from whatever the pool held at construction.
+        """
+        super(DecentralizedSocietyEnv, self).__init__()
+        self.resource_pool = resource_pool
+        self.farmer = farmer
+        self.builder = builder
+        self.trader = trader
+        self.accounts = accounts
+        self.chain = chain
+        self.verbose = verbose
+        self.initial_resources = initial_resources
+
+        # Use a single Discrete action space with 8 possible actions
+        self.action_space = spaces.Discrete(8)
+        
+        # Observation space: total resources and last action success
+        self.observation_space = spaces.Box(low=np.array([0, 0]), high=np.array([1000, 1]), dtype=np.float32)
+
+        self.total_resources = initial_resources  # Initial resources
+        self.last_action_success = 1  # Last action success
+
+        self._snapshot_id = None
+        if self.chain is not None:
+            self.total_resources = self.resource_pool.functions.getTotalResources().call()
+            self._snapshot_resources = self.total_resources
+            self._snapshot_id = self.chain.snapshot()
+
+    def reset(self):
+        """
+        Resets the environment to its initial state with default resources and action success.
+        If a chain snapshot provider was given, the contracts are reverted to their initial state as well.
+
+        Returns:
+            observation: A numpy array representing the total resources and last action success.
+        """
+        if self.chain is not None:
+            # Reverting consumes the snapshot, so a fresh one is taken for the next episode
+            self._snapshot_id = self.chain.revert_and_snapshot(self._snapshot_id)
+            self.total_resources = self._snapshot_resources
+        else:
+            self.total_resources = self.initial_resources
+        self.last_action_success = 1
+        return np.array([self.total_resources, self.last_action_success], dtype=np.float32)
+
+    def step(self, action):
+        """
+        Executes one step in the environment based on the agent's action.
+
+        Args:
+            action: An integer representing the combined action of the farmer, builder, and trader.
+
+        Returns:
+            observation: A numpy array representing the current total resources and last action success.
+            reward: A sum of the rewards obtained by the farmer, builder, and trader for their actions.
+            done: A boolean flag indicating whether the simulation has reached a terminal state.
+            info: A dictionary containing additional information (currently empty).
+        """
+        rewards = np.zeros(3)  # Initialize rewards for farmer, builder, and trader
+        self.last_action_success = 1
+        action_combination = [action % 2, (action // 2) % 2, (action // 4) % 2]
+        
+        # Process Farmer's action
+        try:
+            if action_combination[0] == 0:
+                self.farmer.functions.farmEfficient().transact({'from': self.accounts[0]})
+                rewards[0] = 5
+            else:
+                self.farmer.functions.farmSelfish().transact({'from': self.accounts[0]})
+                rewards[0] = -5
+        except Exception as e:
+            if self.verbose:
+                print("Farmer action failed:", str(e))
+            rewards[0] = -10  # Penalize for failed transaction
+            self.last_action_success = 0
+
+        # Process Builder's action
+        try:
+            if action_combination[1] == 0:
+                self.builder.functions.buildEfficient().transact({'from': self.accounts[1]})
+                rewards[1] = 5
+            else:
+                self.builder.functions.buildSelfish().transact({'from': self.accounts[1]})
+                rewards[1] = -5
+        except Exception as e:
+            if self.verbose:
+                print("Builder action failed:", str(e))
+            rewards[1] = -10  # Penalize for failed transaction
+            self.last_action_success = 0
+
+        # Process Trader's action
+        try:
+            if action_combination[2] == 0:
+                self.trader.functions.tradeEfficient().transact({'from': self.accounts[2]})
+                rewards[2] = 5
+            else:
+                self.trader.functions.tradeSelfish().transact({'from': self.accounts[2]})
+                rewards[2] = -5
+        except Exception as e:
+            if self.verbose:
+                print("Trader action failed:", str(e))
+            rewards[2] = -10  # Penalize for failed transaction
+            self.last_action_success = 0
+
+        self.total_resources = self.resource_pool.functions.getTotalResources().call()
+        done = self.total_resources <= 0 or self.total_resources >= 1000
+        return np.array([self.total_resources, self.last_action_success], dtype=np.float32), np.sum(rewards), done, {}
+
+
+    def render(self, mode='human'):
+        """
+        Renders the current state of the environment to the console.
+        
+        Args:
+            mode: Render mode (currently only 'human' is supported).
+        """
+        print(f"Total Resources: {self.total_resources}, Last Action Success: {self.last_action_success}")
+
+
+    def get_observation(self):
+        """
+        Returns the current observation of the environment's state.
+        
+        Returns:
+            A numpy array representing the total resources and last action success.
+        """
+        # This method should return an array-like object that matches the input shape of the model.
+        # Example: Return the total resources and last action success as the current state observation.
+        return np.array([self.total_resources, self.last_action_success], dtype=np.float32)
+
+
+def seed_resources(resource_pool, amount, account):
+    """
+    Brings the resource pool to exactly `amount` resources with a single transaction.
+
+    Args:
+        resource_pool: The ResourcePool contract (on chain or in memory).
+        amount: Target number of resources.
+        account: Account sending the transaction.
+
+    Returns:
+        The transaction hash, or None if the pool already held `amount`.
+    """
+    current = resource_pool.functions.getTotalResources().call()
+    if current < amount:
+        return resource_pool.functions.addResources(amount - current).transact({'from': account})
+    if current > amount:
+        return resource_pool.functions.reduceResources(current - amount).transact({'from': account})
+    return None
+
+
+def make_chain_env(w3, contracts, initial_resources=100, accounts=None, verbose=True):
+    """
+    Builds a chain-backed DecentralizedSocietyEnv whose episodes are independent: the pool is seeded
+    to `initial_resources`, an `evm_snapshot` is taken, and every reset returns the node to that
+    state with one `evm_revert` instead of redeploying.
+
+    Args:
+        w3: Web3 instance connected to a Hardhat node.
+        contracts: The deployed society (e.g. `marl.deployer.deploy_society(w3)`), with `resource_pool`,
+            `farmer`, `builder` and `trader` attributes.
+        initial_resources: Resources in the pool at the start of every episode.
+        accounts: Accounts acting as farmer, builder and trader. Defaults to the node's accounts.
+        verbose: Whether failed actions are printed.
+
+    Returns:
+        DecentralizedSocietyEnv: The environment.
+    """
+    if accounts is None:
+        accounts = w3.eth.accounts
+    tx_hash = seed_resources(contracts.resource_pool, initial_resources, accounts[0])
+    if tx_hash is not None:
+        w3.eth.wait_for_transaction_receipt(tx_hash)
+    return DecentralizedSocietyEnv(
+        resource_pool=contracts.resource_pool,
+        farmer=contracts.farmer,
+        builder=contracts.builder,
+        trader=contracts.trader,
+        accounts=accounts,
+        chain=HardhatChain(w3),
+        verbose=verbose,
+        initial_resources=initial_resources
+    )
+
+
+def make_in_memory_env(initial_resources=100, verbose=False):
+    """
+    Builds a DecentralizedSocietyEnv backed by the pure-Python contracts in `marl.society_engine`,
+    so the environment can be stepped (and a model trained) without a running node.
+
+    Args:
+        initial_resources: Resources in the pool at the start of every episode.
+        verbose: Whether failed actions are printed.
+
+    Returns:
+        DecentralizedSocietyEnv: The environment; every reset restores the pool to `initial_resources`.
+    """
+    society = InMemorySociety(initial_resources)
+    return DecentralizedSocietyEnv(
+        resource_pool=society.resource_pool,
+        farmer=society.farmer,
+        builder=society.builder,
+        trader=society.trader,
+        accounts=society.accounts,
+        chain=society,
+        verbose=verbose,
+        initial_resources=initial_resources
+    )
@@ -0,0 +1,88 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+from marl import artifacts
+
+class TestArtifactCache(unittest.TestCase):
+    """
+    Unit test class for the content-hashed compilation cache in marl.artifacts.
+    Runs against a temporary Hardhat project so the real artifacts are never touched.
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary project with one contract and a Hardhat config, and points the module at it.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        os.makedirs(os.path.join(root, 'contracts'))
+        self.source = os.path.join(root, 'contracts', 'auction.sol')
+        with open(self.source, 'w') as f:
+            f.write('contract Auction {}')
+        self.config = os.path.join(root, 'hardhat.config.ts')
+        with open(self.config, 'w') as f:
+            f.write('module.exports = { solidity: { version: "0.8.0" }, networks: { localhost: {} } };')
+
+        artifact_dir = os.path.join(root, 'artifacts', 'contracts', 'auction.sol')
+        os.makedirs(artifact_dir)
+        with open(os.path.join(artifact_dir, 'Auction.json'), 'w') as f:
+            json.dump({'contractName': 'Auction', 'abi': [{'type': 'function', 'name': 'bid'}], 'bytecode': '0x6000'}, f)
+        with open(os.path.join(artifact_dir, 'Auction.dbg.json'), 'w') as f:
+            json.dump({}, f)
+
+        patches = {
+            'contracts_dir': os.path.join(root, 'contracts'),
+            'artifacts_dir': os.path.join(root, 'artifacts', 'contracts'),
+            'hardhat_config': self.config,
+            'store_path': os.path.join(root, 'cache', 'marl-artifacts.json'),
+            '_store': None,
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(artifacts, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_hash_tracks_sources_and_solc_settings(self):
+        """
+        Tests that the hash changes with the sources and solc settings but not with unrelated config.
+        """
+        initial = artifacts.sources_hash()
+        with open(self.config, 'w') as f:
+            f.write('module.exports = { solidity: { version: "0.8.0" }, networks: { hardhat: {} } };')
+        self.assertEqual(artifacts.sources_hash(), initial)
+
+        with open(self.config, 'w') as f:
+            f.write('module.exports = { solidity: { version: "0.8.1" }, networks: { hardhat: {} } };')
+        changed_settings = artifacts.sources_hash()
+        self.assertNotEqual(changed_settings, initial)
+
+        with open(self.source, 'a') as f:
+            f.write('\n')
+        self.assertNotEqual(artifacts.sources_hash(), changed_settings)
+
+    def test_compiles_only_when_sources_change(self):
+        """
+        Tests that Hardhat runs once for given sources, that later loads come from the store,
+        and that editing a contract triggers a new compilation.
+        """
+        with mock.patch.object(artifacts.subprocess, 'run') as run:
+            abi, bytecode = artifacts.load_artifact('auction.sol', 'Auction')
+            self.assertEqual(run.call_count, 1)
+            self.assertEqual(abi[0]['name'], 'bid')
+            self.assertEqual(bytecode, '0x6000')
+
+            # A new process only reads the store
+            artifacts._store = None
+            artifacts.ensure_compiled()
+            self.assertEqual(run.call_count, 1)
+
+            with open(self.source, 'a') as f:
+                f.write('\n')
+            artifacts.ensure_compiled()
+            self.assertEqual(run.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import asyncio
+import random
+import unittest
+from marl.async_auction import ENDED_REASON, OUTBID_REASON, BidMetrics, bidder
+
+
+class FakeCall:
+    def __init__(self, read):
+        self.read = read
+
+    async def call(self, block_identifier=None):
+        return self.read()
+
+
+class FakeBid:
+    def __init__(self, auction):
+        self.auction = auction
+
+    async def transact(self, transaction):
+        return self.auction.bid(transaction)
+
+
+class FakeAuction:
+    """
+    In-memory auction answering like a Hardhat node with automine: every bid is mined when sent,
+    and a reverted bid raises but still uses up its sender's nonce. The auction ends after
+    `max_bids` accepted bids.
+    """
+    def __init__(self, max_bids):
+        self.max_bids = max_bids
+        self.highest_bid = 0
+        self.highest_bidder = None
+        self.accepted = 0
+        self.nonces = {}
+        self.receipts = {}
+
+    @property
+    def ended(self):
+        return self.accepted >= self.max_bids
+
+    def bid(self, transaction):
+        sender = transaction['from']
+        if transaction['nonce'] != self.nonces.get(sender, 0):
+            raise ValueError(f"Nonce too high. Expected nonce to be {self.nonces.get(sender, 0)}")
+        self.nonces[sender] = transaction['nonce'] + 1
+        if self.ended:
+            raise ValueError(f"VM Exception while processing transaction: reverted with reason string '{ENDED_REASON}'")
+        if transaction['value'] <= self.highest_bid:
+            raise ValueError(f"VM Exception while processing transaction: reverted with reason string '{OUTBID_REASON}'")
+        self.highest_bid, self.highest_bidder = transaction['value'], sender
+        self.accepted += 1
+        tx_hash = f'0x{len(self.receipts):064x}'
+        self.receipts[tx_hash] = {'status': 1, 'blockNumber': len(self.receipts) + 1}
+        return tx_hash
+
+
+class FakeEth:
+    def __init__(self, auction):
+        self.auction = auction
+
+    async def get_transaction_count(self, account, block_identifier='latest'):
+        return self.auction.nonces.get(account, 0)
+
+    async def wait_for_transaction_receipt(self, tx_hash):
+        await asyncio.sleep(0)
+        return self.auction.receipts[tx_hash]
+
+
+class FakeWeb3:
+    def __init__(self, auction):
+        self.eth = FakeEth(auction)
+
+
+class FakeContract:
+    """
+    Async contract handle over a FakeAuction, exposing the getters as `contract.functions.<name>()`.
+    """
+    def __init__(self, auction):
+        self.functions = self
+        self.auction = auction
+
+    def ended(self):
+        return FakeCall(lambda: self.auction.ended)
+
+    def highestBid(self):
+        return FakeCall(lambda: self.auction.highest_bid)
+
+    def highestBidder(self):
+        return FakeCall(lambda: self.auction.highest_bidder)
+
+    def bid(self):
+        return FakeBid(self.auction)
+
+
+class TestConcurrentBidders(unittest.TestCase):
+    """
+    Unit test class for the concurrent asyncio bidders, racing on an in-memory auction.
+    """
+
+    def race(self, accounts, bids, max_bids, think_time=0.0):
+        auction = FakeAuction(max_bids)
+        metrics = BidMetrics()
+
+        async def main():
+            w3, contract = FakeWeb3(auction), FakeContract(auction)
+            await asyncio.gather(*[
+                bidder(w3, contract, account, bids, metrics, random.Random(i), 10, 20, think_time)
+                for i, account in enumerate(accounts)
+            ])
+
+        asyncio.run(main())
+        return auction, metrics
+
+    def test_bidders_race_and_count_outcomes(self):
+        """
+        Tests that racing bidders track their own nonces, and that every bid is counted once as
+        accepted, outbid or too late rather than failing the run.
+        """
+        auction, metrics = self.race(['0xa', '0xb', '0xc', '0xd'], bids=5, max_bids=100)
+        summary = metrics.summary()
+        self.assertEqual(summary['failed'], 0)
+        self.assertEqual(summary['submitted'], summary['accepted'] + summary['outbid'] + summary['too_late'])
+        # Every bidder reads the same state before bidding, so the race produces losers
+        self.assertGreater(summary['outbid'], 0)
+        self.assertEqual(summary['accepted'], auction.accepted)
+        self.assertEqual(sum(auction.nonces.values()), summary['submitted'])
+        self.assertEqual(summary['max_bids_per_block'], 1)
+
+    def test_bidders_stop_when_the_auction_ends(self):
+        """
+        Tests that bidders stop once the auction has ended.
+        """
+        auction, metrics = self.race(['0xa', '0xb', '0xc'], bids=50, max_bids=4)
+        self.assertEqual(metrics.accepted, 4)
+        self.assertEqual(metrics.failed, 0)
+        self.assertLess(metrics.submitted, 3 * 50)
+
+    def test_record_error(self):
+        """
+        Tests the classification of revert messages.
+        """
+        metrics = BidMetrics()
+        for message in (OUTBID_REASON, OUTBID_REASON, ENDED_REASON, 'insufficient funds'):
+            metrics.record_error(f"execution reverted: {message}")
+        self.assertEqual((metrics.outbid, metrics.too_late, metrics.failed), (2, 1, 1))
+        self.assertEqual(metrics.summary()['bids_per_second'], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
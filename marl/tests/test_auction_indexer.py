@@ -0,0 +1,152 @@
+import unittest
+from eth_abi import encode
+from marl.auction_indexer import AuctionIndexer
+
+AUCTION_EVENTS_ABI = [
+    {'type': 'event', 'name': 'HighestBidIncreased', 'anonymous': False, 'inputs': [
+        {'name': 'bidder', 'type': 'address', 'indexed': False},
+        {'name': 'amount', 'type': 'uint256', 'indexed': False},
+    ]},
+    {'type': 'event', 'name': 'AuctionEnded', 'anonymous': False, 'inputs': [
+        {'name': 'winner', 'type': 'address', 'indexed': False},
+        {'name': 'amount', 'type': 'uint256', 'indexed': False},
+    ]},
+]
+
+AUCTION_1 = '0x' + '11' * 20
+AUCTION_2 = '0x' + '22' * 20
+ALICE = '0x' + 'aa' * 20
+BOB = '0x' + 'bb' * 20
+OTHER = '0x' + '99' * 20
+
+
+class FakeEth:
+    """
+    Minimal `w3.eth` serving `eth_getLogs` from a list of raw logs, recording the requested ranges.
+    Block hashes depend on `chain`, which a restarted node changes.
+    """
+    def __init__(self):
+        self.block_number = 0
+        self.chain = b'\x01'
+        self.logs = []
+        self.requests = []
+
+    def get_block(self, number):
+        assert 0 <= number <= self.block_number
+        return {'hash': self.chain * 24 + number.to_bytes(8, 'big')}
+
+    def get_logs(self, params):
+        self.requests.append((params['fromBlock'], params['toBlock']))
+        addresses = {address.lower() for address in params['address']}
+        topics = set(params['topics'][0])
+        return [
+            log for log in self.logs
+            if params['fromBlock'] <= log['blockNumber'] <= params['toBlock']
+            and log['address'].lower() in addresses and log['topics'][0] in topics
+        ]
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+class TestAuctionIndexer(unittest.TestCase):
+    """
+    Unit test class for the AuctionIndexer, fed with raw logs through a fake `eth_getLogs`.
+    """
+
+    def setUp(self):
+        self.w3 = FakeWeb3()
+        self.indexer = AuctionIndexer(self.w3, chunk_size=10, abi=AUCTION_EVENTS_ABI)
+        self.bid_topic = self.indexer._bid_event.topic
+        self.end_topic = self.indexer._end_event.topic
+
+    def add_log(self, address, topic, account, amount, block):
+        self.w3.eth.logs.append({
+            'address': address,
+            'topics': [topic],
+            'data': encode(['address', 'uint256'], [account, amount]),
+            'blockNumber': block,
+            'transactionHash': bytes([block]) * 32,
+            'logIndex': 0,
+        })
+        self.w3.eth.block_number = max(self.w3.eth.block_number, block)
+
+    def test_indexes_and_catches_up(self):
+        """
+        Tests that bids and endings are decoded and stored, that only new blocks are scanned on the
+        next sync, and that the table can be queried by round, bidder and block.
+        """
+        self.w3.eth.block_number = 1
+        self.indexer.register_auction(AUCTION_1, 1)
+        self.add_log(AUCTION_1, self.bid_topic, ALICE, 10 ** 18, 3)
+        self.add_log(AUCTION_1, self.bid_topic, BOB, 2 * 10 ** 19 + 1, 15)
+        self.add_log(OTHER, self.bid_topic, ALICE, 5, 16)  # Not a registered auction
+        self.add_log(AUCTION_1, self.end_topic, BOB, 2 * 10 ** 19 + 1, 25)
+
+        self.assertEqual(self.indexer.sync(), 3)
+        self.assertEqual(self.w3.eth.requests, [(1, 10), (11, 20), (21, 25)])
+        self.assertEqual(self.indexer.last_indexed_block(), 25)
+
+        # Incremental catch-up only scans blocks after the last indexed one
+        self.indexer.register_auction(AUCTION_2, 2, from_block=26)
+        self.add_log(AUCTION_2, self.bid_topic, ALICE, 3 * 10 ** 18, 27)
+        self.assertEqual(self.indexer.sync(), 1)
+        self.assertEqual(self.w3.eth.requests[3:], [(26, 27)])
+
+        bob_bids = self.indexer.bids(bidder=BOB)
+        self.assertEqual(len(bob_bids), 1)
+        self.assertEqual(bob_bids[0]['amount'], 2 * 10 ** 19 + 1)
+        self.assertEqual(bob_bids[0]['round'], 1)
+        self.assertEqual([bid['block_number'] for bid in self.indexer.bids(round_num=1)], [3, 15])
+        self.assertEqual([bid['round'] for bid in self.indexer.bids(from_block=10)], [1, 2])
+        self.assertEqual([bid['amount_eth'] for bid in self.indexer.bids(bidder=ALICE)], [1.0, 3.0])
+
+        winners = self.indexer.winners()
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(winners[0]['winner'].lower(), BOB)
+
+    def test_rescan_is_idempotent(self):
+        """
+        Tests that registering an older auction rescans its range without duplicating events.
+        """
+        self.w3.eth.block_number = 1
+        self.indexer.register_auction(AUCTION_1, 1)
+        self.add_log(AUCTION_1, self.bid_topic, ALICE, 1, 5)
+        self.add_log(AUCTION_2, self.bid_topic, BOB, 2, 6)
+        self.indexer.sync()
+
+        self.indexer.register_auction(AUCTION_2, 2, from_block=2)
+        self.indexer.sync()
+        self.assertEqual([bid['round'] for bid in self.indexer.bids()], [1, 2])
+
+    def test_restarted_chain_is_reindexed(self):
+        """
+        Tests that an auction redeployed at the same address on a new chain is indexed anew, with
+        its new round, instead of keeping the previous chain's events and progress.
+        """
+        self.w3.eth.block_number = 1
+        self.indexer.register_auction(AUCTION_1, 1)
+        self.add_log(AUCTION_1, self.bid_topic, ALICE, 1, 30)
+        self.indexer.sync()
+        # Registering it again on the same chain keeps it as it is
+        self.indexer.register_auction(AUCTION_1, 5)
+        self.assertEqual([bid['round'] for bid in self.indexer.bids()], [1])
+
+        # A restarted node: the same address, fewer blocks, other hashes
+        self.w3.eth.chain, self.w3.eth.block_number, self.w3.eth.logs = b'\x02', 1, []
+        self.indexer.register_auction(AUCTION_1, 1)
+        self.assertEqual(self.indexer.bids(), [])
+        self.add_log(AUCTION_1, self.bid_topic, BOB, 2, 3)
+        self.indexer.sync()
+        self.assertEqual([(bid['round'], bid['block_number']) for bid in self.indexer.bids(round_num=1)], [(1, 3)])
+
+        # A new chain that already went past the last indexed block is detected from its hash
+        self.w3.eth.chain, self.w3.eth.block_number, self.w3.eth.logs = b'\x03', 40, []
+        self.indexer.register_auction(AUCTION_1, 2)
+        self.assertEqual(self.indexer.bids(), [])
+        self.assertEqual(self.indexer.last_indexed_block(), 39)
+
+if __name__ == '__main__':
+    unittest.main()
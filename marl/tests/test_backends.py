@@ -0,0 +1,126 @@
+import os
+import unittest
+from unittest import mock
+from eth_tester import EthereumTester
+from marl.artifacts import project_root
+from marl.backends import ETH_TESTER_VERSION, PY_EVM_VERSION, InProcessNode, make_web3
+from marl.clock import VirtualClock
+from marl.hardhat_rpc import HardhatChain
+from marl.tick_mining import TickMiner, succeeded
+
+# Contract storing the value sent to it in slot 0 and returning slot 0 to any call (see test_view_cache)
+RUNTIME = '3415600a5734600055005b60005460005260206000f3'
+INIT = '6016' '80' '600b' '6000' '39' '6000' 'f3'
+ABI = [{'type': 'function', 'name': 'value', 'stateMutability': 'view', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}]
+
+
+class TestInProcessNode(unittest.TestCase):
+    """
+    Unit test class for the in-process EVM standing in for a Hardhat node.
+    """
+
+    def setUp(self):
+        self.w3 = InProcessNode().web3()
+        self.chain = HardhatChain(self.w3)
+        self.accounts = self.w3.eth.accounts
+
+    def transfer(self, sender, **transaction):
+        return self.w3.eth.send_transaction(dict(transaction, **{'from': sender, 'to': self.accounts[-1], 'value': 1, 'gas': 21000}))
+
+    def test_hardhat_accounts(self):
+        """
+        Tests that the chain starts with the accounts of a fresh Hardhat node, on a chain of its own.
+        """
+        self.assertEqual(len(self.accounts), 20)
+        self.assertEqual(self.accounts[0], '0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266')
+        self.assertEqual(self.w3.eth.get_balance(self.accounts[0]), self.w3.to_wei(10000, 'ether'))
+        self.transfer(self.accounts[0])
+        self.assertEqual(make_web3('eth-tester').eth.block_number, self.w3.eth.block_number - 1)
+        with self.assertRaises(ValueError):
+            make_web3('ipc')
+
+    def test_manual_mining(self):
+        """
+        Tests that with automine off, a sender's transactions wait in the pending block with
+        consecutive nonces and are mined together, and that a pending transaction can be dropped.
+        """
+        self.chain.set_automine(False)
+        block = self.w3.eth.block_number
+        tx_hashes = [self.transfer(self.accounts[1]) for _ in range(3)]
+        self.assertEqual(self.w3.eth.block_number, block)
+        self.assertEqual(self.w3.eth.get_transaction_count(self.accounts[1], 'pending'), 3)
+        self.assertEqual(self.chain.batch([('hardhat_dropTransaction', [tx_hashes[2].to_0x_hex()])]), [True])
+
+        self.chain.mine()
+        self.chain.set_automine(True)
+        self.assertEqual(self.w3.eth.block_number, block + 1)
+        self.assertEqual([self.w3.eth.get_transaction_receipt(tx_hash)['status'] for tx_hash in tx_hashes[:2]], [1, 1])
+        self.assertEqual(self.w3.eth.get_transaction_count(self.accounts[1]), 2)
+        self.transfer(self.accounts[1])
+        self.assertEqual(self.w3.eth.block_number, block + 2)
+
+    def test_time_snapshots_and_balances(self):
+        """
+        Tests the time travel, snapshot and balance methods the simulations rely on.
+        """
+        clock = VirtualClock(self.chain)
+        start = clock.now()
+        clock.sleep(100)
+        self.chain.mine()
+        self.assertEqual(clock.now(), start + 101)
+        clock.wait_until(start + 1000)
+        self.assertEqual(clock.now(), start + 1000)
+
+        snapshot = self.chain.snapshot()
+        self.chain.batch([('hardhat_setBalance', [self.accounts[2], hex(5)])])
+        self.transfer(self.accounts[0])
+        self.assertEqual(self.w3.eth.get_balance(self.accounts[2]), 5)
+        self.chain.revert_and_snapshot(snapshot)
+        self.assertEqual(self.w3.eth.get_balance(self.accounts[2]), self.w3.to_wei(10000, 'ether'))
+        self.assertEqual(clock.now(), start + 1000)
+
+    def test_contract_simulation_loop(self):
+        """
+        Tests a short simulation on a deployed contract: every tick, three agents send a
+        transaction, which are mined together in one block and executed in submission order.
+        """
+        tx_hash = self.w3.eth.send_transaction({'from': self.accounts[0], 'data': '0x' + INIT + RUNTIME})
+        address = self.w3.eth.wait_for_transaction_receipt(tx_hash)['contractAddress']
+        # Same address as the first deployment on a fresh Hardhat node
+        self.assertEqual(address, '0x5FbDB2315678afecb367f032d93F642f64180aa3')
+        contract = self.w3.eth.contract(address=address, abi=ABI)
+        agents = self.accounts[1:4]
+
+        with TickMiner(self.w3, self.chain, gas=50000) as miner:
+            for tick in range(1, 4):
+                block = self.w3.eth.block_number
+                miner.submit_many([
+                    {'from': agent, 'to': address, 'data': '0x', 'value': 10 * tick + i,
+                     'nonce': self.w3.eth.get_transaction_count(agent, 'pending')}
+                    for i, agent in enumerate(agents)
+                ])
+                outcomes = miner.mine()
+                self.assertTrue(all(succeeded(outcome) for outcome in outcomes))
+                self.assertEqual({outcome['blockNumber'] for outcome in outcomes}, {block + 1})
+                # The last agent's transaction of the tick executed last
+                self.assertEqual(contract.functions.value().call(), 10 * tick + 2)
+        self.assertEqual([self.w3.eth.get_transaction_count(agent) for agent in agents], [3, 3, 3])
+
+    def test_missing_internals_are_reported(self):
+        """
+        Tests that an eth-tester without the undecorated sending methods fails with a clear error.
+        """
+        with mock.patch.object(EthereumTester, 'send_transaction', lambda tester, transaction: None):
+            with self.assertRaisesRegex(RuntimeError, 'eth-tester=='):
+                InProcessNode()
+
+    def test_pinned_versions(self):
+        """
+        Tests that the requirements file pins the releases InProcessNode was written against.
+        """
+        with open(os.path.join(project_root, 'requirements-eth-tester.txt')) as f:
+            pins = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        self.assertEqual(pins, [f'eth-tester=={ETH_TESTER_VERSION}', f'py-evm=={PY_EVM_VERSION}'])
+
+if __name__ == '__main__':
+    unittest.main()
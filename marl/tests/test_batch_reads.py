@@ -0,0 +1,156 @@
+import unittest
+from web3 import EthereumTesterProvider, Web3
+from web3.providers.base import JSONBaseProvider
+from marl.backends import InProcessNode
+from marl.batch_reads import batch_call, batch_receipts, public_getters, read_public_state
+
+# Contract storing the value sent to it in slot 0 and returning slot 0 to any call (see test_view_cache)
+RUNTIME = '3415600a5734600055005b60005460005260206000f3'
+INIT = '6016' '80' '600b' '6000' '39' '6000' 'f3'
+
+
+def function_abi(name, mutability='view', inputs=()):
+    return {'type': 'function', 'name': name, 'stateMutability': mutability,
+            'inputs': [{'name': '', 'type': t} for t in inputs], 'outputs': [{'name': '', 'type': 'uint256'}]}
+
+
+ABI = [function_abi('highestBid'), function_abi('proposals', inputs=['uint256']), function_abi('bid', 'payable'),
+       function_abi('auctionEndTime'), {'type': 'event', 'name': 'Bid', 'inputs': [], 'anonymous': False}]
+
+
+class BoundCall:
+    def __init__(self, name):
+        self.name = name
+
+    def call(self, block_identifier=None):
+        return (self.name, block_identifier)
+
+
+class FakeBatch:
+    def __init__(self):
+        self.requests = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def add(self, request):
+        self.requests.append(request)
+
+    def execute(self):
+        return tuple(self.requests)
+
+
+class FakeWeb3:
+    """
+    Web3 stand-in with a batching provider; every batched call returns its name and block.
+    """
+    class eth:
+        block_number = 42
+
+    def __init__(self):
+        self.batches = []
+
+    def batch_requests(self):
+        self.batches.append(FakeBatch())
+        return self.batches[-1]
+
+
+class BatchingTesterProvider(EthereumTesterProvider, JSONBaseProvider):
+    """
+    EthereumTesterProvider answering JSON-RPC batches, which web3 only sends to JSON providers:
+    the requests of a batch go through the tester's middleware and are executed in order, and
+    every batch is recorded.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def batch_request_func(self, w3, middleware_onion):
+        make_batch_request = self.make_batch_request
+        for middleware in reversed(middleware_onion.as_tuple_of_middleware() + tuple(self._middleware)):
+            make_batch_request = middleware(w3).wrap_make_batch_request(make_batch_request)
+        return make_batch_request
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        return [self.make_request(method, params) for method, params in requests]
+
+
+class TestBatchReads(unittest.TestCase):
+    """
+    Unit test class for the batched reads of contract state.
+    """
+
+    def setUp(self):
+        self.w3 = InProcessNode().web3()
+        self.account = self.w3.eth.accounts[0]
+        tx_hash = self.w3.eth.send_transaction({'from': self.account, 'data': '0x' + INIT + RUNTIME})
+        address = self.w3.eth.wait_for_transaction_receipt(tx_hash)['contractAddress']
+        self.contract = self.w3.eth.contract(address=address, abi=ABI)
+
+    def store(self, value):
+        return self.w3.eth.send_transaction({'from': self.account, 'to': self.contract.address, 'value': value})
+
+    def test_public_getters(self):
+        """
+        Tests that only argument-free view functions count as public state.
+        """
+        self.assertEqual(public_getters(self.contract), ['highestBid', 'auctionEndTime'])
+
+    def test_state_is_read_at_one_block(self):
+        """
+        Tests that the public state is read at the latest block by default, or at the given one.
+        """
+        self.store(5)
+        block = self.w3.eth.block_number
+        self.store(9)
+        self.assertEqual(read_public_state(self.contract),
+                         {'highestBid': 9, 'auctionEndTime': 9, 'blockNumber': block + 1})
+        self.assertEqual(read_public_state(self.contract, block, getters=['highestBid']),
+                         {'highestBid': 5, 'blockNumber': block})
+
+    def test_receipts_in_order(self):
+        """
+        Tests that receipts are returned in the order of the hashes.
+        """
+        tx_hashes = [self.store(value) for value in (1, 2, 3)]
+        receipts = batch_receipts(self.w3, tx_hashes[::-1])
+        self.assertEqual([receipt['transactionHash'] for receipt in receipts], tx_hashes[::-1])
+        self.assertEqual(batch_receipts(self.w3, []), [])
+
+    def test_batching_provider(self):
+        """
+        Tests that with a batching provider every call goes into one batch, pinned to the block
+        number read first.
+        """
+        w3 = FakeWeb3()
+        block, results = batch_call(w3, [BoundCall('ended'), BoundCall('highestBid')])
+        self.assertEqual((block, results), (42, [('ended', 42), ('highestBid', 42)]))
+        self.assertEqual(len(w3.batches), 1)
+
+    def test_batched_contract_calls(self):
+        """
+        Tests the `w3.batch_requests()` path on the in-process chain: the contract calls are
+        encoded, sent as one batch pinned to the given block and decoded in order.
+        """
+        node = InProcessNode()
+        provider = BatchingTesterProvider(node.tester, api_endpoints=node.endpoints())
+        w3 = Web3(provider)
+        # Calls without a sender would look up the accounts from within the batch
+        w3.eth.default_account = self.account
+        tx_hash = w3.eth.send_transaction({'from': self.account, 'data': '0x' + INIT + RUNTIME})
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        contract, block = w3.eth.contract(address=receipt['contractAddress'], abi=ABI), receipt['blockNumber']
+        w3.eth.wait_for_transaction_receipt(w3.eth.send_transaction({'from': self.account, 'to': contract.address, 'value': 7}))
+
+        state = read_public_state(contract, block + 1)
+        self.assertEqual(state, {'highestBid': 7, 'auctionEndTime': 7, 'blockNumber': block + 1})
+        self.assertEqual(read_public_state(contract, block, getters=['highestBid'])['highestBid'], 0)
+        self.assertEqual(len(provider.batches), 2)
+        self.assertEqual([(method, params[1]) for method, params in provider.batches[0]], [('eth_call', block + 1)] * 2)
+
+if __name__ == '__main__':
+    unittest.main()
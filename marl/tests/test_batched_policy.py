@@ -0,0 +1,41 @@
+import os
+import unittest
+import numpy as np
+from stable_baselines3 import DQN
+from marl.batched_policy import DecisionStage
+
+model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "decentralized_society_model")
+
+class TestDecisionStage(unittest.TestCase):
+    """
+    Unit test class for the batched DecisionStage, checked against per-agent `model.predict` calls
+    of the trained society model.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = DQN.load(model_path)
+
+    def test_matches_per_agent_predict(self):
+        """
+        Tests that the batched decision gives every agent the action its own forward pass would.
+        """
+        rng = np.random.default_rng(0)
+        observations = np.column_stack([rng.integers(0, 1000, 300), rng.integers(0, 2, 300)]).astype(np.float32)
+        # Repeated observations exercise the deduplication
+        observations = np.vstack([observations, observations[:50]])
+
+        actions = DecisionStage(self.model).decide(observations)
+        expected = [self.model.predict(obs, deterministic=True)[0] for obs in observations]
+        np.testing.assert_array_equal(actions, expected)
+
+    def test_shared_observation(self):
+        """
+        Tests that agents observing the same state all get the action predicted for that state.
+        """
+        obs = np.array([100, 1], dtype=np.float32)
+        expected, _ = self.model.predict(obs, deterministic=True)
+        np.testing.assert_array_equal(DecisionStage(self.model).decide_shared(obs, 1000), np.full(1000, expected))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest import mock
+from marl import benchmark
+from marl import decentralized_society_with_agents as sim
+from marl.benchmark import BENCHMARK_VERSION, compare, run_benchmarks
+
+class TestBenchmark(unittest.TestCase):
+    """
+    Unit test class for the benchmark suite and its baseline comparison.
+    """
+
+    def test_memory_benchmarks_run(self):
+        """
+        Tests that every benchmark runs on the in-memory backend and reports its throughput, and
+        the simulation loop its tick latency.
+        """
+        report = run_benchmarks(backends=('memory',), repeat=1, scale=0.005)
+        self.assertEqual(report['version'], BENCHMARK_VERSION)
+        results = report['results']
+        self.assertEqual(set(results), {'society_env[memory]', 'dao_env[memory]', 'auction_env[memory]', 'auction_bids[memory]', 'simulate[memory]'})
+        self.assertGreater(results['society_env[memory]']['steps_per_second'], 0)
+        self.assertGreater(results['auction_bids[memory]']['bids_per_second'], 0)
+        simulate = results['simulate[memory]']
+        self.assertGreater(simulate['transactions'], 0)
+        self.assertLessEqual(simulate['tick_latency_p50_seconds'], simulate['tick_latency_p95_seconds'])
+
+    def test_simulate_restores_module_state(self):
+        """
+        Tests that the simulation benchmark leaves the simulation module's globals and action
+        counters as it found them.
+        """
+        before = {name: getattr(sim, name) for name in ('w3', 'env', 'accounts', 'agents', 'rpc_metrics', 'iterations')}
+        counters = dict(sim.efficient_actions), dict(sim.selfish_actions)
+        run_benchmarks(['simulate'], backends=('memory',), repeat=1, scale=0.005)
+        self.assertEqual({name: getattr(sim, name) for name in before}, before)
+        self.assertEqual((sim.efficient_actions, sim.selfish_actions), counters)
+
+    def test_evm_failures_are_not_skipped(self):
+        """
+        Tests that an unavailable EVM backend is reported as skipped, but an error in an EVM
+        benchmark is raised.
+        """
+        def missing(backend, n):
+            raise ImportError("No module named 'eth_tester'")
+
+        def broken(backend, n):
+            raise KeyError('highestBid')
+
+        with mock.patch.object(benchmark, 'is_compiled', lambda: True), \
+                mock.patch.dict(benchmark.BENCHMARKS, {'auction_bids': (missing, {'evm': 1})}):
+            report = run_benchmarks(['auction_bids'], backends=('evm',), repeat=1)
+            self.assertIn('ImportError', report['results']['auction_bids[evm]']['skipped'])
+            benchmark.BENCHMARKS['auction_bids'] = (broken, {'evm': 1})
+            with self.assertRaises(KeyError):
+                run_benchmarks(['auction_bids'], backends=('evm',), repeat=1)
+
+    def test_compare_flags_regressions(self):
+        """
+        Tests that a throughput drop or a latency rise beyond the threshold is a regression, that
+        counts are not compared, and that baselines of another version are refused.
+        """
+        baseline = {'version': BENCHMARK_VERSION, 'results': {
+            'simulate[memory]': {'ticks_per_second': 100.0, 'tick_latency_p50_seconds': 0.010, 'transactions': 300},
+            'dao_env[memory]': {'steps_per_second': 1000.0},
+        }}
+        report = {'version': BENCHMARK_VERSION, 'results': {
+            'simulate[memory]': {'ticks_per_second': 95.0, 'tick_latency_p50_seconds': 0.013, 'transactions': 100},
+            'dao_env[memory]': {'steps_per_second': 1500.0},
+            'society_env[evm]': {'skipped': 'contracts not compiled'},
+        }}
+        statuses = {(row['benchmark'], row['metric']): row['status'] for row in compare(baseline, report, threshold=0.1)}
+        self.assertEqual(statuses, {
+            ('simulate[memory]', 'ticks_per_second'): 'ok',
+            ('simulate[memory]', 'tick_latency_p50_seconds'): 'regressed',
+            ('dao_env[memory]', 'steps_per_second'): 'improved',
+        })
+        with self.assertRaises(ValueError):
+            compare(dict(baseline, version=BENCHMARK_VERSION - 1), report)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
+from web3.exceptions import Web3TypeError
+from marl.bulk_voting import bulk_transact, bulk_vote
+
+VOTED_ABI = {'type': 'event', 'name': 'Voted', 'anonymous': False, 'inputs': [
+    {'name': 'proposalId', 'type': 'uint256', 'indexed': False},
+    {'name': 'voter', 'type': 'address', 'indexed': False},
+    {'name': 'voteFor', 'type': 'bool', 'indexed': False},
+]}
+VOTE_ABI = {'type': 'function', 'name': 'vote', 'stateMutability': 'nonpayable', 'outputs': [], 'inputs': [
+    {'name': '_proposalId', 'type': 'uint256'},
+    {'name': '_voteFor', 'type': 'bool'},
+]}
+DAO_ADDRESS = Web3.to_checksum_address('0x' + '11' * 20)
+VOTERS = [Web3.to_checksum_address('0x' + f'{i:02x}' * 20) for i in range(0xa1, 0xa5)]
+
+
+class FakeChain:
+    """
+    Hardhat stand-in with a mempool: `evm_mine` includes up to `block_capacity` transactions whose
+    nonces follow their sender's, and every included vote emits a `Voted` log.
+    """
+    def __init__(self, block_capacity, rejected=()):
+        self.block_capacity = block_capacity
+        self.rejected = set(rejected)  # (sender, nonce) pairs refused once by eth_sendTransaction
+        self.nonces = {}
+        self.mempool = []
+        self.receipts = {}
+        self.automine = True
+        self.block_number = 0
+        self.sent = []
+
+    def set_automine(self, enabled):
+        self.automine = enabled
+
+    def batch(self, requests, raise_errors=True):
+        return [self._handle(method, params) for method, params in requests]
+
+    def _handle(self, method, params):
+        if method == 'eth_getTransactionCount':
+            pending = sum(tx['from'] == params[0] for tx in self.mempool)
+            return hex(self.nonces.get(params[0], 0) + pending)
+        if method == 'eth_sendTransaction':
+            tx = dict(params[0], nonce=int(params[0]['nonce'], 16))
+            self.sent.append(tx)
+            if (tx['from'], tx['nonce']) in self.rejected:
+                self.rejected.discard((tx['from'], tx['nonce']))
+                return ValueError("rejected")
+            tx['hash'] = '0x' + f'{len(self.sent):064x}'
+            self.mempool.append(tx)
+            return tx['hash']
+        if method == 'hardhat_dropTransaction':
+            self.mempool = [tx for tx in self.mempool if tx['hash'] != params[0]]
+            return True
+        raise ValueError(method)
+
+    def mine(self):
+        assert not self.automine
+        self.block_number += 1
+        included = []
+        for tx in list(self.mempool):
+            if len(included) < self.block_capacity and tx['nonce'] == self.nonces.get(tx['from'], 0):
+                self.nonces[tx['from']] = tx['nonce'] + 1
+                included.append(tx)
+                self.mempool.remove(tx)
+        for tx in included:
+            proposal_id, vote_for = Web3().codec.decode(['uint256', 'bool'], bytes.fromhex(tx['data'][10:]))
+            self.receipts[tx['hash']] = {
+                'status': 1, 'blockNumber': self.block_number, 'transactionHash': bytes.fromhex(tx['hash'][2:]),
+                'logs': [{
+                    'address': DAO_ADDRESS, 'topics': [event_abi_to_log_topic(VOTED_ABI)],
+                    'data': encode(['uint256', 'address', 'bool'], [proposal_id, tx['from'], vote_for]),
+                    'blockNumber': self.block_number, 'transactionHash': bytes.fromhex(tx['hash'][2:]),
+                    'transactionIndex': 0, 'blockHash': b'\x00' * 32, 'logIndex': 0, 'removed': False,
+                }],
+            }
+
+
+class FakeEth:
+    def __init__(self, chain):
+        self.chain = chain
+
+    def get_block(self, block_identifier):
+        return {'gasLimit': self.chain.block_capacity * 100000}
+
+    def get_transaction_receipt(self, tx_hash):
+        return self.chain.receipts[tx_hash]
+
+
+class FakeWeb3:
+    def __init__(self, chain):
+        self.eth = FakeEth(chain)
+
+    def batch_requests(self):
+        raise Web3TypeError("No batching")
+
+
+class TestBulkVoting(unittest.TestCase):
+    """
+    Unit test class for the bulk voting path, run against a fake Hardhat mempool.
+    """
+
+    def setUp(self):
+        self.dao = Web3().eth.contract(address=DAO_ADDRESS, abi=[VOTED_ABI, VOTE_ABI])
+
+    def test_votes_fill_blocks_and_are_tallied(self):
+        """
+        Tests that votes are packed into as few blocks as the gas limit allows, with consecutive
+        nonces per voter, and that the tally comes from the `Voted` events.
+        """
+        chain = FakeChain(block_capacity=10)
+        chain.nonces[VOTERS[0]] = 7
+        votes = [(voter, proposal_id, proposal_id % 2 == 0 or voter == VOTERS[0])
+                 for proposal_id in range(6) for voter in VOTERS]
+        result = bulk_vote(FakeWeb3(chain), self.dao, votes, chain=chain)
+
+        self.assertEqual(result.blocks, 3)
+        self.assertTrue(all(outcome['status'] == 1 for outcome in result.outcomes))
+        self.assertEqual([tx['nonce'] for tx in chain.sent if tx['from'] == VOTERS[0]], list(range(7, 13)))
+        self.assertEqual(result.tally[0], {'for': 4, 'against': 0})
+        self.assertEqual(result.tally[1], {'for': 1, 'against': 3})
+        self.assertTrue(chain.automine)
+
+    def test_rejected_transaction_drops_sender_followers(self):
+        """
+        Tests that a rejected transaction fails the sender's later transactions of the same block,
+        which could never be mined, and that the sender's nonces are resynchronized afterwards.
+        """
+        chain = FakeChain(block_capacity=3, rejected={(VOTERS[0], 1)})
+        calls = [(self.dao.functions.vote(i, True), VOTERS[0]) for i in range(5)]
+        outcomes, blocks = bulk_transact(FakeWeb3(chain), calls, gas=100000, chain=chain)
+
+        self.assertEqual(blocks, 2)
+        self.assertEqual(outcomes[0]['status'], 1)
+        self.assertTrue(all(isinstance(outcome, Exception) for outcome in outcomes[1:3]))
+        self.assertTrue(all(outcome['status'] == 1 for outcome in outcomes[3:]))
+        self.assertEqual([tx['nonce'] for tx in chain.sent[3:]], [1, 2])
+        self.assertEqual(chain.mempool, [])
+
+if __name__ == '__main__':
+    unittest.main()
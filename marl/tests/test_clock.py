@@ -0,0 +1,105 @@
+import unittest
+from unittest import mock
+from marl import clock
+from marl.backends import InProcessNode
+from marl.clock import VirtualClock, WallClock
+from marl.hardhat_rpc import HardhatChain
+
+
+class BatchProvider:
+    """
+    Provider answering JSON-RPC batches with canned responses, recording the requests.
+    """
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def make_batch_request(self, requests):
+        self.requests.append(requests)
+        return self.responses
+
+
+class FakeWeb3:
+    def __init__(self, provider):
+        self.provider = provider
+
+
+class TestClock(unittest.TestCase):
+    """
+    Unit test class for the clocks and the development RPC wrapper they use, run on an
+    in-process chain.
+    """
+
+    def setUp(self):
+        self.w3 = InProcessNode().web3()
+        self.chain = HardhatChain(self.w3)
+        self.clock = VirtualClock(self.chain)
+
+    def test_sleep_moves_chain_time(self):
+        """
+        Tests that sleeping adds to chain time from the next block on, without mining or blocking.
+        """
+        start, block = self.clock.now(), self.w3.eth.block_number
+        self.clock.sleep(0)
+        self.clock.sleep(3600)
+        self.assertEqual((self.clock.now(), self.w3.eth.block_number), (start, block))
+        self.chain.mine()
+        # Blocks are one second apart, plus the hour slept
+        self.assertEqual(self.clock.now(), start + 3601)
+
+    def test_wait_until_mines_at_the_target(self):
+        """
+        Tests that waiting for a future timestamp mines one block at it, and that waiting for a
+        past one does nothing.
+        """
+        target = self.clock.now() + 86400
+        self.clock.wait_until(target)
+        self.assertEqual(self.clock.now(), target)
+        block = self.w3.eth.block_number
+        self.clock.wait_until(target - 10)
+        self.assertEqual((self.clock.now(), self.w3.eth.block_number), (target, block))
+
+    def test_wall_clock_sleeps_past_the_target(self):
+        """
+        Tests that the wall clock sleeps until just past a future timestamp and not at all for a
+        past one.
+        """
+        wall_clock = WallClock(self.w3)
+        now = wall_clock.now()
+        with mock.patch.object(clock.time, 'sleep') as sleep, mock.patch('builtins.print'):
+            wall_clock.wait_until(now - 5)
+            wall_clock.wait_until(now + 5)
+            wall_clock.sleep(2)
+        self.assertEqual(sleep.call_args_list, [mock.call(6), mock.call(2)])
+
+    def test_revert_to_unknown_snapshot(self):
+        """
+        Tests that reverting to a snapshot the node does not know is refused.
+        """
+        snapshot = self.chain.snapshot()
+        self.assertNotEqual(self.chain.revert_and_snapshot(snapshot), snapshot)
+        self.assertFalse(self.chain.revert(hex(999)))
+        with self.assertRaises(ValueError):
+            self.chain.revert_and_snapshot(hex(999))
+
+    def test_batch_errors(self):
+        """
+        Tests that failed requests of a batch raise, or stand as ValueErrors in their place with
+        `raise_errors=False`, both with and without provider batching.
+        """
+        results = self.chain.batch([('evm_setAutomine', [True]), ('evm_unknownMethod', [])], raise_errors=False)
+        self.assertEqual(results[0], True)
+        self.assertIsInstance(results[1], ValueError)
+
+        provider = BatchProvider([{'result': '0x1'}, {'error': {'code': -32000, 'message': 'nonce too low'}}])
+        chain = HardhatChain(FakeWeb3(provider))
+        requests = [('eth_blockNumber', []), ('eth_sendRawTransaction', ['0x00'])]
+        results = chain.batch(requests, raise_errors=False)
+        self.assertEqual(results[0], '0x1')
+        self.assertEqual(str(results[1]), 'nonce too low')
+        with self.assertRaises(ValueError):
+            chain.batch(requests)
+        self.assertEqual(provider.requests, [requests, requests])
+
+if __name__ == '__main__':
+    unittest.main()
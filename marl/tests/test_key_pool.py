@@ -0,0 +1,111 @@
+import unittest
+from eth_account import Account
+from marl.key_pool import MIN_PARALLEL_BATCH, KeyPool
+
+class FakeEth:
+    chain_id = 31337
+
+    def __init__(self):
+        self.gas_price_reads = 0
+        self.sent = []
+        self.reject = False
+
+    @property
+    def gas_price(self):
+        self.gas_price_reads += 1
+        return 10 ** 9 * self.gas_price_reads
+
+    def get_transaction_count(self, address, block_identifier='latest'):
+        return 0
+
+    def send_raw_transaction(self, raw):
+        if self.reject:
+            raise ValueError('replacement transaction underpriced')
+        self.sent.append(raw)
+        return f'0x{len(self.sent):064x}'
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+class FakeFunction:
+    address = '0x5FbDB2315678afecb367f032d93F642f64180aa3'
+
+    @staticmethod
+    def _encode_transaction_data():
+        return '0x'
+
+
+class FakeChain:
+    def __init__(self):
+        self.requests = []
+
+    def batch(self, requests, raise_errors=True):
+        self.requests.extend(requests)
+        return [True for _ in requests]
+
+
+class TestKeyPool(unittest.TestCase):
+    """
+    Unit test class for the deterministic local accounts of KeyPool.
+    """
+
+    def test_accounts_are_deterministic(self):
+        """
+        Tests that a seed always derives the same accounts, and a different seed other ones.
+        """
+        pool = KeyPool(FakeWeb3(), 5, chain=FakeChain())
+        self.assertEqual(pool.addresses, KeyPool(FakeWeb3(), 5, chain=FakeChain()).addresses)
+        self.assertEqual(len(set(pool.addresses)), 5)
+        self.assertFalse(set(pool.addresses) & set(KeyPool(FakeWeb3(), 5, seed=b'other', chain=FakeChain()).addresses))
+
+    def test_funds_in_one_batch(self):
+        """
+        Tests that funding sets every account's balance with `hardhat_setBalance`.
+        """
+        chain = FakeChain()
+        pool = KeyPool(FakeWeb3(), 3, chain=chain)
+        pool.fund(10 ** 18)
+        self.assertEqual(chain.requests, [('hardhat_setBalance', [address, hex(10 ** 18)]) for address in pool.addresses])
+
+    def test_parallel_signing(self):
+        """
+        Tests that transactions signed in the process pool are identical to in-process signatures
+        and recover to their senders.
+        """
+        n = MIN_PARALLEL_BATCH
+        with KeyPool(FakeWeb3(), n, chain=FakeChain(), processes=2) as pool:
+            transactions = [{'from': address, 'to': pool.addresses[0], 'nonce': i, 'gas': 21000, 'value': i}
+                            for i, address in enumerate(pool.addresses)]
+            parallel = pool.sign_transactions(transactions)
+        serial = KeyPool(FakeWeb3(), n, chain=FakeChain(), processes=1).sign_transactions(transactions)
+        self.assertEqual(parallel, serial)
+        self.assertEqual([Account.recover_transaction(raw) for raw in parallel], pool.addresses)
+
+    def test_transact_reuses_gas_price(self):
+        """
+        Tests that single transactions reuse the gas price read for the last batch, and that a
+        rejected transaction makes the next one read it again.
+        """
+        w3 = FakeWeb3()
+        pool = KeyPool(w3, 2, chain=FakeChain())
+        pool.sign_transactions([{'from': address, 'to': FakeFunction.address, 'nonce': 0, 'gas': 21000}
+                                for address in pool.addresses])
+        for _ in range(3):
+            pool.transact(FakeFunction(), pool.addresses[0], gas=21000)
+        pool.transact(FakeFunction(), pool.addresses[1], gas=21000, gas_price=5)
+        self.assertEqual(w3.eth.gas_price_reads, 1)
+        self.assertEqual([Account.recover_transaction(raw) for raw in w3.eth.sent], [pool.addresses[0]] * 3 + [pool.addresses[1]])
+
+        w3.eth.reject = True
+        with self.assertRaises(ValueError):
+            pool.transact(FakeFunction(), pool.addresses[0], gas=21000)
+        w3.eth.reject = False
+        pool.transact(FakeFunction(), pool.addresses[0], gas=21000)
+        self.assertEqual(w3.eth.gas_price_reads, 2)
+        self.assertEqual(pool.gas_price(), 4 * 10 ** 9)
+
+if __name__ == '__main__':
+    unittest.main()
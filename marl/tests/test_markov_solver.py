@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from marl.markov_solver import MAX_CACHED_CHAINS, SocietyMarkovChain, _solved_chain, solve
+from marl.vec_society_env import VecDecentralizedSocietyEnv
+
+class TestMarkovSolver(unittest.TestCase):
+    """
+    Unit test class for the exact Markov-chain analysis of DecentralizedSocietyEnv.
+    """
+
+    def test_deterministic_policies(self):
+        """
+        Tests policies whose trajectory is known: always efficient gains 12 resources per step, and
+        always selfish gets stuck once every action reverts.
+        """
+        efficient = solve(np.eye(8)[0])
+        self.assertEqual(efficient.summary()['saturation_probability'], 1)
+        self.assertAlmostEqual(efficient.summary()['expected_steps'], 75)   # ceil(900 / 12)
+        self.assertAlmostEqual(efficient.summary()['expected_reward'], 75 * 15)
+        self.assertAlmostEqual(efficient.stationary_distribution[112], 1 / 75)
+
+        # 100 -> 68 -> 36 -> 4, where farming, building and trading selfishly all revert
+        selfish = solve(np.eye(8)[7])
+        self.assertEqual(selfish.absorption_probabilities[selfish.state_index(100)].sum(), 0)
+        self.assertEqual(selfish.summary()['expected_steps'], np.inf)
+        self.assertEqual(selfish.stationary_distribution[4], 1)
+
+    def test_matches_simulation(self):
+        """
+        Tests the uniformly random policy against episodes simulated with VecDecentralizedSocietyEnv.
+        """
+        chain = SocietyMarkovChain(np.full(8, 1 / 8), max_resources=60, initial_resources=20)
+        env = VecDecentralizedSocietyEnv(20000, initial_resources=20, max_resources=60)
+        env.reset()
+        rng = np.random.default_rng(0)
+        steps = np.zeros(env.num_envs)
+        saturated = np.zeros(env.num_envs, dtype=bool)
+        running = np.ones(env.num_envs, dtype=bool)
+        while running.any():
+            _, _, dones, infos = env.step(rng.integers(0, 8, env.num_envs))
+            steps += running
+            for i in np.flatnonzero(dones & running):
+                saturated[i] = infos[i]['terminal_observation'][0] >= 60
+            running &= ~dones
+
+        summary = chain.summary()
+        self.assertAlmostEqual(saturated.mean(), summary['saturation_probability'], delta=0.01)
+        self.assertAlmostEqual(steps.mean(), summary['expected_steps'], delta=0.05 * summary['expected_steps'])
+        self.assertAlmostEqual(chain.stationary_distribution.sum(), 1)
+
+    def test_solutions_are_cached(self):
+        """
+        Tests that solving the same policy twice reuses the solved chain.
+        """
+        policy = np.full((1000, 8), 1 / 8)
+        self.assertIs(solve(policy), solve(np.full(8, 1 / 8)))
+        self.assertIsNot(solve(policy), solve(policy, initial_resources=50))
+
+    def test_cache_is_bounded(self):
+        """
+        Tests that only the most recently solved chains are kept.
+        """
+        first = solve(np.eye(8)[0], max_resources=20, initial_resources=1)
+        for initial_resources in range(2, MAX_CACHED_CHAINS + 2):
+            solve(np.eye(8)[0], max_resources=20, initial_resources=initial_resources)
+        self.assertLessEqual(_solved_chain.cache_info().currsize, MAX_CACHED_CHAINS)
+        self.assertIsNot(solve(np.eye(8)[0], max_resources=20, initial_resources=1), first)
+
+if __name__ == '__main__':
+    unittest.main()
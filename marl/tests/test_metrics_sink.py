@@ -0,0 +1,84 @@
+import os
+import csv
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from marl import metrics_sink
+from marl.metrics_sink import (
+    MetricsSink, NO_ACTION, agent_metrics, chunk_paths, export_csv, load_metrics, society_columns,
+    society_csv_columns, society_row
+)
+
+class TestMetricsSink(unittest.TestCase):
+    """
+    Unit test class for the chunked MetricsSink and its readers.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = os.path.join(self.tmp.name, 'metrics')
+
+    def write_rows(self, n, **kwargs):
+        with MetricsSink(self.directory, society_columns(), **kwargs) as sink:
+            for i in range(n):
+                row = society_row(i + 1)
+                row['total_resources'] = 10 * i
+                row.update(agent_metrics('farmer', i % 2, 5 if i % 2 == 0 else -5, False))
+                if i % 3 == 0:
+                    row.update(agent_metrics('trader', 1, -10, True))
+                sink.append(**row)
+        return sink
+
+    def test_chunks_and_reload(self):
+        """
+        Tests that rows are written in fixed-size chunks and read back unchanged, with agents that
+        did not act recorded as NO_ACTION.
+        """
+        self.write_rows(25, chunk_size=10, flush_interval=None)
+        self.assertEqual(len(chunk_paths(self.directory)), 3)
+
+        metrics = load_metrics(self.directory)
+        np.testing.assert_array_equal(metrics['iteration'], np.arange(1, 26))
+        np.testing.assert_array_equal(metrics['total_resources'], 10 * np.arange(25))
+        np.testing.assert_array_equal(metrics['farmer_action'], np.arange(25) % 2)
+        np.testing.assert_array_equal(metrics['builder_action'], np.full(25, NO_ACTION))
+        np.testing.assert_array_equal(metrics['trader_failed'], np.arange(25) % 3 == 0)
+
+    def test_periodic_flush(self):
+        """
+        Tests that buffered rows reach the disk once the flush interval has passed, before the chunk is full.
+        """
+        with mock.patch.object(metrics_sink.time, 'monotonic', side_effect=[0, 1, 100, 100, 101]):
+            sink = MetricsSink(self.directory, society_columns(), chunk_size=1000, flush_interval=50)
+            sink.append(**society_row(1))
+            self.assertEqual(chunk_paths(self.directory), [])
+            sink.append(**society_row(2))
+            self.assertEqual(len(chunk_paths(self.directory)), 1)
+        self.assertEqual(len(load_metrics(self.directory)['iteration']), 2)
+
+    def test_unknown_column(self):
+        """
+        Tests that appending an unknown column is rejected.
+        """
+        with MetricsSink(self.directory, society_columns()) as sink:
+            with self.assertRaises(KeyError):
+                sink.append(unknown=1)
+
+    def test_export_csv(self):
+        """
+        Tests that the CSV export keeps the historical leading columns and covers every row.
+        """
+        self.write_rows(25, chunk_size=10, flush_interval=None)
+        csv_path = os.path.join(self.tmp.name, 'results.csv')
+        export_csv(self.directory, csv_path, *society_csv_columns())
+
+        with open(csv_path, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0][:5], ['Iteration', 'Total Resources', 'Farmer Reward', 'Builder Reward', 'Trader Reward'])
+        self.assertEqual(len(rows), 26)
+        self.assertEqual(rows[2][:5], ['2', '10', '-5', '0', '0'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from marl.monte_carlo import SocietyParams, parameter_grid, run_sweep, step, transition_tables
+from marl.society_engine import InMemorySociety, RevertError
+
+class TestMonteCarlo(unittest.TestCase):
+    """
+    Unit test class for the vectorized Monte Carlo engine of the random-policy baseline.
+    """
+
+    def reference_step(self, society, choices):
+        """
+        One iteration of the baseline on the in-memory contracts, with the choices encoded as in `step`.
+        """
+        pool = society.resource_pool.functions.getTotalResources()
+        reward = 0
+        for bit, threshold, role, efficient, selfish, amount in [
+            (1, None, society.farmer, 'farmEfficient', 'farmSelfish', 5),
+            (2, 5, society.builder, 'buildEfficient', 'buildSelfish', 5),
+            (4, 10, society.trader, 'tradeEfficient', 'tradeSelfish', 7),
+        ]:
+            if threshold is None:
+                after_farming = None
+            elif after_farming < threshold:
+                continue
+            is_selfish = bool(choices & bit)
+            try:
+                getattr(role.functions, selfish if is_selfish else efficient)().transact()
+                reward += -amount if is_selfish else amount
+            except RevertError:
+                reward -= 10
+            if after_farming is None:
+                after_farming = pool.call()
+        return reward
+
+    def test_step_matches_contracts(self):
+        """
+        Tests that the kernel applies the same transitions and rewards as the in-memory contracts,
+        for every combination of choices and resource levels around the thresholds.
+        """
+        levels = np.arange(0, 40)
+        for choices in range(8):
+            resources = levels.copy()
+            rewards = step(SocietyParams(), resources, np.full(len(levels), choices, dtype=np.int8))
+            for level, resource, reward in zip(levels, resources, rewards):
+                society = InMemorySociety(int(level))
+                self.assertEqual(reward, self.reference_step(society, choices), (choices, level))
+                self.assertEqual(resource, society.resource_pool.total_resources, (choices, level))
+
+    def test_transition_tables_match_step(self):
+        """
+        Tests that the lookup tables used by the kernel agree with `step` beyond their resource cap.
+        """
+        for params in parameter_grid(farm_loss=[10, 30], build_wasted=[10, 40], trade_threshold=[10, 50]):
+            cap, deltas, rewards = transition_tables(params)
+            levels = np.tile(np.arange(200), 8)
+            choices = np.repeat(np.arange(8), 200)
+            resources = levels.copy()
+            expected_rewards = step(params, resources, choices)
+            index = choices * (cap + 1) + np.minimum(levels, cap)
+            np.testing.assert_array_equal(deltas[index], resources - levels)
+            np.testing.assert_array_equal(rewards[index], expected_rewards)
+
+    def test_sweep_is_reproducible(self):
+        """
+        Tests that a sweep depends only on the seed, not on the number of processes.
+        """
+        grid = parameter_grid(initial_resources=[0, 100], trade_gain=[7, 20])
+        serial = run_sweep(grid, n_trajectories=5000, horizon=20, seed=1, processes=1, chunk_size=1000)
+        pooled = run_sweep(grid, n_trajectories=5000, horizon=20, seed=1, processes=2, chunk_size=1000)
+        for a, b in zip(serial, pooled):
+            self.assertEqual(a['params'], b['params'])
+            self.assertEqual(a['trajectories'], 5000)
+            self.assertEqual(a['mean_survival_time'], b['mean_survival_time'])
+            np.testing.assert_array_equal(a['resource_quantiles'], b['resource_quantiles'])
+
+        # Starting from an empty pool collapses more often; a larger trade gain cannot lower the median
+        self.assertLess(serial[0]['survival_rate'], serial[2]['survival_rate'])
+        self.assertGreaterEqual(serial[3]['final_resource_quantiles'][2], serial[2]['final_resource_quantiles'][2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+from marl import node_pool
+from marl.backends import default_node_url
+from marl.node_pool import HardhatNode, HardhatNodePool, default_base_port
+
+
+class StubNode:
+    """
+    Stand-in for HardhatNode that records its lifecycle instead of running `npx hardhat node`.
+    """
+    fail_port = None
+
+    def __init__(self, port):
+        self.port = port
+        self.url = f'http://127.0.0.1:{port}'
+        self.running = False
+        self.society_addresses = None
+
+    def launch(self):
+        self.running = True
+
+    def wait_ready(self, timeout=60):
+        if self.port == self.fail_port:
+            raise RuntimeError(f"Hardhat node on port {self.port} did not start within {timeout} seconds")
+
+    def deploy_society(self):
+        self.society_addresses = {'resource_pool': self.url}
+
+    def start(self, timeout=60):
+        self.launch()
+        self.wait_ready(timeout)
+
+    def stop(self):
+        self.running = False
+
+    def is_healthy(self):
+        return self.running
+
+
+class TestHardhatNodePool(unittest.TestCase):
+    """
+    Unit test class for the pool of Hardhat nodes, with stubbed node processes.
+    """
+
+    def setUp(self):
+        for name, value in (('HardhatNode', StubNode), ('ensure_compiled', lambda: None)):
+            patcher = mock.patch.object(node_pool, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        StubNode.fail_port = None
+
+    def test_port_layout(self):
+        """
+        Tests that node i listens on `base_port + i`.
+        """
+        pool = HardhatNodePool(3, base_port=9000)
+        self.assertEqual([node.port for node in pool.nodes], [9000, 9001, 9002])
+        self.assertEqual(pool.nodes[2].url, 'http://127.0.0.1:9002')
+        # The real node derives its URL from the port, without starting a process
+        node = HardhatNode(8547)
+        self.assertEqual((node.url, node.process, node.is_healthy()), ('http://127.0.0.1:8547', None, False))
+        # By default the pool keeps clear of the main node
+        self.assertNotIn(default_node_url, [node.url for node in HardhatNodePool(3).nodes])
+
+    def test_health_check_and_restart(self):
+        """
+        Tests that the health check reports dead nodes and that only those are restarted.
+        """
+        with HardhatNodePool(3) as pool:
+            self.assertEqual(pool.health_check(), [True, True, True])
+            self.assertTrue(all(node.society_addresses for node in pool.nodes))
+            pool.nodes[1].stop()
+            self.assertEqual(pool.health_check(), [True, False, True])
+            self.assertEqual(pool.restart_unhealthy(), [1])
+            self.assertEqual(pool.health_check(), [True, True, True])
+        self.assertEqual(pool.health_check(), [False, False, False])
+
+    def test_failed_start_stops_every_node(self):
+        """
+        Tests that a node failing to come up stops the nodes already launched before the error is raised.
+        """
+        StubNode.fail_port = default_base_port + 1
+        pool = HardhatNodePool(3)
+        with self.assertRaises(RuntimeError):
+            with pool:
+                pass
+        self.assertEqual(pool.health_check(), [False, False, False])
+
+
+class TestHardhatNode(unittest.TestCase):
+    """
+    Unit test class for stopping a node process, with a shell standing in for `npx`.
+    """
+
+    @unittest.skipUnless(hasattr(os, 'killpg'), "process groups are POSIX only")
+    def test_stop_kills_the_process_group(self):
+        """
+        Tests that stopping a node also stops the child processes of the launched process, as
+        `npx` leaves Hardhat running when only it is signalled.
+        """
+        node = HardhatNode(default_base_port)
+        with mock.patch.object(node_pool.subprocess, 'Popen') as popen:
+            node.launch()
+        self.assertTrue(popen.call_args.kwargs['start_new_session'])
+
+        # A shell with a child ignoring SIGTERM, which outlives it
+        node.process = subprocess.Popen(['sh', '-c', "(trap '' TERM; exec sleep 60) & echo $!; wait"],
+                                        stdout=subprocess.PIPE, start_new_session=True)
+        child = int(node.process.stdout.readline())
+        node.process.stdout.close()
+        node.stop()
+        self.assertIsNone(node.process)
+        self.assertFalse(_running(child))
+
+
+def _running(pid):
+    # Killed children of an exited shell may linger as zombies until reaped
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+if __name__ == '__main__':
+    unittest.main()
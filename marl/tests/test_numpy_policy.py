@@ -0,0 +1,79 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+from stable_baselines3 import DQN
+from marl.numpy_policy import NumpyPolicy, export_policy, load_policy
+
+model_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "decentralized_society_model")
+
+class TestNumpyPolicy(unittest.TestCase):
+    """
+    Unit test class for the torch-free NumpyPolicy, checked against the stable_baselines3 model it was exported from.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.model = DQN.load(model_path)
+        cls.policy = NumpyPolicy.load(export_policy(model_path + '.zip', os.path.join(cls.tmp.name, 'policy.npz')))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_matches_dqn(self):
+        """
+        Tests that the Q-values and greedy actions match the DQN model, for single observations and batches.
+        """
+        rng = np.random.default_rng(0)
+        observations = np.column_stack([rng.uniform(0, 1000, 500), rng.integers(0, 2, 500)]).astype(np.float32)
+
+        q_values = self.model.q_net(self.model.q_net.obs_to_tensor(observations)[0]).detach().numpy()
+        np.testing.assert_allclose(self.policy.q_values(observations), q_values, rtol=1e-5, atol=1e-4)
+
+        actions, _ = self.policy.predict(observations, deterministic=True)
+        expected, _ = self.model.predict(observations, deterministic=True)
+        np.testing.assert_array_equal(actions, expected)
+
+        action, _ = self.policy.predict(observations[0], deterministic=True)
+        self.assertEqual(action, self.model.predict(observations[0], deterministic=True)[0])
+
+    def test_exploration(self):
+        """
+        Tests that non-deterministic predictions explore at the exported exploration rate.
+        """
+        self.assertAlmostEqual(self.policy.exploration_rate, self.model.exploration_rate)
+        observations = np.tile(np.array([100, 1], dtype=np.float32), (20000, 1))
+        greedy, _ = self.policy.predict(observations, deterministic=True)
+        actions, _ = self.policy.predict(observations, deterministic=False)
+        # A random action matches the greedy one 1/8 of the time
+        changed = np.mean(actions != greedy)
+        self.assertAlmostEqual(changed, self.policy.exploration_rate * 7 / 8, delta=0.01)
+
+    def test_load_policy_checks_the_export(self):
+        """
+        Tests that the committed export loads without torch, and that a missing export or one
+        that does not match its model is refused instead of being regenerated.
+        """
+        script = (f"import sys; from marl.numpy_policy import load_policy; load_policy({model_path!r}); "
+                  "sys.exit('torch' in sys.modules)")
+        project_root = os.path.dirname(os.path.dirname(model_path))
+        self.assertEqual(subprocess.run([sys.executable, '-c', script], cwd=project_root).returncode, 0)
+
+        path = os.path.join(self.tmp.name, 'model')
+        shutil.copy(model_path + '.zip', path + '.zip')
+        with self.assertRaises(FileNotFoundError):
+            load_policy(path)
+        shutil.copy(model_path + '.npz', path + '.npz')
+        self.assertEqual(load_policy(path).n_actions, 8)
+        with open(path + '.zip', 'ab') as f:
+            f.write(b'retrained')
+        with self.assertRaisesRegex(ValueError, 'python -m marl.numpy_policy'):
+            load_policy(path)
+
+if __name__ == '__main__':
+    unittest.main()
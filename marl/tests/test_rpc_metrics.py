@@ -0,0 +1,93 @@
+import unittest
+from eth_account import Account
+from web3 import Web3, EthereumTesterProvider
+from marl.rpc_metrics import Histogram, RpcMetrics, instrument
+
+VOTE_ABI = [{'type': 'function', 'name': 'vote', 'stateMutability': 'nonpayable', 'outputs': [], 'inputs': [
+    {'name': '_proposalId', 'type': 'uint256'},
+    {'name': '_voteFor', 'type': 'bool'},
+]}]
+
+
+class TestRpcMetrics(unittest.TestCase):
+    """
+    Unit test class for the RPC latency and gas metrics.
+    """
+
+    def test_functions_and_gas_are_recorded(self):
+        """
+        Tests that calls and transactions, sent by the node or signed locally, are attributed to
+        their contract function, and that their gas is taken from the receipts the caller fetches.
+        """
+        w3 = Web3(EthereumTesterProvider())
+        metrics = instrument(w3)
+        metrics.register_abi(VOTE_ABI, 'DAO')
+        # Calldata sent to an account executes no code, which is enough to exercise the selectors
+        dao = w3.eth.contract(address=w3.eth.accounts[1], abi=VOTE_ABI)
+        for i in range(3):
+            tx_hash = dao.functions.vote(i, True).transact({'from': w3.eth.accounts[0], 'gas': 100000})
+            w3.eth.wait_for_transaction_receipt(tx_hash)
+        dao.functions.vote(0, False).call()
+
+        account = Account.create()
+        w3.eth.wait_for_transaction_receipt(w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': account.address, 'value': 10 ** 18}))
+        transaction = {'to': dao.address, 'data': dao.functions.vote(5, False)._encode_transaction_data(), 'gas': 100000,
+                       'gasPrice': 2 * w3.eth.gas_price, 'nonce': 0, 'chainId': w3.eth.chain_id, 'value': 0}
+        raw = Account.sign_transaction(transaction, account.key).raw_transaction
+        w3.eth.wait_for_transaction_receipt(w3.eth.send_raw_transaction(raw))
+
+        data = metrics.to_dict()
+        self.assertEqual(data['functions']['DAO.vote']['eth_sendTransaction']['count'], 3)
+        self.assertEqual(data['functions']['DAO.vote']['eth_sendRawTransaction']['count'], 1)
+        self.assertEqual(data['functions']['DAO.vote']['eth_call']['count'], 1)
+        self.assertEqual(data['rpc']['eth_sendTransaction']['count'], 4)
+        self.assertEqual(data['gas']['DAO.vote']['count'], 4)
+        self.assertGreater(data['gas']['DAO.vote']['min'], 21000)
+        self.assertEqual(list(data['gas']), ['DAO.vote'])
+        self.assertIn('DAO.vote', metrics.summary())
+
+    def test_batches_and_prometheus_export(self):
+        """
+        Tests that batched requests are counted per method and attributed to their function, and
+        that the Prometheus export has cumulative buckets ending with the total count.
+        """
+        metrics = RpcMetrics()
+        metrics.register_abi(VOTE_ABI, 'DAO')
+        data = Web3().eth.contract(abi=VOTE_ABI).encode_abi('vote', [1, True])
+        to = '0x' + '11' * 20
+        metrics.record_batch(
+            [('eth_sendTransaction', [{'to': to, 'data': data}]), ('eth_sendTransaction', [{'to': to, 'data': data}])],
+            [{'result': '0xaa'}, {'error': {'message': 'nonce too low'}}], 0.002)
+        metrics.record_batch([('eth_getTransactionReceipt', ['0xAA'])],
+                             [{'result': {'transactionHash': '0xaa', 'gasUsed': '0x7530', 'status': '0x0'}}], 0.001)
+        metrics.record('eth_blockNumber', [], {'result': '0x1'}, 0.0005)
+
+        self.assertEqual(dict(metrics.batched), {'eth_sendTransaction': 2, 'eth_getTransactionReceipt': 1})
+        self.assertEqual(dict(metrics.errors), {'eth_sendTransaction': 1})
+        self.assertEqual(metrics.gas['DAO.vote'].to_dict()['total'], 30000)
+        self.assertEqual(metrics.gas['DAO.vote'].reverted, 1)
+
+        text = metrics.to_prometheus()
+        self.assertIn('marl_rpc_request_duration_seconds_bucket{method="eth_blockNumber",le="+Inf"} 1', text)
+        self.assertIn('marl_rpc_batch_duration_seconds_count 2', text)
+        self.assertIn('marl_transactions_total{function="DAO.vote",status="reverted"} 1', text)
+        self.assertIn('marl_gas_used_total{function="DAO.vote"} 30000', text)
+
+    def test_histogram_quantiles(self):
+        """
+        Tests that the quantiles estimated from the buckets are within a bucket width of the exact ones.
+        """
+        histogram = Histogram()
+        values = [0.001 * (1 + i % 100) for i in range(1000)]
+        for value in values:
+            histogram.observe(value)
+        self.assertEqual(histogram.count, 1000)
+        for q in (0.5, 0.95, 0.99):
+            exact = sorted(values)[int(q * len(values)) - 1]
+            self.assertAlmostEqual(histogram.quantile(q) / exact, 1, delta=0.2)
+        single = Histogram()
+        single.observe(0.0123)
+        self.assertAlmostEqual(single.quantile(0.99), 0.0123)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from marl.artifacts import is_compiled, project_root
+from marl.metrics_sink import load_metrics
+
+
+@unittest.skipUnless(is_compiled(), "contracts not compiled (run `npx hardhat compile`)")
+class TestSimulationsOnEthTester(unittest.TestCase):
+    """
+    Smoke tests running every simulation end to end with `--backend eth-tester`, each in its own
+    process as from the command line, for a few iterations.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def run_module(self, module, *args):
+        """
+        Runs `python -m <module> --backend eth-tester <args>` from a temporary directory, so the
+        outputs written to the working directory are thrown away, and returns its stdout.
+        """
+        env = dict(os.environ, PYTHONPATH=project_root, MPLBACKEND='Agg')
+        result = subprocess.run([sys.executable, '-m', module, '--backend', 'eth-tester', *args], cwd=self.tmp.name,
+                                env=env, capture_output=True, text=True, timeout=600)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout
+
+    def test_society_with_agents(self):
+        """
+        Tests that the agent simulation runs per action and with tick mining, and records every iteration.
+        """
+        for args in ((), ('--tick-mining',)):
+            metrics = os.path.join(self.tmp.name, 'metrics' + ''.join(args))
+            self.run_module('marl.decentralized_society_with_agents', '--iterations', '3', '--metrics-dir', metrics, *args)
+            self.assertEqual(len(load_metrics(metrics, ['total_resources'])['total_resources']), 3)
+
+    def test_society_without_agents(self):
+        """
+        Tests that the random-decision baseline runs and records every iteration.
+        """
+        metrics = os.path.join(self.tmp.name, 'metrics')
+        self.run_module('marl.decentralized_society_without_agents', '--iterations', '3', '--metrics-dir', metrics)
+        self.assertEqual(len(load_metrics(metrics, ['total_resources'])['total_resources']), 3)
+
+    def test_auction(self):
+        """
+        Tests that an auction round runs to its end and announces the winner.
+        """
+        stdout = self.run_module('marl.auction_simulation', '--iterations', '1', '--bids', '3')
+        self.assertIn("The winner of round 1 is", stdout)
+
+    def test_dao(self):
+        """
+        Tests that a proposal is created, voted on and executed with the committed policy.
+        """
+        stdout = self.run_module('marl.dao_simulation', '--iterations', '1', '--voters', '3')
+        self.assertIn("Executed 1 proposal(s)", stdout)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from marl.society_engine import InMemorySociety, RevertError
+from marl.society_env import make_in_memory_env
+
+class TestSocietyEngine(unittest.TestCase):
+    """
+    Unit test class for the in-memory ResourcePool/Farmer/Builder/Trader engine.
+    Checks that every contract function applies the same amounts and reverts as the Solidity code.
+    """
+
+    def setUp(self):
+        """
+        Deploys a fresh in-memory society with an empty resource pool before each test case.
+        """
+        self.society = InMemorySociety()
+
+    def total(self):
+        return self.society.resource_pool.functions.getTotalResources().call()
+
+    def test_efficient_actions(self):
+        """
+        Tests that efficient farming and trading add 10 and 7 resources and efficient building uses 5.
+        """
+        self.society.farmer.functions.farmEfficient().transact()
+        self.assertEqual(self.total(), 10)
+        self.society.trader.functions.tradeEfficient().transact()
+        self.assertEqual(self.total(), 17)
+        self.society.builder.functions.buildEfficient().transact()
+        self.assertEqual(self.total(), 12)
+
+    def test_selfish_actions(self):
+        """
+        Tests that selfish farming, building and trading remove 10, 15 and 7 resources.
+        """
+        self.society.resource_pool.functions.addResources(40).transact()
+        self.society.farmer.functions.farmSelfish().transact()
+        self.assertEqual(self.total(), 30)
+        self.society.builder.functions.buildSelfish().transact()
+        self.assertEqual(self.total(), 15)
+        self.society.trader.functions.tradeSelfish().transact()
+        self.assertEqual(self.total(), 8)
+
+    def test_reverts_leave_state_untouched(self):
+        """
+        Tests that every `require` reverts with the contract's reason and leaves the pool unchanged.
+        """
+        self.society.resource_pool.functions.addResources(14).transact()
+        with self.assertRaises(RevertError) as ctx:
+            self.society.builder.functions.buildSelfish().transact()
+        self.assertIn("Not enough resources", str(ctx.exception))
+        self.assertEqual(self.total(), 14)
+
+        self.society.resource_pool.functions.useResources(10).transact()
+        with self.assertRaises(RevertError):
+            self.society.farmer.functions.farmSelfish().transact()
+        with self.assertRaises(RevertError):
+            self.society.trader.functions.tradeSelfish().transact()
+        with self.assertRaises(RevertError):
+            self.society.builder.functions.buildEfficient().transact()
+        self.assertEqual(self.total(), 4)
+
+    def test_call_does_not_persist(self):
+        """
+        Tests that `call()` on a state-changing function simulates it without changing the pool.
+        """
+        self.society.farmer.functions.farmEfficient().call()
+        self.assertEqual(self.total(), 0)
+
+    def test_env_step_and_reset(self):
+        """
+        Tests that the environment steps on the in-memory engine and that reset restores the pool.
+        """
+        env = make_in_memory_env(initial_resources=100)
+        obs = env.reset()
+        self.assertEqual(obs[0], 100)
+
+        # Action 0: farm, build and trade efficiently (+10 - 5 + 7)
+        obs, reward, done, _ = env.step(0)
+        self.assertEqual(obs[0], 112)
+        self.assertEqual(reward, 15)
+        self.assertFalse(done)
+
+        obs = env.reset()
+        self.assertEqual(obs[0], 100)
+        self.assertEqual(env.resource_pool.total_resources, 100)
+
+    def test_env_penalizes_reverts(self):
+        """
+        Tests that reverted actions are penalized with -10 each.
+        """
+        env = make_in_memory_env(initial_resources=0)
+        env.reset()
+
+        # Action 7: every agent acts selfishly; all three revert on an empty pool
+        obs, reward, done, _ = env.step(7)
+        self.assertEqual(obs[0], 0)
+        self.assertEqual(reward, -30)
+        self.assertTrue(done)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from marl.backends import InProcessNode
+from marl.deployer import SocietyContracts
+from marl.society_env import make_chain_env
+
+# Stand-in for the society contracts: a pool whose total is slot 0. A call with one argument
+# (`addResources(n)`) adds it, `getTotalResources()` returns the total and any other call (an
+# agent's action) takes one resource:
+# CALLDATASIZE PUSH1 0x24 EQ PUSH1 0x20 JUMPI
+# PUSH1 0 CALLDATALOAD PUSH1 0xe0 SHR PUSH4 getTotalResources EQ PUSH1 0x2c JUMPI
+# PUSH1 1 PUSH1 0 SLOAD SUB PUSH1 0 SSTORE STOP
+# JUMPDEST PUSH1 4 CALLDATALOAD PUSH1 0 SLOAD ADD PUSH1 0 SSTORE STOP
+# JUMPDEST PUSH1 0 SLOAD PUSH1 0 MSTORE PUSH1 0x20 PUSH1 0 RETURN
+RUNTIME = ('3660241460205760003560e01c63c3f8a19414602c57600160005403600055005b'
+           '60043560005401600055005b60005460005260206000f3')
+INIT = '6038' '80' '600b' '6000' '39' '6000' 'f3'  # Copies the runtime code and returns it
+
+
+def function_abi(name, inputs=(), outputs=()):
+    return {'type': 'function', 'name': name, 'stateMutability': 'view' if outputs else 'nonpayable',
+            'inputs': [{'name': '', 'type': t} for t in inputs], 'outputs': [{'name': '', 'type': t} for t in outputs]}
+
+
+POOL_ABI = [function_abi('getTotalResources', outputs=['uint256']), function_abi('addResources', ['uint256']),
+            function_abi('reduceResources', ['uint256'])]
+
+
+def role_abi(verb):
+    return [function_abi(f'{verb}Efficient'), function_abi(f'{verb}Selfish')]
+
+
+class TestChainEnv(unittest.TestCase):
+    """
+    Unit test class for the snapshot reset of the chain-backed society environment, run on an
+    in-process chain.
+    """
+
+    def setUp(self):
+        self.w3 = InProcessNode().web3()
+        tx_hash = self.w3.eth.send_transaction({'from': self.w3.eth.accounts[0], 'data': '0x' + INIT + RUNTIME})
+        address = self.w3.eth.wait_for_transaction_receipt(tx_hash)['contractAddress']
+        self.contracts = SocietyContracts(
+            resource_pool=self.w3.eth.contract(address=address, abi=POOL_ABI),
+            farmer=self.w3.eth.contract(address=address, abi=role_abi('farm')),
+            builder=self.w3.eth.contract(address=address, abi=role_abi('build')),
+            trader=self.w3.eth.contract(address=address, abi=role_abi('trade')),
+        )
+        self.env = make_chain_env(self.w3, self.contracts, initial_resources=100, verbose=False)
+
+    def resources(self):
+        return self.contracts.resource_pool.functions.getTotalResources().call()
+
+    def test_reset_restores_resources(self):
+        """
+        Tests that the pool is seeded, that steps change it on chain and that a reset reverts it.
+        """
+        self.assertEqual(self.resources(), 100)
+        observation, reward, done, info = self.env.step(0)
+        self.assertEqual(observation.tolist(), [97, 1])
+        self.assertEqual(self.resources(), 97)
+        self.assertEqual(self.env.reset().tolist(), [100, 1])
+        self.assertEqual(self.resources(), 100)
+
+    def test_snapshot_survives_repeated_resets(self):
+        """
+        Tests that every reset takes a fresh snapshot, so later episodes start from the same state.
+        """
+        for episode in range(3):
+            for _ in range(episode + 1):
+                self.env.step(7)
+            self.assertEqual(self.resources(), 100 - 3 * (episode + 1))
+            self.assertEqual(self.env.reset().tolist(), [100, 1])
+            self.assertEqual(self.resources(), 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from marl import decentralized_society_with_agents as sim
+from marl.rpc_metrics import RpcMetrics
+from marl.society_engine import InMemorySociety
+from marl.society_env import DecentralizedSocietyEnv
+
+
+class RecordingDecisionStage:
+    """
+    Decision stage recording the observations it decides on: selfish above `selfish_above`
+    resources, else efficient.
+    """
+    def __init__(self, selfish_above=100):
+        self.selfish_above = selfish_above
+        self.observations = []
+
+    def decide_shared(self, observation, n_agents):
+        self.observations.append(observation.tolist())
+        return [int(observation[0] > self.selfish_above)] * n_agents
+
+
+class InMemoryEth:
+    @staticmethod
+    def wait_for_transaction_receipt(tx_hash):
+        return {'status': 1}
+
+
+class InMemoryWeb3:
+    eth = InMemoryEth()
+
+
+class ListSink:
+    def __init__(self):
+        self.rows = []
+
+    def append(self, **row):
+        self.rows.append(row)
+
+
+class TestSocietySimulation(unittest.TestCase):
+    """
+    Unit test class for the agent simulation loop, run on the in-memory contracts.
+    """
+
+    def setUp(self):
+        self.society = society = InMemorySociety(initial_resources=100)
+        self.stage = RecordingDecisionStage()
+        env = DecentralizedSocietyEnv(society.resource_pool, society.farmer, society.builder, society.trader,
+                                      society.accounts, verbose=False)
+        agents = [sim.Agent(account, function_efficient, function_selfish, None) for account, function_efficient, function_selfish in (
+            (society.accounts[0], society.farmer.functions.farmEfficient, society.farmer.functions.farmSelfish),
+            (society.accounts[1], society.builder.functions.buildEfficient, society.builder.functions.buildSelfish),
+            (society.accounts[2], society.trader.functions.tradeEfficient, society.trader.functions.tradeSelfish),
+        )]
+        patchers = [
+            mock.patch.multiple(sim, w3=InMemoryWeb3(), resource_pool=society.resource_pool, env=env,
+                                rpc_metrics=RpcMetrics(), decision_stage=self.stage, iterations=3, agents=agents,
+                                farmer_agent=agents[0], builder_agent=agents[1], trader_agent=agents[2]),
+            mock.patch.dict(sim.efficient_actions),
+            mock.patch.dict(sim.selfish_actions),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_decisions_follow_the_pool(self):
+        """
+        Tests that every tick decides on the resources left by the previous one, after all three
+        agents acted, rather than on a fixed observation.
+        """
+        sink = ListSink()
+        with redirect_stdout(io.StringIO()):
+            sim.simulate_per_action(sink)
+        # Efficient actions: farmer +10, builder -5, trader +7; then selfish ones cost 10 + 15 + 7
+        self.assertEqual(self.stage.observations, [[100, 1], [112, 1], [80, 1]])
+        self.assertEqual([row['farmer_action'] for row in sink.rows], [0, 1, 0])
+        self.assertEqual(sim.env.get_observation().tolist(), [80, 1])
+
+    def test_failed_actions_are_observed(self):
+        """
+        Tests that a tick whose action reverted is observed as unsuccessful by the next one.
+        """
+        self.society.resource_pool.total_resources = 3
+        self.stage.selfish_above = 0
+        with redirect_stdout(io.StringIO()):
+            sim.simulate_per_action(ListSink())
+        # The farmer cannot afford the selfish action, and the others do not act below 5 resources
+        self.assertEqual(self.stage.observations, [[3, 1], [3, 0], [3, 0]])
+
+if __name__ == '__main__':
+    unittest.main()
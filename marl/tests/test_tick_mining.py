@@ -0,0 +1,65 @@
+import unittest
+from marl.backends import InProcessNode
+from marl.hardhat_rpc import HardhatChain
+from marl.tick_mining import TickMiner, succeeded
+
+# Contract counting its calls in slot 0 and returning the count to calls without data:
+# CALLDATASIZE ISZERO PUSH1 0x0f JUMPI PUSH1 1 PUSH1 0 SLOAD ADD PUSH1 0 SSTORE STOP
+# JUMPDEST PUSH1 0 SLOAD PUSH1 0 MSTORE PUSH1 0x20 PUSH1 0 RETURN
+RUNTIME = '3615600f57600160005401600055005b60005460005260206000f3'
+INIT = '601b' '80' '600b' '6000' '39' '6000' 'f3'  # Copies the runtime code and returns it
+ABI = [{'type': 'function', 'name': 'act', 'stateMutability': 'nonpayable', 'inputs': [], 'outputs': []}]
+
+
+class TestTickMiner(unittest.TestCase):
+    """
+    Unit test class for mining a simulation tick as one block, run on an in-process chain.
+    """
+
+    def setUp(self):
+        self.w3 = InProcessNode().web3()
+        self.chain = HardhatChain(self.w3)
+        self.accounts = self.w3.eth.accounts
+        tx_hash = self.w3.eth.send_transaction({'from': self.accounts[0], 'data': '0x' + INIT + RUNTIME})
+        self.contract = self.w3.eth.contract(address=self.w3.eth.wait_for_transaction_receipt(tx_hash)['contractAddress'], abi=ABI)
+
+    def calls(self):
+        return int.from_bytes(self.w3.eth.call({'to': self.contract.address}), 'big')
+
+    def test_tick_is_one_block_in_order(self):
+        """
+        Tests that the transactions of a tick, sent one by one and in a batch, are mined in a
+        single block in submission order, and that automine is back on afterwards.
+        """
+        block = self.w3.eth.block_number
+        agents = self.accounts[1:4]
+        with TickMiner(self.w3, self.chain, gas=50000) as miner:
+            indices = [miner.submit(self.contract.functions.act(), agent) for agent in agents]
+            indices += miner.submit_many([
+                {'from': agent, 'to': self.contract.address, 'data': '0x00', 'nonce': 1} for agent in agents
+            ])
+            self.assertEqual(self.w3.eth.block_number, block)
+            outcomes = miner.mine()
+        self.assertEqual(indices, list(range(6)))
+        self.assertTrue(all(succeeded(outcome) for outcome in outcomes))
+        self.assertEqual({outcome['blockNumber'] for outcome in outcomes}, {block + 1})
+        self.assertEqual([outcome['transactionIndex'] for outcome in outcomes], list(range(6)))
+        self.assertEqual([outcome['from'] for outcome in outcomes], agents * 2)
+        self.assertEqual(self.calls(), 6)
+
+        self.contract.functions.act().transact({'from': agents[0], 'gas': 50000})
+        self.assertEqual(self.w3.eth.block_number, block + 2)
+
+    def test_stop_mines_leftovers(self):
+        """
+        Tests that transactions submitted after the last `mine` are mined when the miner stops.
+        """
+        block = self.w3.eth.block_number
+        with TickMiner(self.w3, self.chain, gas=50000) as miner:
+            miner.submit(self.contract.functions.act(), self.accounts[1])
+            miner.submit(self.contract.functions.act(), self.accounts[2])
+        self.assertEqual(self.w3.eth.block_number, block + 1)
+        self.assertEqual(self.calls(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
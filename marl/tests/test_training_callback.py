@@ -0,0 +1,57 @@
+import os
+import csv
+import tempfile
+import unittest
+import numpy as np
+from stable_baselines3 import DQN
+from marl.society_env import make_in_memory_env
+from marl.training_callback import CustomTrainingCallback
+
+class TestCustomTrainingCallback(unittest.TestCase):
+    """
+    Unit test class for the ring-buffer CustomTrainingCallback, run on a short DQN training on the
+    in-memory society.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.metrics_dir = os.path.join(cls.tmp.name, 'training')
+        model = DQN("MlpPolicy", make_in_memory_env(), learning_starts=100)
+        cls.callback = CustomTrainingCallback(window=50, capacity=10, metrics_dir=cls.metrics_dir)
+        model.learn(total_timesteps=1000, callback=cls.callback)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_ring_keeps_last_windows(self):
+        """
+        Tests that the ring buffers hold the last `capacity` windows, oldest first.
+        """
+        metrics = self.callback.metrics()
+        np.testing.assert_array_equal(metrics['timesteps'], np.arange(550, 1001, 50))
+        self.assertTrue((metrics['reward_min'] <= metrics['reward_mean']).all())
+        self.assertTrue((metrics['reward_mean'] <= metrics['reward_max']).all())
+
+    def test_captures_training_loss(self):
+        """
+        Tests that the loss logged by DQN's training steps is recorded.
+        """
+        losses = self.callback.losses
+        self.assertFalse(np.isnan(losses).any())
+        self.assertTrue((losses >= 0).all())
+
+    def test_csv_covers_full_history(self):
+        """
+        Tests that the CSV export comes from the streamed history, not just the ring buffers.
+        """
+        csv_path = os.path.join(self.tmp.name, 'training_metrics.csv')
+        self.callback.save_metrics_to_csv(csv_path)
+        with open(csv_path, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0][:4], ['Timesteps', 'Cumulative Reward', 'Loss', 'Exploration Rate'])
+        self.assertEqual([int(row[0]) for row in rows[1:]], list(range(50, 1001, 50)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+from marl.auction_env import AuctionEnv, AGENT
+from marl.vec_auction_env import VecAuctionEnv
+
+class TestVecAuctionEnv(unittest.TestCase):
+    """
+    Unit test class for the batched VecAuctionEnv.
+    Compares it step by step against AuctionEnv, and checks the rival bidders against the auction rules.
+    """
+
+    def test_matches_single_env(self):
+        """
+        Tests that every auction in the batch follows the same bids, funds, rewards and endings as an
+        independent AuctionEnv given the same actions.
+        """
+        num_envs = 8
+        rng = np.random.default_rng(0)
+        vec_env = VecAuctionEnv(num_envs, item_worth=40)
+        envs = [AuctionEnv(item_worth=40) for _ in range(num_envs)]
+
+        obs = vec_env.reset()
+        for i, env in enumerate(envs):
+            single_obs = env.reset()
+            for key in single_obs:
+                np.testing.assert_array_equal(obs[key][i], single_obs[key])
+
+        for _ in range(35):
+            actions = rng.integers(0, 4, size=num_envs)
+            obs, rewards, dones, infos = vec_env.step(actions)
+            for i, env in enumerate(envs):
+                single_obs, single_reward, single_done, single_info = env.step(int(actions[i]))
+                self.assertEqual(rewards[i], single_reward)
+                self.assertEqual(dones[i], single_done)
+                if single_done:
+                    self.assertEqual(infos[i]['winner'], single_info['winner'])
+                    self.assertEqual(infos[i]['winning_bid'], single_info['winning_bid'])
+                    single_obs = env.reset()
+                for key in single_obs:
+                    np.testing.assert_array_equal(obs[key][i], single_obs[key])
+
+    def test_rivals_follow_auction_rules(self):
+        """
+        Tests that rivals only ever raise the highest bid and that the agent's funds plus its
+        current highest bid always add up to its initial funds, as outbid amounts are returned.
+        """
+        vec_env = VecAuctionEnv(256, n_rivals=5, rival_bid_probability=0.8, seed=1)
+        vec_env.reset()
+        rng = np.random.default_rng(1)
+        for _ in range(9):
+            previous = vec_env.highest_bid.copy()
+            vec_env.step(rng.integers(0, 4, size=vec_env.num_envs))
+            self.assertTrue((vec_env.highest_bid >= previous).all())
+            locked = np.where(vec_env.highest_bidder == AGENT, vec_env.highest_bid, 0)
+            np.testing.assert_allclose(vec_env.personal_funds + locked, 100)
+        self.assertTrue((vec_env.highest_bidder > AGENT).any())
+
+    def test_set_attr_applies_to_all_envs(self):
+        """
+        Tests that attributes are set for every environment, and that a subset is refused.
+        """
+        vec_env = VecAuctionEnv(3)
+        vec_env.set_attr('bid_cost', 4)
+        vec_env.set_attr('bid_cost', 5, indices=[2, 0, 1])
+        self.assertEqual(vec_env.get_attr('bid_cost'), [5, 5, 5])
+        for indices in (1, [0, 2]):
+            with self.assertRaises(ValueError):
+                vec_env.set_attr('bid_cost', 6, indices=indices)
+        self.assertEqual(vec_env.bid_cost, 5)
+
+    def test_env_method_runs_on_all_envs(self):
+        """
+        Tests that methods are called for every environment, and that a subset is refused rather
+        than running the method on the whole batch.
+        """
+        vec_env = VecAuctionEnv(3)
+        vec_env.reset()
+        vec_env.step(np.ones(3, dtype=np.int64))
+        stepped = vec_env.time_remaining.copy()
+        with self.assertRaises(ValueError):
+            vec_env.env_method('reset', indices=[0])
+        np.testing.assert_array_equal(vec_env.time_remaining, stepped)
+        observations = vec_env.env_method('reset')
+        self.assertEqual(len(observations), 3)
+        self.assertFalse(np.array_equal(vec_env.time_remaining, stepped))
+
+if __name__ == '__main__':
+    unittest.main()
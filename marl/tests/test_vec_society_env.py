@@ -0,0 +1,98 @@
+import unittest
+import numpy as np
+from marl.society_env import make_in_memory_env
+from marl.vec_society_env import VecDecentralizedSocietyEnv
+
+class TestVecDecentralizedSocietyEnv(unittest.TestCase):
+    """
+    Unit test class for the batched VecDecentralizedSocietyEnv.
+    Compares it step by step against DecentralizedSocietyEnv running on the in-memory engine.
+    """
+
+    def test_matches_single_env(self):
+        """
+        Tests that every society in the batch follows exactly the same trajectory, rewards and
+        termination as an independent DecentralizedSocietyEnv given the same actions.
+        """
+        num_envs = 16
+        rng = np.random.default_rng(0)
+        vec_env = VecDecentralizedSocietyEnv(num_envs, initial_resources=30)
+        envs = [make_in_memory_env(initial_resources=30) for _ in range(num_envs)]
+
+        obs = vec_env.reset()
+        expected = np.array([env.reset() for env in envs])
+        np.testing.assert_array_equal(obs, expected)
+
+        for _ in range(200):
+            actions = rng.integers(0, 8, size=num_envs)
+            obs, rewards, dones, infos = vec_env.step(actions)
+            for i, env in enumerate(envs):
+                single_obs, single_reward, single_done, _ = env.step(int(actions[i]))
+                self.assertEqual(rewards[i], single_reward)
+                self.assertEqual(dones[i], single_done)
+                if single_done:
+                    np.testing.assert_array_equal(infos[i]['terminal_observation'], single_obs)
+                    single_obs = env.reset()
+                np.testing.assert_array_equal(obs[i], single_obs)
+
+    def test_auto_reset(self):
+        """
+        Tests that a society that collapses is reset to the initial resources in the same step.
+        """
+        vec_env = VecDecentralizedSocietyEnv(2, initial_resources=10)
+        vec_env.reset()
+
+        # Action 0 grows the pool (+10 - 5 + 7); action 7 farms selfishly (-10) and the rest reverts
+        obs, rewards, dones, infos = vec_env.step(np.array([0, 7]))
+        self.assertFalse(dones[0])
+        self.assertEqual(obs[0, 0], 22)
+        self.assertTrue(dones[1])
+        self.assertEqual(rewards[1], -25)
+        self.assertEqual(infos[1]['terminal_observation'][0], 0)
+        self.assertEqual(infos[1]['terminal_observation'][1], 0)
+        self.assertEqual(obs[1, 0], 10)
+        self.assertEqual(obs[1, 1], 1)
+
+    def test_time_limit(self):
+        """
+        Tests that societies are truncated and flagged after `max_episode_steps`.
+        """
+        vec_env = VecDecentralizedSocietyEnv(3, max_episode_steps=2)
+        vec_env.reset()
+        _, _, dones, _ = vec_env.step(np.zeros(3, dtype=np.int64))
+        self.assertFalse(dones.any())
+        _, _, dones, infos = vec_env.step(np.zeros(3, dtype=np.int64))
+        self.assertTrue(dones.all())
+        self.assertTrue(infos[0]['TimeLimit.truncated'])
+
+    def test_set_attr_applies_to_all_envs(self):
+        """
+        Tests that attributes are set for every environment, and that a subset is refused.
+        """
+        vec_env = VecDecentralizedSocietyEnv(3)
+        vec_env.set_attr('max_episode_steps', 4)
+        vec_env.set_attr('max_episode_steps', 5, indices=[2, 0, 1])
+        self.assertEqual(vec_env.get_attr('max_episode_steps'), [5, 5, 5])
+        for indices in (1, [0, 2]):
+            with self.assertRaises(ValueError):
+                vec_env.set_attr('max_episode_steps', 6, indices=indices)
+        self.assertEqual(vec_env.max_episode_steps, 5)
+
+    def test_env_method_runs_on_all_envs(self):
+        """
+        Tests that methods are called for every environment, and that a subset is refused rather
+        than running the method on the whole batch.
+        """
+        vec_env = VecDecentralizedSocietyEnv(3)
+        vec_env.reset()
+        vec_env.step(np.ones(3, dtype=np.int64))
+        stepped = vec_env.total_resources.copy()
+        with self.assertRaises(ValueError):
+            vec_env.env_method('reset', indices=[0])
+        np.testing.assert_array_equal(vec_env.total_resources, stepped)
+        observations = vec_env.env_method('reset')
+        self.assertEqual(len(observations), 3)
+        self.assertFalse(np.array_equal(vec_env.total_resources, stepped))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from web3 import Web3, EthereumTesterProvider
+from marl.rpc_metrics import instrument
+from marl.view_cache import cache_views
+
+# Contract storing the value sent to it in slot 0 and returning slot 0 to any call:
+# CALLVALUE ISZERO PUSH1 0x0a JUMPI CALLVALUE PUSH1 0 SSTORE STOP
+# JUMPDEST PUSH1 0 SLOAD PUSH1 0 MSTORE PUSH1 0x20 PUSH1 0 RETURN
+RUNTIME = '3415600a5734600055005b60005460005260206000f3'
+INIT = '6016' '80' '600b' '6000' '39' '6000' 'f3'  # Copies the runtime code and returns it
+ABI = [{'type': 'function', 'name': name, 'stateMutability': 'view', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}
+       for name in ('value', 'endTime')]
+
+
+class TestViewCache(unittest.TestCase):
+    """
+    Unit test class for the block-aware cache of view calls, run on an in-process chain.
+    """
+
+    def setUp(self):
+        self.w3 = Web3(EthereumTesterProvider())
+        self.metrics = instrument(self.w3)
+        self.cache = cache_views(self.w3)
+        tx_hash = self.w3.eth.send_transaction({'from': self.w3.eth.accounts[0], 'data': '0x' + INIT + RUNTIME})
+        address = self.w3.eth.wait_for_transaction_receipt(tx_hash)['contractAddress']
+        self.contract = self.w3.eth.contract(address=address, abi=ABI)
+
+    def store(self, value):
+        tx_hash = self.w3.eth.send_transaction({'from': self.w3.eth.accounts[0], 'to': self.contract.address, 'value': value})
+        self.w3.eth.wait_for_transaction_receipt(tx_hash)
+
+    def test_latest_reads_are_never_stale(self):
+        """
+        Tests that repeated reads of the latest block are served from the cache until a
+        transaction is sent, and then read the new state.
+        """
+        value = self.contract.functions.value()
+        self.assertEqual([value.call(), value.call()], [0, 0])
+        self.store(7)
+        self.assertEqual([value.call(), value.call()], [7, 7])
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+        # Only the misses reached the node
+        self.assertEqual(self.metrics.rpc['eth_call'].count, 2)
+
+    def test_pinned_and_immutable_reads(self):
+        """
+        Tests that reads pinned to a block number and immutable getters outlive new blocks, and
+        that rewriting the chain clears them.
+        """
+        self.cache.mark_immutable(self.contract, 'endTime')
+        block = self.w3.eth.block_number
+        self.assertEqual(self.contract.functions.value().call(block_identifier=block), 0)
+        self.assertEqual(self.contract.functions.endTime().call(), 0)
+        self.store(3)
+        self.assertEqual(self.contract.functions.value().call(block_identifier=block), 0)
+        self.assertEqual(self.contract.functions.value().call(block_identifier=block + 1), 3)
+        # The slot changed, but the getter was declared immutable
+        self.assertEqual(self.contract.functions.endTime().call(), 0)
+        self.assertEqual(self.cache.hits, 2)
+
+        self.cache.observe('evm_revert')
+        self.assertEqual(self.contract.functions.endTime().call(), 3)
+
+    def test_lru_eviction(self):
+        """
+        Tests that the least recently used results are evicted beyond `maxsize`.
+        """
+        self.cache.maxsize = 2
+        for _ in range(3):
+            self.store(1)
+        first = self.w3.eth.block_number - 2
+        value = self.contract.functions.value()
+        for block in (first, first + 1, first, first + 2):
+            value.call(block_identifier=block)
+        self.assertEqual(self.cache.summary()['size'], 2)
+        value.call(block_identifier=first)  # Kept, as it was used more recently than first + 1
+        self.assertEqual(self.cache.hits, 2)
+        value.call(block_identifier=first + 1)
+        self.assertEqual(self.cache.hits, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+from marl.batch_reads import batch_receipts
+from marl.hardhat_rpc import HardhatChain
+
+# Explicit gas for tick transactions: with automine off, sending must not run gas estimation,
+# which would reject a transaction that is only going to revert once mined
+TICK_GAS = 300000
+
+
+class TickMiner:
+    """
+    Mines all the transactions of a simulation tick in a single block. While active, the node's
+    automine is off: `submit` sends transactions without waiting for them, `mine` mines one block
+    with `evm_mine` and fetches every receipt in one batch request. Transactions are executed in
+    submission order when the node's mempool uses FIFO ordering (see `hardhat.config.ts`), so
+    contention between agents within a block is well defined.
+
+    Attributes:
+        w3: The Web3 instance.
+        chain: The HardhatChain used to switch automine and mine blocks.
+        gas: Gas limit of every submitted transaction.
+    """
+    def __init__(self, w3, chain=None, gas=TICK_GAS):
+        """
+        Initializes the miner.
+
+        Args:
+            w3: A Web3 instance connected to a Hardhat node.
+            chain: The HardhatChain of the node. Defaults to one built on `w3`.
+            gas: Gas limit of every submitted transaction.
+        """
+        self.w3 = w3
+        self.chain = chain if chain is not None else HardhatChain(w3)
+        self.gas = gas
+        self._pending = []
+
+    def start(self):
+        """
+        Switches the node to manual mining.
+        """
+        self.chain.set_automine(False)
+
+    def stop(self):
+        """
+        Mines whatever is still pending and switches the node back to automine.
+        """
+        try:
+            if self._pending:
+                self.mine()
+        finally:
+            self.chain.set_automine(True)
+
+    def submit(self, function, sender):
+        """
+        Sends a transaction for the tick without waiting for it to be mined.
+
+        Args:
+            function: A bound contract function, e.g. `farmer.functions.farmEfficient()`.
+            sender: The sending account.
+
+        Returns:
+            int: Index of the transaction's outcome in the list returned by the next `mine`.
+        """
+        try:
+            self._pending.append(function.transact({'from': sender, 'gas': self.gas}))
+        except Exception as e:
+            # Rejected before reaching the mempool (e.g. insufficient funds)
+            self._pending.append(e)
+        return len(self._pending) - 1
+
+    def submit_many(self, transactions):
+        """
+        Sends prepared transactions for the tick in one JSON-RPC batch request.
+
+        A transaction the node rejects leaves a gap in its sender's nonces, so the sender's later
+        transactions of the batch would never be mined: they are dropped from the mempool
+        (`hardhat_dropTransaction`) and recorded as failed too.
+
+        Args:
+            transactions: Transaction dicts with `from`, `to`, `data` and `nonce`, and optionally
+                `gas` (defaults to the miner's gas) and `value`. A transaction with a `raw` entry
+                (signed locally, e.g. by `marl.key_pool.KeyPool`) is sent as is with
+                `eth_sendRawTransaction`.
+
+        Returns:
+            list: Indices of the transactions' outcomes in the list returned by the next `mine`.
+        """
+        requests = []
+        for transaction in transactions:
+            if 'raw' in transaction:
+                requests.append(('eth_sendRawTransaction', [transaction['raw']]))
+                continue
+            params = {key: transaction[key] for key in ('from', 'to', 'data')}
+            params['gas'] = hex(transaction.get('gas', self.gas))
+            params['nonce'] = hex(transaction['nonce'])
+            if transaction.get('value'):
+                params['value'] = hex(transaction['value'])
+            requests.append(('eth_sendTransaction', [params]))
+        results = self.chain.batch(requests, raise_errors=False)
+
+        first_rejected = {}
+        for transaction, result in zip(transactions, results):
+            if isinstance(result, Exception):
+                sender = transaction['from']
+                first_rejected[sender] = min(first_rejected.get(sender, transaction['nonce']), transaction['nonce'])
+        stranded = [
+            i for i, (transaction, result) in enumerate(zip(transactions, results))
+            if not isinstance(result, Exception) and transaction['nonce'] > first_rejected.get(transaction['from'], transaction['nonce'])
+        ]
+        if stranded:
+            self.chain.batch([('hardhat_dropTransaction', [results[i]]) for i in stranded])
+            for i in stranded:
+                results[i] = ValueError("Dropped: an earlier transaction of the sender was rejected")
+
+        start = len(self._pending)
+        self._pending.extend(results)
+        return list(range(start, len(self._pending)))
+
+    def mine(self):
+        """
+        Mines one block with every transaction submitted since the last call.
+
+        Returns:
+            list: One outcome per submitted transaction, in submission order: its receipt (with
+            `status` 0 if it reverted), or the exception raised when it was sent.
+        """
+        pending, self._pending = self._pending, []
+        self.chain.mine()
+        tx_hashes = [tx for tx in pending if not isinstance(tx, Exception)]
+        receipts = iter(batch_receipts(self.w3, tx_hashes))
+        return [tx if isinstance(tx, Exception) else next(receipts) for tx in pending]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def succeeded(outcome):
+    """
+    Returns True if a TickMiner outcome is a receipt of a successful transaction.
+    """
+    return not isinstance(outcome, Exception) and outcome['status'] == 1
@@ -0,0 +1,186 @@
+import csv
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+from marl.metrics_sink import MetricsSink, export_csv
+
+# Columns of the rows recorded by CustomTrainingCallback, one row per window of steps
+TRAINING_COLUMNS = {
+    'timesteps': np.int64,
+    'reward_mean': np.float64,
+    'reward_min': np.float64,
+    'reward_max': np.float64,
+    'loss': np.float64,
+    'exploration_rate': np.float64,
+}
+
+TRAINING_CSV_HEADER = ['Timesteps', 'Cumulative Reward', 'Loss', 'Exploration Rate', 'Reward Min', 'Reward Max']
+TRAINING_CSV_COLUMNS = ['timesteps', 'reward_mean', 'loss', 'exploration_rate', 'reward_min', 'reward_max']
+
+
+class CustomTrainingCallback(BaseCallback):
+    """
+    Custom callback for logging additional metrics during training.
+    Tracks the reward summed over the environments, the training loss and the exploration rate.
+
+    Steps are aggregated in windows of `window` steps (reward mean/min/max, mean loss, last
+    exploration rate). The last `capacity` windows are kept in preallocated NumPy ring buffers, so
+    memory does not grow with the number of timesteps; when `metrics_dir` is given, every window is
+    also streamed to disk with a MetricsSink, so the full history survives the ring and a crash.
+
+    Attributes:
+        window: Number of steps aggregated into one recorded row.
+        capacity: Number of rows kept in memory.
+        metrics_dir: Directory the rows are streamed to, or None.
+    """
+    def __init__(self, verbose=0, window=1, capacity=100_000, metrics_dir=None, flush_interval=10.0):
+        """
+        Initializes the callback.
+
+        Args:
+            verbose: Verbosity level.
+            window: Number of steps aggregated into one recorded row (1 records every step).
+            capacity: Number of rows kept in the in-memory ring buffers.
+            metrics_dir: Directory every row is streamed to (None to keep only the ring buffers).
+            flush_interval: Seconds between flushes of the streamed rows.
+        """
+        super(CustomTrainingCallback, self).__init__(verbose)
+        self.window = window
+        self.capacity = capacity
+        self.metrics_dir = metrics_dir
+        self.flush_interval = flush_interval
+
+        self._buffers = {name: np.zeros(capacity, dtype=dtype) for name, dtype in TRAINING_COLUMNS.items()}
+        self._rows = 0  # Rows recorded so far, including those overwritten in the ring
+        self._sink = None
+        self._last_loss = np.nan
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window_steps = 0
+        self._reward_sum = 0.0
+        self._reward_min = np.inf
+        self._reward_max = -np.inf
+        self._loss_sum = 0.0
+        self._loss_steps = 0
+
+    def _init_callback(self) -> None:
+        if self.metrics_dir is not None:
+            self._sink = MetricsSink(self.metrics_dir, TRAINING_COLUMNS, flush_interval=self.flush_interval)
+
+    def _on_rollout_start(self) -> None:
+        # DQN trains between rollouts and the logger keeps the last loss until its next dump,
+        # which only happens during the following rollout
+        loss = self.model.logger.name_to_value.get('train/loss')
+        if loss is not None:
+            self._last_loss = loss
+
+    def _on_step(self) -> bool:
+        # Log the reward of this step, summed over the environments
+        reward = float(np.sum(self.locals['rewards']))
+        self._reward_sum += reward
+        self._reward_min = min(self._reward_min, reward)
+        self._reward_max = max(self._reward_max, reward)
+
+        # Loss of the last gradient step (NaN until the model has been trained once)
+        if not np.isnan(self._last_loss):
+            self._loss_sum += self._last_loss
+            self._loss_steps += 1
+
+        self._window_steps += 1
+        if self._window_steps == self.window:
+            self._record_window()
+        return True
+
+    def _on_training_end(self) -> None:
+        if self._window_steps:
+            self._record_window()
+        if self._sink is not None:
+            self._sink.close()
+
+    def _record_window(self):
+        row = {
+            'timesteps': self.num_timesteps,
+            'reward_mean': self._reward_sum / self._window_steps,
+            'reward_min': self._reward_min,
+            'reward_max': self._reward_max,
+            'loss': self._loss_sum / self._loss_steps if self._loss_steps else np.nan,
+            'exploration_rate': self.model.exploration_rate,
+        }
+        index = self._rows % self.capacity
+        for name, value in row.items():
+            self._buffers[name][index] = value
+        self._rows += 1
+        if self._sink is not None:
+            self._sink.append(**row)
+        self._reset_window()
+
+    def metrics(self):
+        """
+        Returns the rows held in the ring buffers, oldest first.
+
+        Returns:
+            dict: Column name (see `TRAINING_COLUMNS`) to array.
+        """
+        if self._rows <= self.capacity:
+            return {name: buffer[:self._rows].copy() for name, buffer in self._buffers.items()}
+        start = self._rows % self.capacity
+        return {name: np.roll(buffer, -start) for name, buffer in self._buffers.items()}
+
+    @property
+    def cumulative_rewards(self):
+        return self.metrics()['reward_mean']
+
+    @property
+    def losses(self):
+        return self.metrics()['loss']
+
+    @property
+    def exploration_rates(self):
+        return self.metrics()['exploration_rate']
+
+    def plot_metrics(self):
+        import matplotlib.pyplot as plt
+
+        metrics = self.metrics()
+        timesteps = metrics['timesteps']
+
+        # Plot cumulative rewards, with the per-window range when steps are aggregated
+        plt.figure(figsize=(10, 6))
+        plt.plot(timesteps, metrics['reward_mean'])
+        if self.window > 1:
+            plt.fill_between(timesteps, metrics['reward_min'], metrics['reward_max'], alpha=0.3)
+        plt.title("Cumulative Reward vs. Timesteps")
+        plt.xlabel("Timesteps")
+        plt.ylabel("Cumulative Reward")
+        plt.show()
+
+        # Plot loss over time (once the model has been trained)
+        if not np.isnan(metrics['loss']).all():
+            plt.figure(figsize=(10, 6))
+            plt.plot(timesteps, metrics['loss'])
+            plt.title("Loss vs. Timesteps")
+            plt.xlabel("Timesteps")
+            plt.ylabel("Loss")
+            plt.show()
+
+        # Plot exploration decay
+        plt.figure(figsize=(10, 6))
+        plt.plot(timesteps, metrics['exploration_rate'])
+        plt.title("Exploration Decay (ε) vs. Timesteps")
+        plt.xlabel("Timesteps")
+        plt.ylabel("Exploration Rate (ε)")
+        plt.show()
+
+    def save_metrics_to_csv(self, filename='training_metrics.csv'):
+        # Save the logged metrics to a CSV file for analysis. The streamed history is complete,
+        # the ring buffers only hold the last `capacity` rows.
+        if self._sink is not None:
+            self._sink.flush()
+            export_csv(self.metrics_dir, filename, TRAINING_CSV_COLUMNS, TRAINING_CSV_HEADER)
+            return
+        metrics = self.metrics()
+        with open(filename, 'w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(TRAINING_CSV_HEADER)
+            csv_writer.writerows(zip(*(metrics[name].tolist() for name in TRAINING_CSV_COLUMNS)))
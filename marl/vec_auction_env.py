@@ -0,0 +1,166 @@
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from marl.auction_env import AGENT, NO_BIDDER
+
+
+class VecAuctionEnv(VecEnv):
+    """
+    Batched version of AuctionEnv that runs many independent auctions with the same rules and
+    rewards. The state of every auction lives in NumPy arrays allocated once, so a single `step`
+    advances `num_envs` auctions without Python loops over them. Plugs into stable_baselines3
+    with a multi-input policy (e.g. `DQN("MultiInputPolicy", VecAuctionEnv(1024))`).
+
+    Attributes:
+        time_remaining: Time left in every auction.
+        highest_bid: Highest bid of every auction.
+        highest_bidder: Index of the highest bidder (AGENT, a rival from 1, or NO_BIDDER).
+        personal_funds: Funds of the agent in every auction.
+        item_worth: Value of the item to the agent in every auction.
+        rival_valuations: Array of shape (num_envs, n_rivals) above which rivals stop bidding.
+    """
+    render_mode = None
+
+    def __init__(self, num_envs, bidding_time=10, initial_funds=100, bid_increment=5, n_bid_levels=4, item_worth=None,
+                 n_rivals=0, rival_bid_probability=0.5, rival_increment=(1, 5), bid_cost=1, failure_penalty=10,
+                 seed=None):
+        observation_space = spaces.Dict({
+            'time_remaining': spaces.Discrete(bidding_time + 1),
+            'highest_bid': spaces.Box(low=0, high=np.inf, shape=(1,), dtype=np.float32),
+            'personal_funds': spaces.Box(low=0, high=initial_funds, shape=(1,), dtype=np.float32),
+        })
+        action_space = spaces.Discrete(n_bid_levels)
+        super(VecAuctionEnv, self).__init__(num_envs, observation_space, action_space)
+
+        self.bidding_time = bidding_time
+        self.initial_funds = initial_funds
+        self.bid_increment = bid_increment
+        self.item_worth_setting = item_worth
+        self.n_rivals = n_rivals
+        self.rival_bid_probability = rival_bid_probability
+        self.rival_increment = rival_increment
+        self.bid_cost = bid_cost
+        self.failure_penalty = failure_penalty
+        self.rng = np.random.default_rng(seed)
+
+        self.time_remaining = np.zeros(num_envs, dtype=np.int64)
+        self.highest_bid = np.zeros(num_envs)
+        self.highest_bidder = np.zeros(num_envs, dtype=np.int64)
+        self.personal_funds = np.zeros(num_envs)
+        self.item_worth = np.zeros(num_envs)
+        self.rival_valuations = np.zeros((num_envs, n_rivals))
+        self._actions = np.zeros(num_envs, dtype=np.int64)
+        self._reset_auctions(np.arange(num_envs))
+
+    def _reset_auctions(self, indices):
+        self.time_remaining[indices] = self.bidding_time
+        self.highest_bid[indices] = 0
+        self.highest_bidder[indices] = NO_BIDDER
+        self.personal_funds[indices] = self.initial_funds
+        if self.item_worth_setting is None:
+            self.item_worth[indices] = self.rng.integers(5, 51, len(indices))
+        else:
+            self.item_worth[indices] = self.item_worth_setting
+        self.rival_valuations[indices] = self.item_worth[indices, None] * self.rng.uniform(0.5, 1.5, (len(indices), self.n_rivals))
+
+    def reset(self):
+        """
+        Starts a new auction in every environment.
+
+        Returns:
+            observation: Dict of arrays with the time remaining, the highest bid and the agent's funds.
+        """
+        self._reset_auctions(np.arange(self.num_envs))
+        self._reset_seeds()
+        self._reset_options()
+        return self._observation()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        """
+        Applies the pending bids to every auction, mirroring AuctionEnv.step.
+
+        Returns:
+            observation: Dict of arrays; finished auctions are already reset.
+            reward: Float array with every agent's reward.
+            done: Boolean array flagging the auctions that ended.
+            info: One dict per auction; ended ones carry `terminal_observation`, `winner` and `winning_bid`.
+        """
+        actions = self._actions
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+
+        # Agent: a bid is strictly higher by construction and only fails when it cannot be paid
+        bids = actions > 0
+        values = self.highest_bid + actions * self.bid_increment
+        paid = bids & (values <= self.personal_funds)
+        self.personal_funds -= np.where(paid, values, 0)
+        # The agent's own outbid amount goes to its pending returns and is withdrawn
+        self.personal_funds += np.where(paid & (self.highest_bidder == AGENT), self.highest_bid, 0)
+        self.highest_bid = np.where(paid, values, self.highest_bid)
+        self.highest_bidder[paid] = AGENT
+        rewards -= np.where(paid, self.bid_cost, np.where(bids, self.failure_penalty, 0))
+
+        # Rivals: at most one per auction tries to raise the highest bid, within its valuation
+        if self.n_rivals:
+            tries = self.rng.random(self.num_envs) < self.rival_bid_probability
+            rivals = self.rng.integers(1, self.n_rivals + 1, self.num_envs)
+            values = self.highest_bid + self.rng.uniform(*self.rival_increment, self.num_envs)
+            valuations = self.rival_valuations[np.arange(self.num_envs), rivals - 1]
+            outbid = tries & (rivals != self.highest_bidder) & (values <= valuations)
+            self.personal_funds += np.where(outbid & (self.highest_bidder == AGENT), self.highest_bid, 0)
+            self.highest_bid = np.where(outbid, values, self.highest_bid)
+            self.highest_bidder = np.where(outbid, rivals, self.highest_bidder)
+
+        self.time_remaining -= 1
+        dones = self.time_remaining <= 0
+        won = dones & (self.highest_bidder == AGENT)
+        rewards += np.where(won, self.item_worth - self.highest_bid, 0)
+
+        infos = [{} for _ in range(self.num_envs)]
+        finished = np.flatnonzero(dones)
+        if finished.size:
+            terminal = self._observation()
+            for idx in finished:
+                infos[idx]['terminal_observation'] = {key: value[idx] for key, value in terminal.items()}
+                infos[idx]['TimeLimit.truncated'] = False
+                infos[idx]['winner'] = int(self.highest_bidder[idx])
+                infos[idx]['winning_bid'] = float(self.highest_bid[idx])
+            # Auto-reset finished auctions, as SB3 expects from a VecEnv
+            self._reset_auctions(finished)
+
+        return self._observation(), rewards, dones, infos
+
+    def _observation(self):
+        return {
+            'time_remaining': self.time_remaining.copy(),
+            'highest_bid': self.highest_bid.astype(np.float32)[:, None],
+            'personal_funds': self.personal_funds.astype(np.float32)[:, None],
+        }
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        # Settings are shared by every auction and the state arrays hold all of them, so an
+        # attribute can only be set for every environment at once
+        if set(self._get_indices(indices)) != set(range(self.num_envs)):
+            raise ValueError(f"{attr_name} is shared by all {self.num_envs} auctions and cannot be set for a subset of them")
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        # A method runs on the whole batch (e.g. `reset` resets every one of the auctions), so it can
+        # only be called for every environment at once
+        indices = list(self._get_indices(indices))
+        if set(indices) != set(range(self.num_envs)):
+            raise ValueError(f"{method_name} runs on all {self.num_envs} auctions and cannot be called for a subset of them")
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result for _ in indices]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
@@ -0,0 +1,166 @@
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from marl.society_engine import (
+    FARM_EFFICIENT_YIELD,
+    FARM_SELFISH_LOSS,
+    BUILD_RESOURCES_NEEDED,
+    BUILD_RESOURCES_WASTED,
+    TRADE_EFFICIENT_GAIN,
+    TRADE_SELFISH_LOSS,
+)
+
+# Row `a` holds the (farmer, builder, trader) selfish flags of the combined action `a`,
+# i.e. [a % 2, (a // 2) % 2, (a // 4) % 2] as decoded by DecentralizedSocietyEnv.step
+ACTION_TABLE = np.array([[a % 2, (a // 2) % 2, (a // 4) % 2] for a in range(8)], dtype=bool)
+
+
+class VecDecentralizedSocietyEnv(VecEnv):
+    """
+    Batched version of DecentralizedSocietyEnv that steps many independent societies at once.
+    The state of every society lives in NumPy arrays and all eight action combinations are applied
+    with vectorized masks, so a single `step` call advances `num_envs` societies without Python loops.
+    Plugs directly into stable_baselines3 (e.g. `DQN("MlpPolicy", VecDecentralizedSocietyEnv(4096))`).
+
+    Attributes:
+        total_resources: Integer array with the resource pool of every society.
+        last_action_success: Array with 1 where all three actions of the last step succeeded, else 0.
+        dones: Boolean array flagging the societies that terminated on the last step.
+        episode_steps: Number of steps taken in the current episode of every society.
+        initial_resources: Resources every society starts (and restarts) with.
+        max_resources: Upper bound of the resources; reaching it ends the episode.
+        max_episode_steps: Optional episode length after which a society is truncated and reset.
+    """
+    render_mode = None
+
+    def __init__(self, num_envs, initial_resources=100, max_resources=1000, max_episode_steps=None):
+        """
+        Initializes the batched environment.
+
+        Args:
+            num_envs: Number of independent societies.
+            initial_resources: Resources every society starts with after a reset.
+            max_resources: Resource level at which an episode ends (as in DecentralizedSocietyEnv).
+            max_episode_steps: Optional time limit per episode; None means episodes only end on collapse or saturation.
+        """
+        observation_space = spaces.Box(low=np.array([0, 0]), high=np.array([max_resources, 1]), dtype=np.float32)
+        action_space = spaces.Discrete(8)
+        super(VecDecentralizedSocietyEnv, self).__init__(num_envs, observation_space, action_space)
+
+        self.initial_resources = initial_resources
+        self.max_resources = max_resources
+        self.max_episode_steps = max_episode_steps
+
+        self.total_resources = np.full(num_envs, initial_resources, dtype=np.int64)
+        self.last_action_success = np.ones(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.episode_steps = np.zeros(num_envs, dtype=np.int64)
+        self._actions = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self):
+        """
+        Resets every society to the initial resource level.
+
+        Returns:
+            observation: Array of shape (num_envs, 2) with total resources and last action success.
+        """
+        self.total_resources[:] = self.initial_resources
+        self.last_action_success[:] = 1
+        self.dones[:] = False
+        self.episode_steps[:] = 0
+        self._reset_seeds()
+        self._reset_options()
+        return self._observation()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        """
+        Applies the pending actions to every society, mirroring DecentralizedSocietyEnv.step:
+        the farmer acts first, then the builder and the trader on the updated pool. Actions that
+        would revert on chain leave the pool unchanged and are penalized with -10.
+
+        Returns:
+            observation: Array of shape (num_envs, 2); finished societies are already reset.
+            reward: Float array with the summed farmer, builder and trader rewards.
+            done: Boolean array flagging the societies whose episode ended.
+            info: One dict per society; finished ones carry `terminal_observation`.
+        """
+        selfish = ACTION_TABLE[self._actions]
+        resources = self.total_resources
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        success = np.ones(self.num_envs, dtype=bool)
+
+        # Farmer: efficient adds resources, selfish removes them if enough are available
+        farm_ok = ~selfish[:, 0] | (resources >= FARM_SELFISH_LOSS)
+        resources += np.where(selfish[:, 0], -FARM_SELFISH_LOSS, FARM_EFFICIENT_YIELD) * farm_ok
+        rewards += np.where(farm_ok, np.where(selfish[:, 0], -5, 5), -10)
+        success &= farm_ok
+
+        # Builder: both actions need resources, selfish wastes extra
+        build_cost = np.where(selfish[:, 1], BUILD_RESOURCES_NEEDED + BUILD_RESOURCES_WASTED, BUILD_RESOURCES_NEEDED)
+        build_ok = resources >= build_cost
+        resources -= build_cost * build_ok
+        rewards += np.where(build_ok, np.where(selfish[:, 1], -5, 5), -10)
+        success &= build_ok
+
+        # Trader: efficient adds resources, selfish removes them if enough are available
+        trade_ok = ~selfish[:, 2] | (resources >= TRADE_SELFISH_LOSS)
+        resources += np.where(selfish[:, 2], -TRADE_SELFISH_LOSS, TRADE_EFFICIENT_GAIN) * trade_ok
+        rewards += np.where(trade_ok, np.where(selfish[:, 2], -5, 5), -10)
+        success &= trade_ok
+
+        self.last_action_success[:] = success
+        self.episode_steps += 1
+        terminated = (resources <= 0) | (resources >= self.max_resources)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        if self.max_episode_steps is not None:
+            truncated = ~terminated & (self.episode_steps >= self.max_episode_steps)
+        np.logical_or(terminated, truncated, out=self.dones)
+
+        infos = [{} for _ in range(self.num_envs)]
+        finished = np.flatnonzero(self.dones)
+        if finished.size:
+            terminal_obs = self._observation()[finished]
+            for row, idx in enumerate(finished):
+                infos[idx]['terminal_observation'] = terminal_obs[row]
+                infos[idx]['TimeLimit.truncated'] = bool(truncated[idx])
+            # Auto-reset finished societies, as SB3 expects from a VecEnv
+            resources[finished] = self.initial_resources
+            self.last_action_success[finished] = 1
+            self.episode_steps[finished] = 0
+
+        return self._observation(), rewards, self.dones.copy(), infos
+
+    def _observation(self):
+        obs = np.empty((self.num_envs, 2), dtype=np.float32)
+        obs[:, 0] = self.total_resources
+        obs[:, 1] = self.last_action_success
+        return obs
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        # Settings are shared by every society and the state arrays hold all of them, so an
+        # attribute can only be set for every environment at once
+        if set(self._get_indices(indices)) != set(range(self.num_envs)):
+            raise ValueError(f"{attr_name} is shared by all {self.num_envs} societies and cannot be set for a subset of them")
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        # A method runs on the whole batch (e.g. `reset` resets every one of the societies), so it can
+        # only be called for every environment at once
+        indices = list(self._get_indices(indices))
+        if set(indices) != set(range(self.num_envs)):
+            raise ValueError(f"{method_name} runs on all {self.num_envs} societies and cannot be called for a subset of them")
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result for _ in indices]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
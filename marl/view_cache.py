@@ -0,0 +1,243 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+from eth_utils import function_abi_to_4byte_selector
+
+# web3 is imported where the middleware is built, so importing this module does not load it.
+
+DEFAULT_MAXSIZE = 4096
+
+# Requests that never change chain state. Any other request (a transaction, `evm_mine`,
+# `evm_increaseTime`, `hardhat_setBalance`, ...) may mine a block or alter state, so it
+# invalidates the reads of the latest block.
+READ_ONLY_METHODS = frozenset({
+    'eth_call', 'eth_estimateGas', 'eth_blockNumber', 'eth_chainId', 'net_version', 'web3_clientVersion',
+    'eth_accounts', 'eth_gasPrice', 'eth_maxPriorityFeePerGas', 'eth_feeHistory', 'eth_syncing',
+    'eth_getBalance', 'eth_getCode', 'eth_getStorageAt', 'eth_getTransactionCount', 'eth_getLogs',
+    'eth_getBlockByNumber', 'eth_getBlockByHash', 'eth_getTransactionByHash', 'eth_getTransactionReceipt',
+    'evm_snapshot',
+})
+
+# Requests that rewrite past state, so even reads pinned to a block number or of immutable getters
+# may no longer hold (a contract redeployed after `evm_revert` gets the same address)
+REWRITE_METHODS = frozenset({
+    'evm_revert', 'hardhat_reset', 'hardhat_setCode', 'hardhat_setStorageAt', 'hardhat_setBalance',
+    'hardhat_setNonce',
+})
+
+# Block tags whose state changes without any block being mined; reads at them are never cached
+UNCACHED_BLOCKS = frozenset({'pending', 'safe', 'finalized'})
+
+_LATEST = 'latest'
+_IMMUTABLE = 'immutable'
+
+# Cache of every Web3 instance given one, for code that talks to the provider directly
+_caches = weakref.WeakKeyDictionary()
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    return value
+
+
+class ViewCache:
+    """
+    LRU cache of `eth_call` results, keyed on the call (target, calldata and sender) and the block
+    it reads. It never returns state the node would not:
+
+    - Reads pinned to a block number are kept until evicted, since a mined block's state is final
+      (unless the chain is rewritten with `evm_revert` and the like, which clears the cache).
+    - Reads of the latest block are kept until a new block may have been mined: any request that
+      is not read-only invalidates them, and so does seeing a higher block number in a response.
+    - Getters marked immutable with `mark_immutable` (values set in the constructor and never
+      written again, such as `auctionEndTime`) are cached whatever the block.
+
+    Only requests made through the instrumented Web3 instance (and `HardhatChain.batch`) are seen.
+    When another connection writes to the node, call `invalidate` afterwards.
+
+    Attributes:
+        maxsize: Maximum number of cached results.
+        hits: Number of calls answered from the cache.
+        misses: Number of calls sent to the node.
+        head: Highest block number seen.
+    """
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.head = -1
+        self._entries = OrderedDict()
+        self._latest = set()  # Keys of the latest-block reads
+        self._immutable = set()  # (address, selector) pairs
+        self._lock = threading.Lock()
+
+    def mark_immutable(self, contract, *function_names):
+        """
+        Caches the given getters of a deployed contract regardless of the block.
+
+        Args:
+            contract: The contract instance.
+            *function_names: Names of getters whose value never changes after deployment.
+        """
+        for name in function_names:
+            selector = '0x' + function_abi_to_4byte_selector(contract.get_function_by_name(name).abi).hex()
+            self._immutable.add((contract.address.lower(), selector))
+
+    def key(self, params):
+        """
+        Returns the cache key of an `eth_call`, or None if it must not be cached.
+        """
+        transaction = params[0]
+        block = _normalize(params[1]) if len(params) > 1 else _LATEST
+        if not isinstance(transaction, dict) or block in UNCACHED_BLOCKS or (len(params) > 2 and params[2]):
+            return None
+        call = tuple(sorted((name, _normalize(value)) for name, value in transaction.items()))
+        data = _normalize(transaction.get('data', transaction.get('input'))) or '0x'
+        if (_normalize(transaction.get('to')), data[:10]) in self._immutable:
+            return _IMMUTABLE, call
+        if block == 'earliest':
+            block = 0
+        return block, call
+
+    def get(self, key):
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key, response):
+        if 'error' in response or 'result' not in response:
+            return
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            if key[0] == _LATEST:
+                self._latest.add(key)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._latest.discard(evicted)
+
+    def invalidate(self, everything=False):
+        """
+        Drops the reads of the latest block, or every cached result if `everything` is True.
+        """
+        with self._lock:
+            if everything:
+                self._entries.clear()
+                self._latest.clear()
+                return
+            for key in self._latest:
+                self._entries.pop(key, None)
+            self._latest.clear()
+
+    def observe(self, method, response=None):
+        """
+        Invalidates what a request may have made stale: called for every request that goes to
+        the node, with its response when there is one.
+        """
+        if method in REWRITE_METHODS:
+            self.invalidate(everything=True)
+        elif method not in READ_ONLY_METHODS:
+            self.invalidate()
+        elif method == 'eth_blockNumber' and response and response.get('result') is not None:
+            self._saw_block(response['result'])
+        elif method == 'eth_getBlockByNumber' and response and response.get('result'):
+            self._saw_block(response['result'].get('number'))
+
+    def _saw_block(self, number):
+        if number is None:
+            return
+        number = int(number, 16) if isinstance(number, str) else int(number)
+        if number > self.head:
+            if self.head >= 0:
+                self.invalidate()
+            self.head = number
+
+    def summary(self):
+        """
+        Returns the hit and miss counts as a dictionary.
+        """
+        calls = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / calls if calls else 0.0,
+                'size': len(self._entries)}
+
+
+def view_cache(w3):
+    """
+    Returns the ViewCache of a Web3 instance, or None.
+    """
+    try:
+        return _caches.get(w3)
+    except TypeError:
+        return None
+
+
+def _middleware(cache):
+    from web3.middleware import Web3Middleware
+
+    class ViewCacheMiddleware(Web3Middleware):
+        def wrap_make_request(self, make_request):
+            def middleware(method, params):
+                key = cache.key(params) if method == 'eth_call' else None
+                if key is not None:
+                    response = cache.get(key)
+                    if response is not None:
+                        return response
+                response = make_request(method, params)
+                cache.observe(method, response)
+                if key is not None:
+                    cache.put(key, response)
+                return response
+
+            return middleware
+
+        def wrap_make_batch_request(self, make_batch_request):
+            def middleware(requests_info):
+                requests_info = list(requests_info)
+                keys = [cache.key(params) if method == 'eth_call' else None for method, params in requests_info]
+                responses = [cache.get(key) if key is not None else None for key in keys]
+                missing = [i for i, response in enumerate(responses) if response is None]
+                if not missing:
+                    return responses
+                fetched = make_batch_request([requests_info[i] for i in missing])
+                if not isinstance(fetched, list):
+                    # The whole batch failed
+                    cache.invalidate()
+                    return fetched
+                for i, response in zip(missing, fetched):
+                    cache.observe(requests_info[i][0], response)
+                    if keys[i] is not None:
+                        cache.put(keys[i], response)
+                    responses[i] = response
+                return responses
+
+            return middleware
+
+    return ViewCacheMiddleware
+
+
+def cache_views(w3, maxsize=DEFAULT_MAXSIZE):
+    """
+    Caches the `eth_call` results of a Web3 instance. The cache is the outermost middleware, so
+    a cached read skips the other middleware and is not counted as a request by
+    `marl.rpc_metrics`.
+
+    Args:
+        w3: The Web3 instance.
+        maxsize: Maximum number of cached results.
+
+    Returns:
+        ViewCache: The cache, for marking immutable getters and reading the hit counts.
+    """
+    cache = ViewCache(maxsize)
+    w3.middleware_onion.add(_middleware(cache), name='view_cache')
+    _caches[w3] = cache
+    return cache